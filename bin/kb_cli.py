@@ -11,7 +11,6 @@ Usage:
 
 import sys
 import os
-import platform
 import argparse
 from pathlib import Path
 
@@ -28,18 +27,16 @@ SCRIPT_DIR = Path(__file__).parent
 LIB_DIR = SCRIPT_DIR / "lib"
 sys.path.insert(0, str(LIB_DIR))
 
-# Import KB modules
-try:
-    from kb_search import search_kb
-    from kb_add import add_entry
-    from kb_index import update_index
-    from kb_stats import show_stats
-    from kb_list import list_entries
-    from kb_compound import compound_operation
-except ImportError as e:
-    print(f"Error: Could not import KB modules: {e}")
-    print(f"Make sure all required files are in {LIB_DIR}")
-    sys.exit(1)
+
+def load_command(module_name: str, function_name: str):
+    """Import a KB module on demand so each command only loads what it uses"""
+    try:
+        module = __import__(module_name)
+        return getattr(module, function_name)
+    except (ImportError, AttributeError) as e:
+        print(f"Error: Could not import KB modules: {e}")
+        print(f"Make sure all required files are in {LIB_DIR}")
+        sys.exit(1)
 
 
 class Colors:
@@ -70,7 +67,7 @@ class Colors:
     @staticmethod
     def enable_windows_colors():
         """Enable ANSI colors on Windows"""
-        if platform.system() == 'Windows':
+        if sys.platform == 'win32':
             try:
                 import ctypes
                 kernel32 = ctypes.windll.kernel32
@@ -98,15 +95,19 @@ def print_help():
     print()
     print(f"  {Colors.WHITE}search <term>{Colors.RESET}        🔍 Search knowledge base")
     print(f"                          Example: kb search 'react hydration'")
+    print(f"                          --rank: order by BM25 relevance (--top N, default: 10)")
+    print(f"                          --limit N: stop after N file results")
+    print(f"                          --json: one JSON object per result (NDJSON)")
     print()
     print(f"  {Colors.WHITE}add{Colors.RESET}                  ➕ Add new entry (interactive)")
     print(f"                          Example: kb add")
     print()
-    print(f"  {Colors.WHITE}index{Colors.RESET}                📇 Update INDEX.md")
+    print(f"  {Colors.WHITE}index [--full]{Colors.RESET}       📇 Update INDEX.md (only changed entries re-parsed)")
     print(f"                          Example: kb index")
+    print(f"                          --jobs N: parse on N processes (0 = all cores)")
     print()
     print(f"  {Colors.WHITE}stats{Colors.RESET}                📊 Show statistics")
-    print(f"                          Example: kb stats")
+    print(f"                          Example: kb stats --jobs 4")
     print()
     print(f"  {Colors.WHITE}list [category]{Colors.RESET}      📋 List all entries (optional: by category)")
     print(f"                          Example: kb list bugs")
@@ -117,6 +118,9 @@ def print_help():
     print(f"  {Colors.MAGENTA}{Colors.BOLD}compound <action>{Colors.RESET}    🧠 Compound mode with Neo4j integration")
     print(f"                          Example: kb compound search 'oauth'")
     print()
+    print(f"  {Colors.WHITE}serve [--stop]{Colors.RESET}       🛰️  Run a resident daemon (Unix socket); search/list/")
+    print(f"                          recent/stats are forwarded to it while it runs")
+    print()
     print(f"  {Colors.WHITE}help{Colors.RESET}                 ❓ Show this help")
     print()
     print(f"{Colors.MAGENTA}{Colors.BOLD}Compound Actions:{Colors.RESET}")
@@ -154,64 +158,20 @@ def main():
         add_help=False
     )
     parser.add_argument('command', nargs='?', default='help')
-    parser.add_argument('args', nargs='*')
+    parser.add_argument('args', nargs=argparse.REMAINDER)
     
     args = parser.parse_args()
     command = args.command.lower()
     command_args = args.args
     
-    try:
-        # Execute command
-        if command == 'help' or command == '-h' or command == '--help':
-            print_help()
-        
-        elif command == 'search':
-            if not command_args:
-                print(f"{Colors.RED}❌ Search term required!{Colors.RESET}")
-                print(f"{Colors.YELLOW}Usage: kb search 'term'{Colors.RESET}")
-                sys.exit(1)
-            search_term = ' '.join(command_args)
-            search_kb(search_term)
-        
-        elif command == 'add':
-            add_entry()
-        
-        elif command == 'index':
-            update_index()
-        
-        elif command == 'stats':
-            show_stats()
-        
-        elif command == 'list':
-            category = command_args[0] if command_args else None
-            list_entries(category)
-        
-        elif command == 'recent':
-            count = int(command_args[0]) if command_args else 10
-            list_entries(recent=count)
-        
-        elif command == 'compound':
-            if not command_args:
-                print(f"{Colors.RED}❌ Compound action required!{Colors.RESET}")
-                print(f"{Colors.YELLOW}Usage: kb compound [search|add|sync|query|stats]{Colors.RESET}")
-                sys.exit(1)
-            
-            action = command_args[0].lower()
-            action_args = command_args[1:] if len(command_args) > 1 else []
-            
-            if action in ['search', 'query'] and not action_args:
-                print(f"{Colors.RED}❌ Search/Query term required!{Colors.RESET}")
-                sys.exit(1)
-            
-            search_term = ' '.join(action_args) if action_args else None
-            compound_operation(action, search_term)
-        
-        else:
-            print(f"{Colors.RED}❌ Unknown command: {command}{Colors.RESET}")
-            print()
-            print_help()
-            sys.exit(1)
+    # Forward read-only commands to a running `kb serve` daemon (KB_NO_DAEMON=1 to skip)
+    if command not in ('help', '-h', '--help', 'serve') and not os.environ.get('KB_NO_DAEMON'):
+        exit_code = load_command('kb_serve', 'forward')([command] + command_args)
+        if exit_code is not None:
+            sys.exit(exit_code)
     
+    try:
+        run_command(command, command_args)
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}⚠️  Operation cancelled by user{Colors.RESET}")
         sys.exit(0)
@@ -222,5 +182,83 @@ def main():
         sys.exit(1)
 
 
+def run_command(command: str, command_args: list):
+    """Execute a KB command (also called in-process by the `kb serve` daemon)"""
+    # Execute command
+    if command == 'help' or command == '-h' or command == '--help':
+        print_help()
+    
+    elif command == 'search':
+        search_parser = argparse.ArgumentParser(prog='kb search', add_help=False)
+        search_parser.add_argument('terms', nargs='*')
+        search_parser.add_argument('--rank', action='store_true')
+        search_parser.add_argument('--top', type=int, default=10)
+        search_parser.add_argument('--limit', type=int, default=None)
+        search_parser.add_argument('--json', action='store_true')
+        search_args = search_parser.parse_args(command_args)
+        
+        if not search_args.terms:
+            print(f"{Colors.RED}❌ Search term required!{Colors.RESET}")
+            print(f"{Colors.YELLOW}Usage: kb search 'term' [--rank] [--top N] [--limit N] [--json]{Colors.RESET}")
+            sys.exit(1)
+        search_term = ' '.join(search_args.terms)
+        search_kb = load_command('kb_search', 'search_kb')
+        search_kb(search_term, ranked=search_args.rank, top_k=search_args.top,
+                  limit=search_args.limit, as_json=search_args.json)
+    
+    elif command == 'add':
+        load_command('kb_add', 'add_entry')()
+    
+    elif command in ('index', 'update-index'):
+        index_parser = argparse.ArgumentParser(prog='kb index', add_help=False)
+        index_parser.add_argument('--full', action='store_true')
+        index_parser.add_argument('--jobs', type=int, default=1)
+        index_args = index_parser.parse_args(command_args)
+        update_index = load_command('kb_index', 'update_index')
+        update_index(full=index_args.full, jobs=index_args.jobs)
+    
+    elif command == 'stats':
+        stats_parser = argparse.ArgumentParser(prog='kb stats', add_help=False)
+        stats_parser.add_argument('--jobs', type=int, default=1)
+        stats_args = stats_parser.parse_args(command_args)
+        load_command('kb_stats', 'show_stats')(jobs=stats_args.jobs)
+    
+    elif command == 'list':
+        category = command_args[0] if command_args else None
+        load_command('kb_list', 'list_entries')(category)
+    
+    elif command == 'recent':
+        count = int(command_args[0]) if command_args else 10
+        load_command('kb_list', 'list_entries')(recent=count)
+    
+    elif command == 'compound':
+        if not command_args:
+            print(f"{Colors.RED}❌ Compound action required!{Colors.RESET}")
+            print(f"{Colors.YELLOW}Usage: kb compound [search|add|sync|query|stats]{Colors.RESET}")
+            sys.exit(1)
+        
+        action = command_args[0].lower()
+        action_args = command_args[1:] if len(command_args) > 1 else []
+        
+        if action in ['search', 'query'] and not action_args:
+            print(f"{Colors.RED}❌ Search/Query term required!{Colors.RESET}")
+            sys.exit(1)
+        
+        search_term = ' '.join(action_args) if action_args else None
+        load_command('kb_compound', 'compound_operation')(action, search_term)
+    
+    elif command == 'serve':
+        if '--stop' in command_args:
+            load_command('kb_serve', 'stop_server')()
+        else:
+            load_command('kb_serve', 'serve')(run_command)
+    
+    else:
+        print(f"{Colors.RED}❌ Unknown command: {command}{Colors.RESET}")
+        print()
+        print_help()
+        sys.exit(1)
+
+
 if __name__ == '__main__':
     main()
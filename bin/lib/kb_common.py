@@ -8,7 +8,7 @@ import re
 import platform
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 
 class KBConfig:
@@ -109,7 +109,17 @@ def parse_frontmatter(content: str) -> Dict:
         frontmatter = frontmatter_match.group(1)
         
         # Parse simple YAML
+        list_key = None
         for line in frontmatter.split('\n'):
+            # Handle block arrays ("- item" lines under an empty key)
+            item = line.strip()
+            if list_key and item.startswith('- '):
+                if not isinstance(metadata[list_key], list):
+                    metadata[list_key] = []
+                metadata[list_key].append(item[2:].strip().strip('"\''))
+                continue
+            list_key = None
+            
             if ':' in line:
                 key, value = line.split(':', 1)
                 key = key.strip()
@@ -118,33 +128,68 @@ def parse_frontmatter(content: str) -> Dict:
                 # Handle arrays
                 if value.startswith('[') and value.endswith(']'):
                     value = [v.strip().strip('"\'') for v in value[1:-1].split(',')]
+                elif not value:
+                    list_key = key
                 
                 metadata[key] = value
     
     return metadata
 
 
+def read_frontmatter(path: str) -> Optional[Dict]:
+    """Parsed frontmatter of a file via the shared corpus (None if unreadable)
+
+    Re-read only when the file changed since it was last parsed.
+    """
+    from kb_corpus import get_corpus
+    entry = get_corpus().entry(Path(path))
+    if not entry.load():
+        return None
+    return dict(entry.metadata)
+
+
+def map_parallel(func: Callable, items: List, jobs: int = 1) -> List:
+    """Map func over items, on a process pool in chunks when jobs > 1
+
+    Results keep the order of items, so merging them is deterministic.
+    func must be a module-level function (it is pickled). jobs=0 uses all cores.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(items))
+    if jobs <= 1:
+        return [func(item) for item in items]
+    
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(items) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(func, items, chunksize=chunksize))
+
+
 def get_kb_entries(kb_path: Path, pattern: str = "KB-*.md") -> List[Path]:
-    """Get all KB entries"""
-    return list(kb_path.rglob(pattern))
+    """Get all KB entries (walked once via the shared corpus)"""
+    from kb_corpus import get_corpus
+    return [entry.path for entry in get_corpus().files(kb_path, pattern)]
 
 
 def get_all_kb_entries(paths: List[Path]) -> List[Path]:
-    """Get all KB entries from multiple paths"""
+    """Get all KB entries from multiple paths (walked once via the shared corpus)"""
+    from kb_corpus import get_corpus
+    corpus = get_corpus()
+    
     entries = []
     for path in paths:
-        if path.exists():
-            # Get KB-*.md files from knowledge-base
-            if path.name == "knowledge-base":
-                entries.extend(list(path.rglob("KB-*.md")))
-            
-            # Get all markdown files from docs/ (excluding sprints)
-            elif path.name == "docs":
-                for md_file in path.rglob("*.md"):
-                    # Skip sprint artifacts
-                    if "sprints" in str(md_file):
-                        continue
-                    entries.append(md_file)
+        # Get KB-*.md files from knowledge-base
+        if path.name == "knowledge-base":
+            entries.extend(entry.path for entry in corpus.files(path, "KB-*.md"))
+        
+        # Get all markdown files from docs/ (excluding sprints)
+        elif path.name == "docs":
+            for entry in corpus.files(path):
+                # Skip sprint artifacts
+                if "sprints" in str(entry.path):
+                    continue
+                entries.append(entry.path)
     
     return entries
 
@@ -10,10 +10,6 @@ from pathlib import Path
 from kb_common import (
     KBConfig, Colors, print_header, print_success, print_warning, print_error, print_separator
 )
-from kb_search import search_kb
-from kb_add import add_entry
-from kb_index import update_index
-from kb_stats import show_stats
 
 
 def compound_operation(action: str, search_term: str = None):
@@ -75,6 +71,8 @@ def run_neo4j_script(config: KBConfig, script_name: str, args: list = None) -> b
 
 def compound_search(config: KBConfig, search_term: str):
     """Compound search: Neo4j + File system"""
+    from kb_search import search_kb
+    
     print(f"{Colors.CYAN}🔍 Compound Search: '{search_term}'{Colors.RESET}")
     print()
     
@@ -110,6 +108,9 @@ def compound_search(config: KBConfig, search_term: str):
 
 def compound_add(config: KBConfig):
     """Compound add: Create + Index + Sync"""
+    from kb_add import add_entry
+    from kb_index import update_index
+    
     print(f"{Colors.CYAN}➕ Adding New Knowledge Entry{Colors.RESET}")
     print()
     
@@ -150,6 +151,9 @@ def compound_add(config: KBConfig):
 
 def compound_sync(config: KBConfig):
     """Compound sync: Index + Neo4j + Stats"""
+    from kb_index import update_index
+    from kb_stats import show_stats
+    
     print(f"{Colors.CYAN}🔄 Full Compound Sync{Colors.RESET}")
     print()
     
@@ -217,6 +221,8 @@ def compound_query(config: KBConfig, query_term: str):
 
 def compound_stats(config: KBConfig):
     """Compound stats: File system + Neo4j"""
+    from kb_stats import show_stats
+    
     print(f"{Colors.CYAN}📊 Compound System Health{Colors.RESET}")
     print()
     
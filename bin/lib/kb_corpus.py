@@ -0,0 +1,195 @@
+"""
+KB Corpus Module
+Single-pass loader for KB entries and project docs shared by all consumers
+"""
+
+import os
+import re
+import mmap
+import threading
+from dataclasses import dataclass
+from pathlib import Path, PurePath
+from typing import Dict, List, Optional, Pattern, Tuple
+from kb_common import parse_frontmatter
+
+
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__'}
+FRONTMATTER_RE = re.compile(r'^---\s*\n.*?\n---\s*\n', re.DOTALL)
+
+
+@dataclass
+class CorpusEntry:
+    """A markdown file in the corpus, read and parsed on first use"""
+    __slots__ = ('path', 'stamp', 'content', 'metadata', 'error')
+    path: Path
+    stamp: Optional[Tuple[int, int]]
+    content: Optional[str]
+    metadata: Optional[Dict]
+    error: Optional[str]
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def body(self) -> str:
+        """Content without the frontmatter block"""
+        return FRONTMATTER_RE.sub('', self.content or '', count=1).strip()
+
+    def load(self) -> bool:
+        """Read and parse the file unless it is unchanged since the last load
+
+        Returns False if the file could not be read (see error).
+        """
+        try:
+            stat = self.path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if stamp != self.stamp:
+                self.content = self.path.read_text(encoding='utf-8')
+                self.metadata = parse_frontmatter(self.content)
+                self.stamp = stamp
+                self.error = None
+        except (OSError, UnicodeDecodeError) as e:
+            self.stamp = self.content = self.metadata = None
+            self.error = str(e)
+        return self.error is None
+
+
+class Corpus:
+    """Walk cache for markdown trees
+
+    Each requested directory is walked once per process; later requests for
+    it (or anything below it) are answered from the cache. A tree is only
+    re-walked when one of its directories changed (files added or removed),
+    and an entry is only re-read when its own mtime or size changed.
+    Lookups are serialised, so threads of one process can share the cache.
+    """
+
+    def __init__(self):
+        self.trees: Dict[Path, Dict[str, int]] = {}
+        self.entries: Dict[Path, Dict[str, CorpusEntry]] = {}
+        self.lock = threading.RLock()
+
+    def clear(self):
+        """Forget all walked trees"""
+        with self.lock:
+            self.trees.clear()
+            self.entries.clear()
+
+    def files(self, directory: Path, pattern: str = '*.md') -> List[CorpusEntry]:
+        """Entries below directory matching pattern (rglob semantics), in path order"""
+        directory = Path(directory)
+        if not directory.is_dir():
+            return []
+
+        key = directory.resolve()
+        with self.lock:
+            tree = self._tree_for(key)
+            if tree is None:
+                tree = self._walk(directory, key)
+            elif self._stale(tree):
+                tree = self._walk(tree, tree)
+            tree_entries = list(self.entries[tree].items())
+
+        prefix = str(key)
+        matches = []
+        for resolved, entry in tree_entries:
+            if resolved != prefix and not resolved.startswith(prefix + os.sep):
+                continue
+            if PurePath(os.path.relpath(resolved, prefix)).match(pattern):
+                matches.append(entry)
+        matches.sort(key=lambda entry: str(entry.path))
+        return matches
+
+    def entry(self, path: Path) -> CorpusEntry:
+        """Cached entry for a file (a fresh one if it is not in a walked tree)"""
+        resolved = Path(path).resolve()
+        with self.lock:
+            tree = self._tree_for(resolved)
+            entry = self.entries[tree].get(str(resolved)) if tree is not None else None
+        if entry is not None:
+            return entry
+        return CorpusEntry(Path(path), None, None, None, None)
+
+    def _tree_for(self, key: Path) -> Optional[Path]:
+        for tree in self.trees:
+            if key == tree or tree in key.parents:
+                return tree
+        return None
+
+    def _stale(self, tree: Path) -> bool:
+        for dir_path, mtime in self.trees[tree].items():
+            try:
+                if os.stat(dir_path).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _walk(self, directory: Path, key: Path) -> Path:
+        # Reuse entries (and their parsed content) from any overlapping tree
+        known: Dict[str, CorpusEntry] = {}
+        for tree in [t for t in self.trees if t == key or key in t.parents or t in key.parents]:
+            known.update(self.entries.pop(tree))
+            del self.trees[tree]
+
+        dir_mtimes: Dict[str, int] = {}
+        entries: Dict[str, CorpusEntry] = {}
+        for dir_path, dir_names, file_names in os.walk(directory):
+            dir_names[:] = [name for name in dir_names if name not in SKIP_DIRS]
+            resolved_dir = str(key / os.path.relpath(dir_path, directory))
+            try:
+                dir_mtimes[os.path.normpath(resolved_dir)] = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                continue
+            for name in file_names:
+                if not name.endswith('.md'):
+                    continue
+                resolved = os.path.normpath(os.path.join(resolved_dir, name))
+                entry = known.get(resolved)
+                if entry is None:
+                    entry = CorpusEntry(Path(dir_path) / name, None, None, None, None)
+                entries[resolved] = entry
+
+        self.trees[key] = dir_mtimes
+        self.entries[key] = entries
+        return key
+
+
+def compile_prefilter(search_term: str) -> Optional[Pattern]:
+    """Case-insensitive bytes pattern for file_matches (None if not ASCII)
+
+    Bytes IGNORECASE only folds ASCII, so non-ASCII terms are not pre-filtered.
+    """
+    try:
+        term = search_term.encode('ascii')
+    except UnicodeEncodeError:
+        return None
+    return re.compile(re.escape(term), re.IGNORECASE)
+
+
+def file_matches(path: Path, prefilter: Optional[Pattern]) -> bool:
+    """Search a memory-mapped file for the pattern without decoding it
+
+    Lets callers skip reading, parsing and splitting non-matching files.
+    Always True when there is no pattern.
+    """
+    if prefilter is None:
+        return True
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return prefilter.search(mapped) is not None
+    except ValueError:
+        # Empty files cannot be mapped (and cannot match)
+        return False
+    except OSError:
+        return False
+
+
+_corpus = Corpus()
+
+
+def get_corpus() -> Corpus:
+    """Process-wide corpus shared by every KB consumer"""
+    return _corpus
@@ -6,35 +6,34 @@ Cross-platform INDEX.md generation
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+from typing import Dict
 from kb_common import (
     KBConfig, Colors, parse_frontmatter, get_kb_entries, get_all_kb_entries,
     print_header, print_success, get_priority_icon, get_category_icon
 )
+from kb_manifest import EntryManifest
+from kb_search_index import load_search_index
 
 
-def update_index():
-    """Update INDEX.md"""
+def update_index(full: bool = False, jobs: int = 1, quiet: bool = False) -> Dict[str, int]:
+    """Update INDEX.md (only changed entries are re-parsed unless full=True)
+
+    jobs > 1 parses changed entries on a process pool (0 = all cores).
+    quiet=True skips the report (for watchers); the counts are returned.
+    """
     config = KBConfig()
     Colors.enable_windows()
     
-    print_header("📇 Updating Knowledge Base Index", "Scanning KB + docs directories...")
+    if not quiet:
+        print_header("📇 Updating Knowledge Base Index", "Scanning KB + docs directories...")
     
     all_paths = config.get_all_kb_paths()
     entries = get_all_kb_entries(all_paths)
     
-    # Parse all entries
-    parsed_entries = []
-    for entry_path in entries:
-        try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
-            
-            if metadata:
-                metadata['path'] = entry_path
-                metadata['filename'] = entry_path.name
-                parsed_entries.append(metadata)
-        except Exception as e:
-            continue
+    # Refresh cached metadata (manifest keeps mtime/size/hash per file)
+    manifest = EntryManifest(config) if full else EntryManifest.load(config)
+    reparsed, removed = manifest.refresh(entries, jobs)
+    parsed_entries = manifest.parsed_entries()
     
     # Group entries
     by_category = defaultdict(list)
@@ -50,20 +49,44 @@ def update_index():
         by_priority[priority].append(entry)
         by_date[date].append(entry)
     
-    # Generate INDEX.md
-    index_content = generate_index_content(parsed_entries, by_category, by_priority, by_date)
-    
-    # Write INDEX.md
+    # Generate and write INDEX.md only when entry metadata changed
     index_path = config.get_index_path()
-    index_path.write_text(index_content, encoding='utf-8')
+    index_changed = bool(reparsed or removed) or not index_path.exists()
+    if index_changed:
+        index_content = generate_index_content(parsed_entries, by_category, by_priority, by_date)
+        index_path.write_text(index_content, encoding='utf-8')
+    if manifest.dirty:
+        manifest.save()
+    
+    # Keep the search index in sync
+    search_index = load_search_index(config, refresh=False)
+    reindexed, unindexed = search_index.refresh(entries)
+    search_index.close()
+    
+    summary = {
+        'entries': len(parsed_entries),
+        'reparsed': len(reparsed),
+        'removed': len(removed),
+        'index_changed': index_changed,
+        'reindexed': reindexed,
+        'unindexed': unindexed,
+    }
+    if quiet:
+        return summary
     
-    print_success(f"INDEX.md Updated Successfully!")
+    if index_changed:
+        print_success(f"INDEX.md Updated Successfully!")
+    else:
+        print_success(f"INDEX.md is already up to date")
     print()
     print(f"{Colors.CYAN}📊 Statistics:{Colors.RESET}")
     print(f"   Total Entries: {len(parsed_entries)}")
+    print(f"   Re-parsed: {len(reparsed)} of {len(entries)} files ({len(removed)} removed)")
     print(f"   Categories: {len(by_category)}")
     print(f"   Priorities: {len(by_priority)}")
+    print(f"   Search Index: {reindexed} re-indexed, {unindexed} removed")
     print()
+    return summary
 
 
 def generate_index_content(entries, by_category, by_priority, by_date):
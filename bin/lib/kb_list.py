@@ -5,7 +5,7 @@ Cross-platform entry listing
 
 from pathlib import Path
 from kb_common import (
-    KBConfig, Colors, parse_frontmatter, get_kb_entries, format_time_ago,
+    KBConfig, Colors, read_frontmatter, get_kb_entries, format_time_ago,
     print_header, get_priority_icon, get_category_icon
 )
 
@@ -42,8 +42,9 @@ def list_all_entries(config: KBConfig):
     
     for entry_path in sorted_entries:
         try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
+            metadata = read_frontmatter(str(entry_path))
+            if metadata is None:
+                continue
             
             title = metadata.get('title', 'Unknown')
             priority = metadata.get('priority', 'unknown')
@@ -84,7 +85,7 @@ def list_by_category(config: KBConfig, category: str):
                 print(f"  - {cat_dir.name}")
         return
     
-    entries = list(category_path.rglob('KB-*.md'))
+    entries = get_kb_entries(category_path)
     
     if not entries:
         print(f"{Colors.YELLOW}No entries found in category: {category}{Colors.RESET}")
@@ -95,8 +96,9 @@ def list_by_category(config: KBConfig, category: str):
     
     for entry_path in sorted(entries, key=lambda x: x.name, reverse=True):
         try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
+            metadata = read_frontmatter(str(entry_path))
+            if metadata is None:
+                continue
             
             title = metadata.get('title', 'Unknown')
             priority = metadata.get('priority', 'unknown')
@@ -127,8 +129,9 @@ def list_recent_entries(config: KBConfig, count: int):
     
     for entry_path in sorted_entries:
         try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
+            metadata = read_frontmatter(str(entry_path))
+            if metadata is None:
+                continue
             
             title = metadata.get('title', 'Unknown')
             category = metadata.get('category', 'unknown')
@@ -0,0 +1,150 @@
+"""
+KB Manifest Module
+Cached entry metadata for incremental index rebuilds
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from kb_common import KBConfig, parse_frontmatter, map_parallel
+
+
+MANIFEST_VERSION = 1
+MANIFEST_FILENAME = ".index-manifest.json"
+
+
+def content_hash(content: str) -> str:
+    """Hash entry content for change detection"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+def load_entry(job: Tuple[str, Optional[str]]) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Read and hash an entry, parsing it only if the hash differs from the known one
+
+    Returns (hash, metadata or None if unchanged), or None if unreadable.
+    """
+    path, known_hash = job
+    try:
+        content = Path(path).read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+    
+    digest = content_hash(content)
+    if digest == known_hash:
+        return digest, None
+    return digest, parse_frontmatter(content)
+
+
+class EntryManifest:
+    """Path -> (mtime, size, content hash, parsed frontmatter) cache
+
+    A file is re-read only when its mtime or size changed, and re-parsed
+    only when its content hash changed as well.
+    """
+
+    def __init__(self, config: KBConfig):
+        self.config = config
+        self.path = config.get_kb_path() / MANIFEST_FILENAME
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, config: KBConfig) -> 'EntryManifest':
+        """Load manifest from disk (empty manifest if missing or outdated)"""
+        manifest = cls(config)
+        if not manifest.path.exists():
+            return manifest
+
+        try:
+            data = json.loads(manifest.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return manifest
+
+        if data.get('version') == MANIFEST_VERSION:
+            manifest.entries = data.get('entries', {})
+        return manifest
+
+    def save(self):
+        """Write manifest to disk atomically"""
+        data = {'version': MANIFEST_VERSION, 'entries': self.entries}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(data, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def relative(self, entry_path: Path) -> str:
+        """Manifest key for an entry path"""
+        try:
+            return entry_path.relative_to(self.config.root_dir).as_posix()
+        except ValueError:
+            return entry_path.as_posix()
+
+    def refresh(self, entries: List[Path], jobs: int = 1) -> Tuple[List[str], List[str]]:
+        """Sync manifest with the given entry paths
+
+        Changed files are read and parsed on a process pool when jobs > 1.
+        Returns (re-parsed paths, removed paths).
+        """
+        seen = set()
+        changed = []
+
+        for entry_path in entries:
+            key = self.relative(entry_path)
+            seen.add(key)
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+
+            cached = self.entries.get(key)
+            if cached and cached['mtime'] == stat.st_mtime and cached['size'] == stat.st_size:
+                continue
+            changed.append((key, entry_path, stat, cached))
+
+        results = map_parallel(
+            load_entry,
+            [(str(entry_path), cached['hash'] if cached else None) for _, entry_path, _, cached in changed],
+            jobs
+        )
+
+        reparsed = []
+        for (key, _, stat, cached), result in zip(changed, results):
+            if result is None:
+                continue
+
+            digest, metadata = result
+            if metadata is None:
+                metadata = cached['metadata']
+            else:
+                reparsed.append(key)
+
+            self.entries[key] = {
+                'mtime': stat.st_mtime,
+                'size': stat.st_size,
+                'hash': digest,
+                'metadata': metadata,
+            }
+            self.dirty = True
+
+        removed = [key for key in self.entries if key not in seen]
+        for key in removed:
+            del self.entries[key]
+        if removed:
+            self.dirty = True
+
+        return reparsed, removed
+
+    def parsed_entries(self) -> List[Dict]:
+        """Cached metadata for entries with frontmatter, in path order"""
+        parsed = []
+        for key in sorted(self.entries):
+            metadata = self.entries[key]['metadata']
+            if metadata:
+                entry = dict(metadata)
+                entry['path'] = self.config.root_dir / key
+                entry['filename'] = entry['path'].name
+                parsed.append(entry)
+        return parsed
@@ -4,32 +4,54 @@ Cross-platform search functionality
 """
 
 import re
+import sys
+import json
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional
 from kb_common import (
     KBConfig, Colors, parse_frontmatter, get_kb_entries, get_all_kb_entries,
     print_header, print_success, print_warning, get_priority_icon
 )
+from kb_corpus import compile_prefilter, file_matches
+from kb_search_index import load_search_index
 
 
-def search_kb(search_term: str):
-    """Search knowledge base"""
+def search_kb(search_term: str, ranked: bool = False, top_k: int = 10,
+              limit: Optional[int] = None, as_json: bool = False):
+    """Search knowledge base, printing file results as they are found
+    
+    ranked=True orders file results by BM25, limit stops scanning after that
+    many file results, and as_json prints one JSON object per result (NDJSON)
+    instead of the coloured report.
+    """
     config = KBConfig()
+    
+    if as_json:
+        for result in iter_file_results(config, search_term, ranked, top_k, limit):
+            print(json.dumps(result_to_json(config, result), ensure_ascii=False))
+            sys.stdout.flush()
+        return
+    
     Colors.enable_windows()
     
     print_header(
         f"🔍 Searching Knowledge Base for: '{search_term}'",
-        "File System Search"
+        "File System Search (BM25 ranked)" if ranked else "File System Search"
     )
     
     # Search INDEX.md first
     results_from_index = search_index(config, search_term)
     
-    # Search all KB files
-    results_from_files = search_files(config, search_term)
+    # Search all KB files, streaming results (inverted index, full scan as fallback)
+    file_count = 0
+    for result in iter_file_results(config, search_term, ranked, top_k, limit):
+        print_file_result(config, result)
+        sys.stdout.flush()
+        file_count += 1
     
     # Display results
-    total_results = len(results_from_index) + len(results_from_files)
+    total_results = len(results_from_index) + file_count
     
     if total_results == 0:
         print_warning(f"No results found for '{search_term}'")
@@ -42,6 +64,8 @@ def search_kb(search_term: str):
     else:
         print()
         print(f"{Colors.GREEN}📊 Search Results: {total_results} entries found{Colors.RESET}")
+        if limit is not None and file_count >= limit:
+            print(f"{Colors.GRAY}   (stopped after {limit} file results, --limit){Colors.RESET}")
     
     print()
 
@@ -70,52 +94,154 @@ def search_index(config: KBConfig, search_term: str) -> List[str]:
     return results
 
 
-def search_files(config: KBConfig, search_term: str) -> List[Dict]:
-    """Search all KB files (KB + docs)"""
+def iter_file_results(config: KBConfig, search_term: str, ranked: bool = False,
+                      top_k: int = 10, limit: Optional[int] = None) -> Iterator[Dict]:
+    """Yield file search results lazily, stopping after limit results"""
+    if ranked:
+        results = iter_ranked_files(config, search_term, top_k)
+    else:
+        results = iter_indexed_files(config, search_term)
+        if results is None:
+            results = iter_files(config, search_term)
+    
+    if limit is not None:
+        results = islice(results, limit)
+    return results
+
+
+def iter_indexed_files(config: KBConfig, search_term: str) -> Optional[Iterator[Dict]]:
+    """Yield KB file matches through the persistent inverted index
+    
+    Returns None when the term cannot be answered from the index.
+    """
+    try:
+        index = load_search_index(config)
+    except OSError:
+        return None
+    
+    matches = index.iter_search(search_term)
+    if matches is None:
+        index.close()
+        return None
+    return _closing(index, matches)
+
+
+def iter_ranked_files(config: KBConfig, search_term: str, top_k: int = 10) -> Iterator[Dict]:
+    """Yield the top_k KB files by BM25 score"""
+    index = load_search_index(config)
+    results = index.ranked_search(search_term, top_k)
+    index.close()
+    return iter(results)
+
+
+def iter_files(config: KBConfig, search_term: str) -> Iterator[Dict]:
+    """Yield matches from a full scan of all KB files (KB + docs)"""
     all_paths = config.get_all_kb_paths()
     entries = get_all_kb_entries(all_paths)
     
-    results = []
     pattern = re.compile(re.escape(search_term), re.IGNORECASE)
+    prefilter = compile_prefilter(search_term)
     
     for entry_path in entries:
+        # Cheap mmap scan first; only matching files are decoded and parsed
+        if not file_matches(entry_path, prefilter):
+            continue
+        
         try:
             content = entry_path.read_text(encoding='utf-8')
-            
-            # Check if term is in content
-            if pattern.search(content):
-                metadata = parse_frontmatter(content)
-                
-                # Extract context (line with match)
-                context_lines = []
-                for line in content.split('\n'):
-                    if pattern.search(line):
-                        context_lines.append(line.strip())
-                        if len(context_lines) >= 3:
-                            break
-                
-                results.append({
-                    'path': entry_path,
-                    'title': metadata.get('title', 'Unknown'),
-                    'category': metadata.get('category', 'unknown'),
-                    'priority': metadata.get('priority', 'unknown'),
-                    'context': context_lines
-                })
         except Exception as e:
             continue
-    
-    # Display file results
-    if results:
-        for i, result in enumerate(results, 1):
-            icon = get_priority_icon(result['priority'])
-            print(f"{Colors.GREEN}✅ Found: {result['title']}{Colors.RESET}")
-            print(f"   {icon} File: {result['path'].relative_to(config.root_dir)}")
-            print(f"   Category: {result['category']} | Priority: {result['priority']}")
+        
+        # Check if term is in content
+        if pattern.search(content):
+            metadata = parse_frontmatter(content)
+            
+            # Extract context (line with match)
+            context_lines = []
+            for line in content.split('\n'):
+                if pattern.search(line):
+                    context_lines.append(line.strip())
+                    if len(context_lines) >= 3:
+                        break
             
-            if result['context']:
-                print(f"   {Colors.CYAN}Context:{Colors.RESET}")
-                for ctx in result['context'][:2]:
-                    print(f"     {ctx[:80]}...")
-            print()
+            yield {
+                'path': entry_path,
+                'title': metadata.get('title', 'Unknown'),
+                'category': metadata.get('category', 'unknown'),
+                'priority': metadata.get('priority', 'unknown'),
+                'context': context_lines
+            }
+
+
+def _closing(index, results: Iterator[Dict]) -> Iterator[Dict]:
+    """Close the index once the results are exhausted or abandoned"""
+    try:
+        yield from results
+    finally:
+        index.close()
+
+
+def search_indexed_files(config: KBConfig, search_term: str) -> Optional[List[Dict]]:
+    """Search KB files through the persistent inverted index"""
+    matches = iter_indexed_files(config, search_term)
+    if matches is None:
+        return None
     
+    results = list(matches)
+    print_file_results(config, results)
     return results
+
+
+def search_ranked_files(config: KBConfig, search_term: str, top_k: int = 10) -> List[Dict]:
+    """Search KB files and return the top_k by BM25 score"""
+    results = list(iter_ranked_files(config, search_term, top_k))
+    print_file_results(config, results)
+    return results
+
+
+def search_files(config: KBConfig, search_term: str) -> List[Dict]:
+    """Search all KB files (KB + docs)"""
+    results = list(iter_files(config, search_term))
+    print_file_results(config, results)
+    return results
+
+
+def result_to_json(config: KBConfig, result: Dict) -> Dict:
+    """JSON-serialisable form of a file result (path relative to project root)"""
+    try:
+        path = result['path'].relative_to(config.root_dir).as_posix()
+    except ValueError:
+        path = result['path'].as_posix()
+    
+    data = {
+        'path': path,
+        'title': result['title'],
+        'category': result['category'],
+        'priority': result['priority'],
+        'context': result['context'],
+    }
+    if 'score' in result:
+        data['score'] = round(result['score'], 6)
+    return data
+
+
+def print_file_results(config: KBConfig, results: List[Dict]):
+    """Display file search results"""
+    for result in results:
+        print_file_result(config, result)
+
+
+def print_file_result(config: KBConfig, result: Dict):
+    """Display a single file search result"""
+    icon = get_priority_icon(result['priority'])
+    print(f"{Colors.GREEN}✅ Found: {result['title']}{Colors.RESET}")
+    if 'score' in result:
+        print(f"   {Colors.MAGENTA}Score: {result['score']:.3f}{Colors.RESET}")
+    print(f"   {icon} File: {result['path'].relative_to(config.root_dir)}")
+    print(f"   Category: {result['category']} | Priority: {result['priority']}")
+    
+    if result['context']:
+        print(f"   {Colors.CYAN}Context:{Colors.RESET}")
+        for ctx in result['context'][:2]:
+            print(f"     {ctx[:80]}...")
+    print()
@@ -0,0 +1,478 @@
+"""
+KB Search Index Module
+Persistent inverted index for fast file system search
+"""
+
+import os
+import re
+import math
+import heapq
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from kb_common import KBConfig, parse_frontmatter, get_all_kb_entries
+
+
+INDEX_VERSION = 3
+INDEX_FILENAME = ".search-index.db"
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9_]+')
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase index terms"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """On-disk inverted index: term -> postings (doc id, term frequency, line numbers)
+
+    Stored in SQLite so a query only reads the postings it needs. Documents
+    are tracked by path relative to the project root together with the
+    mtime/size seen at indexing time and their token count (for BM25 length
+    normalization), so `refresh()` only re-reads files that were added or
+    changed since the last run. Per-term document frequencies are kept in
+    the `terms` table (BM25 idf), and every suffix of every term in the
+    `suffixes` table, so the terms containing a query token are one indexed
+    range scan (a substring of a term is a prefix of one of its suffixes).
+    """
+
+    def __init__(self, config: KBConfig, conn: sqlite3.Connection, path: Optional[Path] = None):
+        self.config = config
+        self.conn = conn
+        self.path = path
+        # Kept open by load_search_index() in a resident process (see keep_resident())
+        self.resident = False
+        self._stat = self._file_stat()
+
+    # ==================== PERSISTENCE ====================
+
+    @classmethod
+    def load(cls, config: KBConfig) -> 'SearchIndex':
+        """Open the index (recreated if missing or outdated)"""
+        path = config.get_kb_path() / INDEX_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path))
+
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            conn.close()
+            path.unlink()
+            conn = sqlite3.connect(str(path))
+            version = 0
+
+        if version != INDEX_VERSION:
+            conn.executescript("""
+                DROP TABLE IF EXISTS docs;
+                DROP TABLE IF EXISTS postings;
+                DROP TABLE IF EXISTS terms;
+                DROP TABLE IF EXISTS suffixes;
+                CREATE TABLE docs (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    mtime REAL,
+                    size INTEGER,
+                    length INTEGER,
+                    title TEXT,
+                    category TEXT,
+                    priority TEXT
+                );
+                CREATE TABLE postings (
+                    term TEXT NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    lines TEXT NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX postings_doc ON postings (doc_id);
+                CREATE TABLE terms (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE suffixes (
+                    suffix TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    PRIMARY KEY (suffix, term)
+                ) WITHOUT ROWID;
+            """)
+            conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            conn.commit()
+
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return cls(config, conn, path)
+
+    def save(self):
+        """Commit pending changes"""
+        self.conn.commit()
+
+    def close(self):
+        """Close the index database (a resident index stays open)"""
+        if not self.resident:
+            self.conn.close()
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except (AttributeError, OSError):
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def modified(self) -> bool:
+        """Check if the database file was replaced or written since the last mark()"""
+        return self._stat is None or self._file_stat() != self._stat
+
+    def mark(self):
+        """Remember the database file as it is now (after this connection's own writes)"""
+        self._stat = self._file_stat()
+
+    # ==================== MAINTENANCE ====================
+
+    def refresh(self, entries: Optional[List[Path]] = None) -> Tuple[int, int]:
+        """Bring index in sync with the file system
+
+        Returns (files re-indexed, files removed).
+        """
+        if entries is None:
+            entries = get_all_kb_entries(self.config.get_all_kb_paths())
+
+        known = {
+            path: (doc_id, mtime, size)
+            for doc_id, path, mtime, size in self.conn.execute(
+                "SELECT id, path, mtime, size FROM docs"
+            )
+        }
+
+        seen = set()
+        changed = []
+        for entry_path in entries:
+            rel_path = self._relative(entry_path)
+            seen.add(rel_path)
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+
+            doc = known.get(rel_path)
+            if doc and doc[1] == stat.st_mtime and doc[2] == stat.st_size:
+                continue
+            changed.append((entry_path, rel_path, stat))
+
+        removed = [path for path in known if path not in seen]
+        stale_ids = [known[path][0] for path in removed]
+        stale_ids.extend(known[rel][0] for _, rel, _ in changed if rel in known)
+
+        # Document frequencies are applied once per refresh, not per file
+        df_delta = Counter()
+        self._drop_docs(stale_ids, df_delta)
+
+        for entry_path, rel_path, stat in changed:
+            try:
+                content = entry_path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+            df_delta.update(self._add_doc(rel_path, content, stat))
+
+        self._apply_df(df_delta)
+        self.save()
+        return len(changed), len(removed)
+
+    def _relative(self, entry_path: Path) -> str:
+        try:
+            return entry_path.relative_to(self.config.root_dir).as_posix()
+        except ValueError:
+            return entry_path.as_posix()
+
+    def _add_doc(self, rel_path: str, content: str, stat: os.stat_result) -> List[str]:
+        """Insert a document and its postings, returning its distinct terms"""
+        metadata = parse_frontmatter(content)
+
+        occurrences: Dict[str, List[int]] = {}
+        length = 0
+        for line_no, line in enumerate(content.split('\n')):
+            for term in tokenize(line):
+                occurrences.setdefault(term, []).append(line_no)
+                length += 1
+
+        cursor = self.conn.execute(
+            "INSERT INTO docs (path, mtime, size, length, title, category, priority) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (rel_path, stat.st_mtime, stat.st_size, length,
+             str(metadata.get('title', 'Unknown')),
+             str(metadata.get('category', 'unknown')),
+             str(metadata.get('priority', 'unknown')))
+        )
+        doc_id = cursor.lastrowid
+
+        self.conn.executemany(
+            "INSERT INTO postings (term, doc_id, tf, lines) VALUES (?, ?, ?, ?)",
+            (
+                (term, doc_id, len(lines), ','.join(map(str, sorted(set(lines)))))
+                for term, lines in occurrences.items()
+            )
+        )
+        return list(occurrences)
+
+    def _drop_docs(self, doc_ids: List[int], df_delta: Counter):
+        for doc_id in doc_ids:
+            df_delta.subtract(
+                row[0] for row in self.conn.execute("SELECT term FROM postings WHERE doc_id = ?", (doc_id,))
+            )
+            self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def _apply_df(self, df_delta: Counter):
+        deltas = [(delta, term) for term, delta in df_delta.items() if delta]
+        if not deltas:
+            return
+        self.conn.executemany("INSERT OR IGNORE INTO terms (term, df) VALUES (?, 0)",
+                              ((term,) for _, term in deltas))
+        self.conn.executemany("UPDATE terms SET df = df + ? WHERE term = ?", deltas)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO suffixes (suffix, term) VALUES (?, ?)",
+            ((term[start:], term) for delta, term in deltas if delta > 0 for start in range(len(term)))
+        )
+        self.conn.execute("DELETE FROM suffixes WHERE term IN (SELECT term FROM terms WHERE df <= 0)")
+        self.conn.execute("DELETE FROM terms WHERE df <= 0")
+
+    # ==================== QUERY ====================
+
+    def _expand(self, token: str) -> List[str]:
+        """Index terms containing the token (partial words match)"""
+        # Tokens are [a-z0-9_], so bumping the last character bounds the prefix range
+        upper = token[:-1] + chr(ord(token[-1]) + 1)
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT term FROM suffixes WHERE suffix >= ? AND suffix < ?", (token, upper)
+        )]
+
+    def _token_postings(self, token: str) -> Dict[int, Tuple[int, set]]:
+        """Merged postings of every index term containing the token
+
+        Returns doc id -> (term frequency, line numbers).
+        """
+        merged: Dict[int, Tuple[int, set]] = {}
+        for doc_id, tf, lines in self._postings_rows(self._expand(token), "doc_id, tf, lines"):
+            total, line_set = merged.get(doc_id, (0, set()))
+            line_set.update(map(int, lines.split(',')))
+            merged[doc_id] = (total + tf, line_set)
+        return merged
+
+    def _postings_rows(self, terms: List[str], columns: str, doc_id: Optional[int] = None):
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            query = f"SELECT {columns} FROM postings WHERE term IN ({','.join('?' * len(chunk))})"
+            params = list(chunk)
+            if doc_id is not None:
+                query += " AND doc_id = ?"
+                params.append(doc_id)
+            yield from self.conn.execute(query, params)
+
+    def _doc(self, doc_id: int) -> Dict:
+        row = self.conn.execute(
+            "SELECT path, title, category, priority FROM docs WHERE id = ?", (doc_id,)
+        ).fetchone()
+        return {'path': row[0], 'title': row[1], 'category': row[2], 'priority': row[3]}
+
+    def _context(self, doc: Dict, line_numbers: List[int], matches, max_context: int) -> Optional[List[str]]:
+        """Read matching lines from the document file (None if unreadable)"""
+        file_path = self.config.root_dir / doc['path']
+        try:
+            lines = file_path.read_text(encoding='utf-8').split('\n')
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        context_lines = []
+        for line_no in line_numbers:
+            if line_no < len(lines) and matches(lines[line_no]):
+                context_lines.append(lines[line_no].strip())
+                if len(context_lines) >= max_context:
+                    break
+        return context_lines
+
+    def candidates(self, search_term: str) -> Optional[Dict[int, List[int]]]:
+        """Find documents that may contain the search term
+
+        Each query token matches any index term containing it, so partial
+        words ('auth' -> 'authentication') behave like the plain substring
+        search. Returns doc id -> sorted candidate line numbers, or None if
+        the query has no indexable tokens.
+        """
+        tokens = tokenize(search_term)
+        if not tokens:
+            return None
+
+        result: Optional[Dict[int, set]] = None
+        for token in sorted(set(tokens), key=len, reverse=True):
+            matches = {doc_id: lines for doc_id, (_, lines) in self._token_postings(token).items()}
+
+            if result is None:
+                result = matches
+            else:
+                result = {
+                    doc_id: result[doc_id] & lines
+                    for doc_id, lines in matches.items()
+                    if doc_id in result and result[doc_id] & lines
+                }
+            if not result:
+                return {}
+
+        return {doc_id: sorted(lines) for doc_id, lines in result.items()}
+
+    def search(self, search_term: str, max_context: int = 3) -> Optional[List[Dict]]:
+        """Search the index, verifying candidates against the exact term
+
+        Returns None when the term cannot be answered from the index.
+        """
+        matches = self.iter_search(search_term, max_context)
+        return None if matches is None else list(matches)
+
+    def iter_search(self, search_term: str, max_context: int = 3) -> Optional[Iterator[Dict]]:
+        """Like search(), but yields results as candidate files are verified
+
+        Files are only read as results are consumed, so stopping early
+        (e.g. itertools.islice) skips the remaining candidates.
+        """
+        candidates = self.candidates(search_term)
+        if candidates is None:
+            return None
+        return self._verify(candidates, search_term, max_context)
+
+    def _verify(self, candidates: Dict[int, List[int]], search_term: str, max_context: int) -> Iterator[Dict]:
+        pattern = re.compile(re.escape(search_term), re.IGNORECASE)
+
+        for doc_id in sorted(candidates):
+            doc = self._doc(doc_id)
+            context_lines = self._context(doc, candidates[doc_id], pattern.search, max_context)
+            if context_lines:
+                yield {
+                    'path': self.config.root_dir / doc['path'],
+                    'title': doc['title'],
+                    'category': doc['category'],
+                    'priority': doc['priority'],
+                    'context': context_lines
+                }
+
+    def rank(self, search_term: str, top_k: int = 10) -> List[Tuple[float, int, List[int]]]:
+        """Score documents with BM25 and return the top_k (score, doc id, lines)
+
+        Any query token may match (OR semantics), and each index term it
+        expands to is scored with its stored document frequency. Ties are
+        broken by indexing order so repeated queries return the same ranking.
+        """
+        doc_count, total_length = self.conn.execute(
+            "SELECT count(*), coalesce(sum(length), 0) FROM docs"
+        ).fetchone()
+        if not doc_count:
+            return []
+        avg_length = total_length / doc_count or 1.0
+
+        # One range scan per token, shared by scoring and line lookup
+        matched_terms = sorted({term for token in set(tokenize(search_term))
+                                for term in self._expand(token)})
+        idf = {
+            term: math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for term, df in self._dfs(matched_terms).items()
+        }
+        postings = list(self._postings_rows(matched_terms, "term, doc_id, tf"))
+        lengths = self._lengths({doc_id for _, doc_id, _ in postings})
+
+        scores: Dict[int, float] = {}
+        for term, doc_id, tf in postings:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+        # Line numbers are only needed for the documents being shown
+        ranked = []
+        for doc_id, score in top:
+            lines = set()
+            for row in self._postings_rows(matched_terms, "lines", doc_id):
+                lines.update(map(int, row[0].split(',')))
+            ranked.append((score, doc_id, sorted(lines)))
+        return ranked
+
+    def _dfs(self, terms: List[str]) -> Dict[str, int]:
+        """Stored document frequencies of the given terms"""
+        dfs: Dict[str, int] = {}
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            dfs.update(self.conn.execute(
+                f"SELECT term, df FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return dfs
+
+    def _lengths(self, doc_ids) -> Dict[int, int]:
+        """Token counts for the given documents"""
+        doc_ids = list(doc_ids)
+        lengths: Dict[int, int] = {}
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            lengths.update(self.conn.execute(
+                f"SELECT id, length FROM docs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return lengths
+
+    def ranked_search(self, search_term: str, top_k: int = 10, max_context: int = 3) -> List[Dict]:
+        """BM25-ranked search results with matching context lines"""
+        results = []
+
+        for score, doc_id, line_numbers in self.rank(search_term, top_k):
+            doc = self._doc(doc_id)
+            context_lines = self._context(doc, line_numbers, lambda line: True, max_context)
+            if context_lines is None:
+                continue
+            results.append({
+                'path': self.config.root_dir / doc['path'],
+                'title': doc['title'],
+                'category': doc['category'],
+                'priority': doc['priority'],
+                'score': score,
+                'context': context_lines
+            })
+
+        return results
+
+
+# Indexes kept open by a resident process, by database path (None: not resident)
+_resident: Optional[Dict[Path, SearchIndex]] = None
+
+
+def keep_resident():
+    """Keep search indexes open across load_search_index() calls (kb serve)
+
+    An index is reopened once its database file was replaced or written by
+    another process (its mtime changed); commits still in the write-ahead
+    log are visible to the open connection anyway.
+    """
+    global _resident
+    if _resident is None:
+        _resident = {}
+
+
+def load_search_index(config: KBConfig, refresh: bool = True) -> SearchIndex:
+    """Load the search index, optionally syncing it with the file system"""
+    if _resident is None:
+        index = SearchIndex.load(config)
+        if refresh:
+            index.refresh()
+        return index
+
+    path = config.get_kb_path() / INDEX_FILENAME
+    index = _resident.get(path)
+    if index is None or index.modified():
+        if index is not None:
+            index.conn.close()
+        index = _resident[path] = SearchIndex.load(config)
+        index.resident = True
+    if refresh:
+        index.refresh()
+    index.mark()
+    return index
@@ -0,0 +1,209 @@
+"""
+KB Serve Module
+Resident KB daemon answering CLI commands over a Unix socket
+"""
+
+import io
+import os
+import sys
+import json
+import socket
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from kb_common import (
+    KBConfig, Colors, get_all_kb_entries, print_header, print_success, print_error, print_info
+)
+
+
+SOCKET_FILENAME = ".kb.sock"
+SERVED_COMMANDS = ('search', 'list', 'recent', 'stats')
+STOP_REQUEST = '__stop__'
+CONNECT_TIMEOUT = 0.5
+# Seconds the daemon waits on one client before dropping it
+REQUEST_TIMEOUT = 5.0
+# Seconds a client waits for a reply before running the command itself
+REPLY_TIMEOUT = 30.0
+
+
+def socket_path(config: KBConfig) -> Path:
+    """Daemon socket path for the project"""
+    return config.get_kb_path() / SOCKET_FILENAME
+
+
+def is_supported() -> bool:
+    """Check if Unix domain sockets are available"""
+    return hasattr(socket, 'AF_UNIX')
+
+
+def _read_line(conn: socket.socket) -> bytes:
+    """Read one newline-terminated JSON message"""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b'\n'):
+            break
+    return b''.join(chunks)
+
+
+def send_request(path: Path, request: Dict, timeout: float = REPLY_TIMEOUT) -> Optional[Dict]:
+    """Send one request to the daemon (None if no daemon answers within timeout)"""
+    if not is_supported() or not path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CONNECT_TIMEOUT)
+            client.connect(str(path))
+            client.settimeout(timeout)
+            client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            reply = _read_line(client)
+    except OSError:
+        return None
+
+    try:
+        return json.loads(reply.decode('utf-8'))
+    except ValueError:
+        return None
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """Run a CLI command on the daemon and print its output
+
+    Returns the command's exit code, or None if no daemon is running
+    (the caller then runs the command itself).
+    """
+    if not argv or argv[0] not in SERVED_COMMANDS:
+        return None
+    
+    reply = send_request(socket_path(KBConfig()), {'argv': argv})
+    if reply is None or 'exit_code' not in reply:
+        return None
+
+    sys.stdout.write(reply.get('stdout', ''))
+    sys.stdout.flush()
+    sys.stderr.write(reply.get('stderr', ''))
+    return reply['exit_code']
+
+
+def run_request(handler: Callable[[str, List[str]], None], argv: List[str]) -> Dict:
+    """Run a CLI command in-process, capturing its output and exit code"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            if not argv or argv[0].lower() not in SERVED_COMMANDS:
+                print(f"{Colors.RED}❌ Not served by kb serve: {' '.join(argv)}{Colors.RESET}")
+                exit_code = 2
+            else:
+                handler(argv[0].lower(), argv[1:])
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                exit_code = e.code
+            elif e.code is not None:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except Exception as e:
+            print(f"{Colors.RED}❌ Error: {e}{Colors.RESET}")
+            traceback.print_exc()
+            exit_code = 1
+
+    return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue(), 'exit_code': exit_code}
+
+
+def serve(handler: Callable[[str, List[str]], None]):
+    """Answer CLI requests until stopped
+
+    The process keeps the corpus walk, parsed entries and the open search
+    index warm between requests. Every request revalidates them against the
+    file system (directory, file and index database mtimes), so edits made
+    while the daemon runs are picked up without a restart.
+    """
+    config = KBConfig()
+    Colors.enable_windows()
+
+    if not is_supported():
+        print_error("kb serve needs Unix domain sockets, which this platform does not provide")
+        sys.exit(1)
+
+    path = socket_path(config)
+    if send_request(path, {'ping': True}) is not None:
+        print_error(f"kb serve is already running ({path})")
+        sys.exit(1)
+    if path.exists():
+        # Left behind by a daemon that did not shut down cleanly
+        path.unlink()
+
+    print_header("🛰️  Knowledge Base Daemon", f"Serving {config.root_dir}")
+
+    # Warm the caches before accepting requests; the index stays open
+    from kb_search_index import keep_resident, load_search_index
+    keep_resident()
+    get_all_kb_entries(config.get_all_kb_paths())
+    load_search_index(config)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(str(path))
+    except OSError as e:
+        server.close()
+        print_error(f"Could not listen on {path}: {e}")
+        sys.exit(1)
+    os.chmod(path, 0o600)
+    server.listen()
+
+    print_success(f"Listening on {path}")
+    print_info(f"Serving: {', '.join(SERVED_COMMANDS)} | stop with: kb serve --stop")
+    sys.stdout.flush()
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                # A client that stalls or disconnects must not hold up the others
+                conn.settimeout(REQUEST_TIMEOUT)
+                try:
+                    request = json.loads(_read_line(conn).decode('utf-8'))
+                except (OSError, ValueError):
+                    continue
+                if not isinstance(request, dict):
+                    continue
+
+                stopping = request.get('argv') == [STOP_REQUEST]
+                if request.get('ping'):
+                    reply = {'pong': True}
+                elif stopping:
+                    reply = {'stopped': True}
+                else:
+                    reply = run_request(handler, request.get('argv') or [])
+
+                try:
+                    conn.sendall(json.dumps(reply).encode('utf-8') + b'\n')
+                except OSError:
+                    pass
+                if stopping:
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if path.exists():
+            path.unlink()
+
+    print_info("kb serve stopped")
+
+
+def stop_server():
+    """Ask a running daemon to shut down"""
+    config = KBConfig()
+    Colors.enable_windows()
+
+    if send_request(socket_path(config), {'argv': [STOP_REQUEST]}) is None:
+        print_info("kb serve is not running")
+    else:
+        print_success("kb serve stopped")
@@ -7,13 +7,13 @@ from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 from kb_common import (
-    KBConfig, Colors, parse_frontmatter, get_kb_entries, format_time_ago,
+    KBConfig, Colors, read_frontmatter, map_parallel, get_kb_entries, format_time_ago,
     print_header, get_priority_icon, get_category_icon
 )
 
 
-def show_stats():
-    """Show KB statistics"""
+def show_stats(jobs: int = 1):
+    """Show KB statistics (jobs > 1 parses entries on a process pool)"""
     config = KBConfig()
     Colors.enable_windows()
     
@@ -38,11 +38,12 @@ def show_stats():
     by_priority = defaultdict(int)
     by_month = defaultdict(int)
     
-    for entry_path in entries:
+    # Read + parse (in parallel if requested); results keep entry order
+    entries = sorted(entries)
+    all_metadata = map_parallel(read_frontmatter, [str(entry_path) for entry_path in entries], jobs)
+    
+    for entry_path, metadata in zip(entries, all_metadata):
         try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
-            
             if metadata:
                 metadata['path'] = entry_path
                 parsed.append(metadata)
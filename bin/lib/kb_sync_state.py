@@ -0,0 +1,129 @@
+"""
+KB Sync State Module
+Local record of what was last synced to Neo4j, for change-only syncs
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from kb_manifest import content_hash
+
+
+SYNC_STATE_VERSION = 1
+
+
+class SyncState:
+    """Path -> (mtime, size, content hash, node id) of the last successful sync
+
+    Unchanged files are skipped on their mtime and size without being read;
+    files that were touched but not edited are skipped on their content hash.
+    The state belongs to one Neo4j target (URI + database), so pointing the
+    sync at another database starts from scratch.
+    """
+
+    def __init__(self, path: Path, target: str):
+        self.path = Path(path)
+        self.target = target
+        self.files: Dict[str, Dict] = {}
+        self.stats: Dict[str, Tuple[int, int]] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path, target: str) -> 'SyncState':
+        """Load sync state from disk (empty if missing, outdated or for another target)"""
+        state = cls(path, target)
+        if not state.path.exists():
+            return state
+
+        try:
+            data = json.loads(state.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return state
+
+        if data.get('version') == SYNC_STATE_VERSION and data.get('target') == target:
+            state.files = data.get('files', {})
+        return state
+
+    def save(self):
+        """Write sync state to disk atomically"""
+        data = {'version': SYNC_STATE_VERSION, 'target': self.target, 'files': self.files}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(data, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    @staticmethod
+    def key(file_path: Path) -> str:
+        """State key for a file (absolute, so any working directory works)"""
+        return str(Path(file_path).resolve())
+
+    def is_current(self, file_path: Path) -> bool:
+        """Check if a file is unchanged since its last sync, without reading it"""
+        key = self.key(file_path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return False
+
+        # Remembered so record() stamps what was read, not a later edit
+        self.stats[key] = (stat.st_mtime_ns, stat.st_size)
+        synced = self.files.get(key)
+        return synced is not None and (synced['mtime_ns'], synced['size']) == self.stats[key]
+
+    def is_synced(self, file_path: Path, digest: str) -> bool:
+        """Check if this content was already synced (a touched but unedited file)"""
+        key = self.key(file_path)
+        synced = self.files.get(key)
+        if synced is None or synced['hash'] != digest:
+            return False
+
+        self._stamp(key, synced)
+        return True
+
+    def record(self, file_path: Path, node_id: str, digest: str):
+        """Remember a file as synced"""
+        key = self.key(file_path)
+        synced = {'id': node_id, 'hash': digest}
+        self._stamp(key, synced)
+        self.files[key] = synced
+
+    def _stamp(self, key: str, synced: Dict):
+        stamp = self.stats.pop(key, None)
+        if stamp is None:
+            try:
+                stat = os.stat(key)
+            except OSError:
+                return
+            stamp = (stat.st_mtime_ns, stat.st_size)
+
+        synced['mtime_ns'], synced['size'] = stamp
+        self.dirty = True
+
+    def missing(self, file_paths: Optional[Iterable[Path]] = None) -> List[Tuple[str, str]]:
+        """(path, node id) of synced files that no longer exist
+
+        Limited to file_paths when given. A gone file whose node id is still
+        used by an existing file is forgotten right away instead, so the node
+        is not deleted from under it.
+        """
+        if file_paths is None:
+            keys = list(self.files)
+        else:
+            keys = [key for key in map(self.key, file_paths) if key in self.files]
+
+        gone = [key for key in keys if not os.path.exists(key)]
+        if not gone:
+            return []
+
+        gone_set = set(gone)
+        live_ids = {synced['id'] for key, synced in self.files.items() if key not in gone_set}
+        self.forget([key for key in gone if self.files[key]['id'] in live_ids])
+        return [(key, self.files[key]['id']) for key in gone if key in self.files]
+
+    def forget(self, keys: Iterable[str]):
+        """Drop files from the state (after their nodes were deleted)"""
+        for key in keys:
+            if self.files.pop(key, None) is not None:
+                self.dirty = True
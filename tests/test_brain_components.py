@@ -83,6 +83,118 @@ class TestLearner:
             log = load_learner_log()
             assert log["learnings"] == []
             assert log["autoLearnEnabled"] == True
+    
+    def test_apply_changes_keeps_unsynced_files_queued(self, tmp_path):
+        """Test that changes stay queued until a Neo4j sync succeeds."""
+        from learner import apply_changes, load_sync_queue
+        
+        doc = tmp_path / "docs" / "guide.md"
+        with patch('learner.get_sync_queue_path', return_value=tmp_path / "queue.json"), \
+             patch('kb_index.update_index', return_value={'reparsed': 1, 'removed': 0}) as update, \
+             patch('learner.flush_sync_queue', side_effect=["queued", "success"]) as flush:
+            result = apply_changes({doc: "modified"})
+            assert update.call_args.kwargs == {'quiet': True}
+            assert [s["status"] for s in result["steps"]] == ["success", "queued"]
+            assert load_sync_queue() == {str(doc): "modified"}
+            
+            other = tmp_path / "docs" / "other.md"
+            apply_changes({other: "deleted"})
+            assert flush.call_args.args[0] == {str(doc): "modified", str(other): "deleted"}
+            assert load_sync_queue() == {}
+
+
+class TestFileWatcher:
+    """Tests for the Learner's file watcher."""
+    
+    def write(self, path, text):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+    
+    def collect(self, watcher, expected, timeout=5.0):
+        """Poll until the expected changes arrived (or the timeout passed)."""
+        import time
+        from file_watcher import coalesce
+        
+        changes = {}
+        deadline = time.monotonic() + timeout
+        while changes != expected and time.monotonic() < deadline:
+            coalesce(changes, watcher.poll(0.1))
+        return changes
+    
+    def test_polling_detects_changes(self, tmp_path):
+        """Test that the stat-diff watcher reports create/modify/delete."""
+        from file_watcher import PollingWatcher
+        
+        kept, removed = tmp_path / "a.md", tmp_path / "sub" / "b.md"
+        self.write(kept, "a")
+        self.write(removed, "b")
+        watcher = PollingWatcher([tmp_path])
+        
+        self.write(kept, "a changed")
+        removed.unlink()
+        self.write(tmp_path / "sub" / "c.md", "c")
+        self.write(tmp_path / "notes.txt", "ignored")
+        
+        assert sorted(watcher.poll(0)) == [
+            ("created", tmp_path / "sub" / "c.md"),
+            ("deleted", removed),
+            ("modified", kept),
+        ]
+        assert watcher.poll(0) == []
+    
+    def test_inotify_detects_changes(self, tmp_path):
+        """Test that the inotify watcher follows new and moved directories."""
+        from file_watcher import InotifyWatcher
+        
+        self.write(tmp_path / "old" / "x.md", "x")
+        try:
+            watcher = InotifyWatcher([tmp_path])
+        except OSError:
+            pytest.skip("inotify not available")
+        
+        try:
+            self.write(tmp_path / "new" / "deep" / "y.md", "y")
+            (tmp_path / "old").rename(tmp_path.parent / (tmp_path.name + "-moved"))
+            expected = {
+                tmp_path / "new" / "deep" / "y.md": "created",
+                tmp_path / "old" / "x.md": "deleted",
+            }
+            assert self.collect(watcher, expected) == expected
+            
+            self.write(tmp_path / "new" / "deep" / "y.md", "y changed")
+            expected = {tmp_path / "new" / "deep" / "y.md": "modified"}
+            assert self.collect(watcher, expected) == expected
+        finally:
+            watcher.close()
+    
+    def test_coalesce(self, tmp_path):
+        """Test that a burst of events folds into one change per file."""
+        from file_watcher import coalesce
+        
+        a, b, c = tmp_path / "a.md", tmp_path / "b.md", tmp_path / "c.md"
+        changes = coalesce({}, [
+            ("created", a), ("modified", a),
+            ("created", b), ("deleted", b),
+            ("deleted", c), ("created", c),
+        ])
+        assert changes == {a: "created", c: "modified"}
+    
+    def test_watch_changes_batches_bursts(self, tmp_path):
+        """Test that events are debounced into batches."""
+        from file_watcher import watch_changes
+        
+        a, b = tmp_path / "a.md", tmp_path / "b.md"
+        polls = [[("created", a)], [("modified", a), ("created", b)], [], [("deleted", b)], []]
+        
+        class ScriptedWatcher:
+            interval = 0
+            
+            def poll(self, timeout):
+                return polls.pop(0)
+        
+        batches = []
+        watch_changes(ScriptedWatcher(), batches.append, debounce=0, stop=lambda: not polls)
+        assert batches == [{a: "created", b: "created"}, {b: "deleted"}]
 
 
 class TestABTester:
@@ -0,0 +1,99 @@
+"""
+Unit tests for the parallel brain workflow executor.
+Tests the in-process sync task graph.
+"""
+
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Project root (tools are imported from tools/neo4j)
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestTaskGraph:
+    """Test the in-process task graph of brain_parallel.py"""
+    
+    @pytest.fixture
+    def brain_parallel(self):
+        sys.path.insert(0, str(PROJECT_ROOT / "tools" / "neo4j"))
+        import brain_parallel
+        return brain_parallel
+    
+    def test_dependencies_run_in_order(self, brain_parallel):
+        """Test that tasks see their dependencies' results and failures skip dependents"""
+        def fail(values):
+            raise RuntimeError("boom")
+        
+        tasks = [
+            ("scan", lambda values: print("scanned") or 2, ()),
+            ("sync", lambda values: values["scan"] * 10, ("scan",)),
+            ("link", lambda values: values["sync"] + 1, ("sync",)),
+            ("broken", fail, ()),
+            ("after broken", lambda values: None, ("broken",)),
+            ("after skipped", lambda values: None, ("after broken",)),
+        ]
+        results = {name: result for name, *result in brain_parallel.run_task_graph(tasks, max_workers=2)}
+        
+        assert results["scan"][:2] == [True, "scanned\n"]
+        assert results["link"][0] is True
+        assert results["broken"][0] is False
+        assert "RuntimeError: boom" in results["broken"][1]
+        assert results["after broken"][:2] == [False, "Skipped: broken failed"]
+        assert results["after skipped"][0] is False
+        assert sys.stdout is not None and not isinstance(sys.stdout, brain_parallel.TaskOutput)
+    
+    def test_sync_tasks_follow_graph_backend(self, brain_parallel, monkeypatch, tmp_path):
+        """Test that the in-process syncs use the local store when GRAPH_BACKEND=sqlite"""
+        try:
+            import sync_skills_to_neo4j as skills
+            import document_sync as documents
+        except ImportError:
+            pytest.skip("sync modules not available")
+        monkeypatch.setenv("GRAPH_BACKEND", "sqlite")
+        monkeypatch.setenv("GRAPH_STORE_PATH", str(tmp_path / "graph.db"))
+        seen = {}
+        monkeypatch.setattr(skills, "sync_knowledge_base", lambda sync, target, *args, **kwargs:
+                            seen.update(skills=(sync, target)))
+        monkeypatch.setattr(documents, "sync_document_tree", lambda sync, target, *args, **kwargs:
+                            seen.update(documents=(sync, target)))
+        
+        tasks = {name: func for name, func, _ in brain_parallel.build_sync_tasks()}
+        tasks["Sync KB to Neo4j"]({})
+        tasks["Sync Documents to Neo4j"]({})
+        
+        assert isinstance(seen["skills"][0], skills.LocalSkillSync)
+        assert isinstance(seen["documents"][0], documents.LocalDocumentSync)
+        assert seen["skills"][1] == seen["documents"][1] == f"sqlite:{(tmp_path / 'graph.db').resolve()}"
+        for sync, _ in seen.values():
+            sync.close()
+    
+    def test_sync_graph_closes_its_stores(self, brain_parallel, monkeypatch, tmp_path):
+        """Test that a sync graph run closes the stores it opened, without changing directory"""
+        try:
+            import sync_skills_to_neo4j as skills
+            import document_sync as documents
+        except ImportError:
+            pytest.skip("sync modules not available")
+        monkeypatch.setenv("GRAPH_BACKEND", "sqlite")
+        monkeypatch.setenv("GRAPH_STORE_PATH", str(tmp_path / "graph.db"))
+        roots, closed = [], []
+        monkeypatch.setattr(skills, "sync_knowledge_base", lambda sync, target, kb_path, *args, **kwargs:
+                            roots.append(kb_path))
+        monkeypatch.setattr(documents, "sync_document_tree", lambda sync, target, base_path, *args, **kwargs:
+                            roots.append(base_path))
+        for sync_class in (skills.LocalSkillSync, documents.LocalDocumentSync):
+            monkeypatch.setattr(sync_class, "close", lambda sync: closed.append(sync.store.close()))
+        
+        cwd = os.getcwd()
+        results = brain_parallel.run_task_graph(brain_parallel.build_sync_tasks(root=tmp_path))
+        
+        assert all(success for _, success, _, _ in results)
+        assert sorted(map(str, roots)) == sorted([str(tmp_path / ".agent" / "knowledge-base"), str(tmp_path)])
+        assert len(closed) == 2
+        assert os.getcwd() == cwd
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
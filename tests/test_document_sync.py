@@ -3,6 +3,7 @@ Unit tests for Neo4j Document Sync functionality.
 Tests document parsing, metadata extraction, and sync operations.
 """
 
+import os
 import pytest
 import sys
 from pathlib import Path
@@ -195,6 +196,210 @@ class TestFindDocuments:
         assert len(kb_files) >= 1
 
 
+class TestBatchedSync:
+    """Test batched UNWIND writes (mocked driver)"""
+    
+    def make_doc(self, index, doc_type='Plan', chunks=0):
+        return {
+            'id': f'doc{index}', 'title': f'Doc {index}', 'type': doc_type, 'author': '@PM',
+            'date': '2026-01-02', 'version': 1, 'sprint': 'sprint-1' if index % 2 else None,
+            'file_path': f'/p/doc{index}.md', 'relative_path': f'doc{index}.md',
+            'word_count': 10, 'line_count': 2, 'content_length': 60, 'content_preview': 'x',
+            'content_hash': f'hash{index}',
+            'reference_ids': [],
+            'references': [], 'frontmatter': {},
+            'chunks': [{'index': i, 'header': 'H', 'content': 'c', 'length': 1} for i in range(chunks)]
+        }
+    
+    @pytest.mark.skipif(DocumentSyncNeo4j is None, reason="DocumentSyncNeo4j not available")
+    def test_sync_documents_batches_writes(self):
+        """Test that documents are written in UNWIND batches, one transaction each"""
+        with patch.object(DocumentSyncNeo4j, '__init__', lambda x, *args, **kwargs: None):
+            sync = DocumentSyncNeo4j.__new__(DocumentSyncNeo4j)
+            sync.database = 'neo4j'
+            sync.driver = MagicMock()
+            session = sync.driver.session.return_value.__enter__.return_value
+            tx = MagicMock()
+            session.execute_write.side_effect = lambda func, docs: func(tx, docs)
+            
+            docs = [self.make_doc(i) for i in range(4)] + [self.make_doc(4, 'Report', chunks=3)]
+            assert sync.sync_documents(iter(docs), batch_size=3) == 5
+            
+            assert session.execute_write.call_count == 2
+            queries = [call.args[0] for call in tx.run.call_args_list]
+            assert all('UNWIND $' in query for query in queries)
+            
+            # Second batch: Plan + Report labels, roles, sprints, old links, old chunks, chunks
+            rows = [call.kwargs.get('rows', call.kwargs.get('ids')) for call in tx.run.call_args_list[5:]]
+            assert [len(r) for r in rows] == [1, 1, 2, 1, 2, 2, 3]
+            assert rows[-1][0]['chunk_id'] == 'doc4_chunk_0'
+    
+    @pytest.mark.skipif(DocumentSyncNeo4j is None, reason="DocumentSyncNeo4j not available")
+    def test_sync_documents_records_state(self, tmp_path):
+        """Test that written documents are recorded in the sync state"""
+        from kb_sync_state import SyncState
+        
+        with patch.object(DocumentSyncNeo4j, '__init__', lambda x, *args, **kwargs: None):
+            sync = DocumentSyncNeo4j.__new__(DocumentSyncNeo4j)
+            sync.database = 'neo4j'
+            sync.driver = MagicMock()
+            
+            doc_path = tmp_path / "Plan.md"
+            doc_path.write_text("# Plan", encoding='utf-8')
+            doc = self.make_doc(0)
+            doc['file_path'] = str(doc_path)
+            
+            state = SyncState(tmp_path / "state.json", "bolt://test/neo4j")
+            sync.sync_documents([doc], state=state)
+            assert state.is_current(doc_path)
+            assert state.files[state.key(doc_path)]['id'] == 'doc0'
+
+    
+    @pytest.mark.skipif(DocumentSyncNeo4j is None, reason="DocumentSyncNeo4j not available")
+    def test_sync_documents_async_pipeline(self, tmp_path):
+        """Test that the pipeline parses every file and writes it in bounded batches"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        
+        tx = MagicMock()
+        tx.run = AsyncMock(return_value=MagicMock(consume=AsyncMock()))
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        
+        async def execute_write(func, docs):
+            await func(tx, docs)
+        session.execute_write = AsyncMock(side_effect=execute_write)
+        driver = MagicMock()
+        driver.session.return_value = session
+        
+        with patch.object(DocumentSyncNeo4j, '__init__', lambda x, *args, **kwargs: None):
+            sync = DocumentSyncNeo4j.__new__(DocumentSyncNeo4j)
+            sync.database = 'neo4j'
+            
+            paths = []
+            for i in range(7):
+                path = tmp_path / f"Design-{i}.md"
+                path.write_text(f"# Design {i}\n\nBody {i}", encoding='utf-8')
+                paths.append(path)
+            
+            synced_ids = []
+            count = asyncio.run(sync.sync_documents_async(
+                paths, batch_size=3, workers=2, concurrency=2, synced_ids=synced_ids, driver=driver
+            ))
+            
+            assert count == 7
+            assert sorted(synced_ids) == sorted(sync.generate_document_id(path) for path in paths)
+            assert session.execute_write.await_count == 3
+            assert not driver.close.called
+
+
+class TestDocumentRelationships:
+    """Test reference and version chain computation (mocked driver)"""
+    
+    @pytest.fixture
+    def sync(self):
+        """Sync with a mocked session; writes are collected as (query, rows)"""
+        with patch.object(DocumentSyncNeo4j, '__init__', lambda x, *args, **kwargs: None):
+            sync = DocumentSyncNeo4j.__new__(DocumentSyncNeo4j)
+            sync.database = 'neo4j'
+            sync.driver = MagicMock()
+            session = sync.driver.session.return_value.__enter__.return_value
+            sync.writes = []
+            
+            def execute_write(func, query, rows):
+                sync.writes.append((query, rows))
+                return len(rows)
+            
+            session.execute_write.side_effect = execute_write
+            sync.session = session
+            yield sync
+    
+    @pytest.mark.skipif(DocumentSyncNeo4j is None, reason="DocumentSyncNeo4j not available")
+    def test_references_from_parsed_links(self, sync):
+        """Test that only links touching synced documents are written"""
+        sync.session.execute_read.return_value = [
+            {'id': 'a', 'reference_ids': ['b', 'b', 'a', 'missing']},
+            {'id': 'b', 'reference_ids': ['c']},
+            {'id': 'c', 'reference_ids': ['a']},
+            {'id': 'd', 'reference_ids': None},
+        ]
+        sync.create_reference_relationships(['a'], batch_size=1)
+        
+        rows = [row for _, batch in sync.writes for row in batch]
+        assert rows == [{'source': 'a', 'target': 'b'}, {'source': 'c', 'target': 'a'}]
+        assert len(sync.writes) == 2
+    
+    @pytest.mark.skipif(DocumentSyncNeo4j is None, reason="DocumentSyncNeo4j not available")
+    def test_version_chain_groups_on_title(self, sync):
+        """Test that consecutive versions of the same title are chained"""
+        sync.session.execute_read.return_value = [
+            {'id': 'p1', 'title': 'Sprint Plan v1', 'version': 1},
+            {'id': 'p3', 'title': 'Sprint-Plan v3', 'version': 3},
+            {'id': 'p2', 'title': 'sprint plan', 'version': 2},
+            {'id': 'r1', 'title': 'Test Report', 'version': 1},
+            {'id': 'r2', 'title': 'Test Report', 'version': 2},
+        ]
+        sync.create_version_chain(['p2'])
+        
+        (_, cleared), (_, links) = sync.writes
+        assert sorted(cleared) == ['p1', 'p2', 'p3']
+        assert links == [{'source': 'p2', 'target': 'p1'}, {'source': 'p3', 'target': 'p2'}]
+    
+    @pytest.mark.skipif(DocumentSyncNeo4j is None, reason="DocumentSyncNeo4j not available")
+    def test_version_chain_closes_gap_of_renamed_document(self, sync):
+        """Test that the group a renamed document left is relinked around it"""
+        sync.session.execute_read.return_value = [
+            {'id': 'p1', 'title': 'Sprint Plan v1', 'version': 1},
+            {'id': 'p2', 'title': 'Release Notes v2', 'version': 2},
+            {'id': 'p3', 'title': 'Sprint Plan v3', 'version': 3},
+        ]
+        sync.create_version_chain(['p2'], title_keys={'sprint plan'})
+        
+        (_, cleared), (_, links) = sync.writes
+        assert sorted(cleared) == ['p1', 'p3']
+        assert links == [{'source': 'p3', 'target': 'p1'}]
+
+
+class TestLocalDocumentSync:
+    """Test document sync to the local graph store"""
+    
+    @pytest.fixture
+    def sync(self, tmp_path):
+        if DocumentSyncNeo4j is None:
+            pytest.skip("DocumentSyncNeo4j not available")
+        
+        module = sys.modules[DocumentSyncNeo4j.__module__]
+        sync = module.LocalDocumentSync(module.open_graph_store(tmp_path / "graph.db"))
+        yield sync
+        sync.close()
+    
+    def test_sync_link_and_delete(self, sync, tmp_path):
+        """Test that documents, version chains and references are written and removed"""
+        old = tmp_path / "Sprint-Plan-v1.md"
+        old.write_text("# Sprint Plan\n\nFirst cut.", encoding='utf-8')
+        new = tmp_path / "Sprint-Plan-v2.md"
+        new.write_text("# Sprint Plan v2\n\nReplaces [v1](Sprint-Plan-v1.md).", encoding='utf-8')
+        docs = [sync.parse_document(old), sync.parse_document(new)]
+        
+        assert sync.sync_documents(docs) == 2
+        sync.link_documents([doc['id'] for doc in docs])
+        
+        stats = sync.get_document_stats()
+        assert (stats['documents'], stats['plans']) == (2, 2)
+        assert sync.store.neighbors(('Document', docs[1]['id']), 'SUPERCEDES') == [({}, sync.store.node(
+            ('Document', docs[0]['id'])))]
+        assert sync.store.count_edges('REFERENCES') == 1
+        
+        # Resyncing replaces the links, deleting removes them with the document
+        sync.sync_documents(docs[1:])
+        assert sync.store.count_edges('SUPERCEDES') == 0
+        sync.delete_documents([docs[0]['id']])
+        sync.link_documents(None, removed=True)
+        assert sync.get_document_stats()['documents'] == 1
+        assert sync.store.count_edges('REFERENCES') == 0
+
+
 class TestNeo4jIntegration:
     """Integration tests for Neo4j operations (requires Neo4j connection)"""
     
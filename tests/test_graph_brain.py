@@ -0,0 +1,75 @@
+"""
+Unit tests for the Neo4j project brain.
+Tests the .gitignore-aware file walk and incremental structure ingest.
+"""
+
+import os
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Project root (tools are imported from tools/neo4j)
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestProjectStructure:
+    """Test the incremental, .gitignore-aware structure ingest of graph_brain.py"""
+    
+    @pytest.fixture
+    def graph_brain(self):
+        sys.path.insert(0, str(PROJECT_ROOT / "tools" / "neo4j"))
+        try:
+            import graph_brain
+        except ImportError:
+            pytest.skip("neo4j driver not available")
+        return graph_brain
+    
+    @pytest.fixture
+    def project(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("dist/\n*.lock\n!keep.lock\n/build.log\n")
+        for name in ["src/app.py", "src/util/helpers.py", "dist/bundle.js", "yarn.lock",
+                     "keep.lock", "build.log", "src/build.log", "node_modules/pkg/index.js"]:
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(name)
+        (tmp_path / "src" / "util" / ".gitignore").write_text("*.tmp\n")
+        (tmp_path / "src" / "util" / "scratch.tmp").write_text("x")
+        return tmp_path
+    
+    def test_gitignore_rules(self, graph_brain, project):
+        """Test that the walk applies root and nested .gitignore rules"""
+        files = graph_brain.walk_project_files(project)
+        
+        assert files == [".gitignore", "keep.lock", "src/app.py", "src/build.log",
+                         "src/util/.gitignore", "src/util/helpers.py"]
+    
+    def test_incremental_ingest(self, graph_brain, project, monkeypatch):
+        """Test that only added or changed files are written and deleted ones removed"""
+        monkeypatch.setattr(graph_brain, "list_project_files", graph_brain.walk_project_files)
+        brain = graph_brain.Neo4jBrain.__new__(graph_brain.Neo4jBrain)
+        brain.driver = MagicMock()
+        brain.target = "bolt://test"
+        session = brain.driver.session.return_value.__enter__.return_value
+        session.execute_read.return_value = ["src/app.py", "dist/bundle.js"]
+        
+        first = brain.ingest_project_structure(project, batch_size=4)
+        assert first == {'ingested': 6, 'removed': 1, 'unchanged': 0}
+        writes = [call.args for call in session.execute_write.call_args_list]
+        assert [len(args[1]) for args in writes[:2]] == [4, 2]
+        assert writes[2][1] == ["dist/bundle.js"]
+        
+        session.reset_mock()
+        assert brain.ingest_project_structure(project) == {'ingested': 0, 'removed': 0, 'unchanged': 6}
+        assert not session.execute_write.called and not session.execute_read.called
+        
+        (project / "src" / "app.py").unlink()
+        (project / "src" / "new.py").write_text("new")
+        assert brain.ingest_project_structure(project) == {'ingested': 1, 'removed': 1, 'unchanged': 5}
+        writes = [call.args for call in session.execute_write.call_args_list]
+        assert writes[0][1][0]['path'] == os.path.join("src", "new.py")
+        assert writes[1][1] == [os.path.join("src", "app.py")]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Tests for bin/lib/ KB CLI modules
+Search index and INDEX.md generation tests
+"""
+
+import os
+import sys
+import subprocess
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add KB CLI lib directory to path
+LIB_DIR = Path(__file__).parent.parent / "bin" / "lib"
+sys.path.insert(0, str(LIB_DIR))
+
+KB_CLI = LIB_DIR.parent / "kb_cli.py"
+
+# Budget for imports done by `kb help` (python -X importtime, top-level cumulative)
+STARTUP_IMPORT_BUDGET_MS = 50
+
+from kb_common import KBConfig
+
+
+def write_entry(path: Path, title: str, body: str, category: str = "bug", priority: str = "high"):
+    """Write a KB entry with frontmatter"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"""---
+title: "{title}"
+category: {category}
+priority: {priority}
+date: 2026-01-02
+tags: [test]
+---
+
+# {title}
+
+{body}
+""", encoding='utf-8')
+
+
+@pytest.fixture
+def kb_project(tmp_path, monkeypatch):
+    """Create a minimal project with KB entries and docs"""
+    kb_path = tmp_path / ".agent" / "knowledge-base"
+    write_entry(kb_path / "bugs" / "KB-2026-01-02-001-hydration.md",
+                "React Hydration Mismatch", "Server and client render differ.\nUse suppressHydrationWarning.")
+    write_entry(kb_path / "security" / "KB-2026-01-02-002-oauth.md",
+                "OAuth Token Refresh", "Refresh tokens before expiry.", category="security", priority="critical")
+    write_entry(tmp_path / "docs" / "guides" / "auth-guide.md",
+                "Authentication Guide", "Use OAuth for third-party login.", category="feature", priority="medium")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestKBSearchIndex:
+    """Tests for the persistent inverted search index"""
+
+    def test_index_matches_full_scan(self, kb_project):
+        """Test that indexed search returns the same results as a full scan"""
+        import kb_search
+        config = KBConfig()
+
+        with patch('builtins.print'):
+            for term in ['oauth', 'hydration', 'auth', 'refresh tokens', 'missing']:
+                scanned = kb_search.search_files(config, term)
+                indexed = kb_search.search_indexed_files(config, term)
+                key = lambda r: (str(r['path']), r['title'], r['context'])
+                assert sorted(map(key, indexed)) == sorted(map(key, scanned))
+
+    def test_index_persisted_and_incremental(self, kb_project):
+        """Test that only new or changed files are re-indexed"""
+        from kb_search_index import SearchIndex, INDEX_FILENAME
+        config = KBConfig()
+
+        index = SearchIndex.load(config)
+        assert index.refresh() == (3, 0)
+        assert (config.get_kb_path() / INDEX_FILENAME).exists()
+
+        index = SearchIndex.load(config)
+        assert index.refresh() == (0, 0)
+
+        (kb_project / "docs" / "guides" / "auth-guide.md").unlink()
+        write_entry(config.get_kb_path() / "bugs" / "KB-2026-01-03-001-cors.md",
+                    "CORS Preflight", "Preflight OPTIONS request rejected.")
+        assert index.refresh() == (1, 1)
+
+        results = SearchIndex.load(config).search('preflight')
+        assert [r['title'] for r in results] == ['CORS Preflight']
+        assert SearchIndex.load(config).search('third-party') == []
+
+    def test_terms_expand_through_suffixes(self, kb_project):
+        """Test that partial words expand through the suffix table and dropped terms leave it"""
+        from kb_search_index import load_search_index
+        config = KBConfig()
+        index = load_search_index(config)
+
+        assert sorted(index._expand('auth')) == ['authentication', 'oauth']
+        assert index._expand('thentic') == ['authentication']
+        assert index._dfs(['oauth', 'hydration']) == {'oauth': 2, 'hydration': 1}
+
+        (kb_project / "docs" / "guides" / "auth-guide.md").unlink()
+        index.refresh()
+        assert index._expand('thentic') == []
+        assert index._dfs(['oauth']) == {'oauth': 1}
+        index.close()
+
+    def test_non_indexable_term_falls_back(self, kb_project):
+        """Test that punctuation-only queries are not answered from the index"""
+        from kb_search_index import load_search_index
+        index = load_search_index(KBConfig())
+        assert index.search('#') is None
+
+    def test_ranked_search_orders_by_bm25(self, kb_project):
+        """Test that ranked search puts the most relevant file first and honours top_k"""
+        from kb_search_index import load_search_index
+        config = KBConfig()
+        write_entry(config.get_kb_path() / "security" / "KB-2026-01-03-002-oauth-scopes.md",
+                    "OAuth Scopes", "OAuth scopes limit OAuth tokens.\nRequest minimal OAuth scopes.",
+                    category="security")
+
+        index = load_search_index(config)
+        results = index.ranked_search('oauth', top_k=10)
+        assert results[0]['title'] == 'OAuth Scopes'
+        assert len(results) == 3
+        scores = [r['score'] for r in results]
+        assert scores == sorted(scores, reverse=True)
+
+        assert len(index.ranked_search('oauth', top_k=1)) == 1
+        assert index.ranked_search('nonexistent', top_k=5) == []
+        index.close()
+
+
+class TestKBSearchStreaming:
+    """Tests for streaming search output"""
+
+    def test_limit_stops_reading_files(self, kb_project):
+        """Test that --limit stops verifying candidates early"""
+        import kb_search
+        from kb_search_index import SearchIndex
+        config = KBConfig()
+
+        with patch.object(SearchIndex, '_context', autospec=True,
+                          side_effect=SearchIndex._context) as context:
+            results = list(kb_search.iter_file_results(config, 'oauth', limit=1))
+        assert len(results) == 1
+        assert context.call_count == 1
+
+    def test_json_output(self, kb_project, capsys):
+        """Test that --json prints one parseable object per result"""
+        import json
+        import kb_search
+
+        kb_search.search_kb('oauth', as_json=True)
+        lines = capsys.readouterr().out.strip().split('\n')
+        results = [json.loads(line) for line in lines]
+        assert sorted(r['path'] for r in results) == [
+            '.agent/knowledge-base/security/KB-2026-01-02-002-oauth.md',
+            'docs/guides/auth-guide.md',
+        ]
+        assert all(r['context'] for r in results)
+
+        kb_search.search_kb('oauth', ranked=True, as_json=True, limit=1)
+        ranked = [json.loads(line) for line in capsys.readouterr().out.strip().split('\n')]
+        assert len(ranked) == 1 and 'score' in ranked[0]
+
+    def test_full_scan_parses_only_matching_files(self, kb_project):
+        """Test that the mmap pre-filter skips parsing non-matching files"""
+        import kb_search
+        config = KBConfig()
+
+        with patch('kb_search.parse_frontmatter', wraps=kb_search.parse_frontmatter) as parser:
+            results = list(kb_search.iter_files(config, 'HYDRATION'))
+        assert [r['title'] for r in results] == ['React Hydration Mismatch']
+        assert parser.call_count == 1
+
+    def test_prefilter(self, tmp_path):
+        """Test case-insensitive mmap matching and its edge cases"""
+        from kb_corpus import compile_prefilter, file_matches
+        doc = tmp_path / "doc.md"
+        doc.write_text("Use OAuth tokens", encoding='utf-8')
+        empty = tmp_path / "empty.md"
+        empty.write_text("", encoding='utf-8')
+
+        assert file_matches(doc, compile_prefilter('oauth'))
+        assert not file_matches(doc, compile_prefilter('saml'))
+        assert not file_matches(empty, compile_prefilter('oauth'))
+        assert not file_matches(tmp_path / "missing.md", compile_prefilter('oauth'))
+        assert compile_prefilter('café') is None
+        assert file_matches(doc, None)
+
+
+class TestKBCorpus:
+    """Tests for the shared single-pass corpus loader"""
+
+    def test_tree_walked_once(self, kb_project):
+        """Test that repeated and nested requests reuse one walk"""
+        import kb_corpus
+        corpus = kb_corpus.Corpus()
+        kb_path = KBConfig().get_kb_path()
+
+        with patch('kb_corpus.os.walk', wraps=kb_corpus.os.walk) as walk:
+            assert [e.name for e in corpus.files(kb_path, 'KB-*.md')] == [
+                'KB-2026-01-02-001-hydration.md', 'KB-2026-01-02-002-oauth.md']
+            assert len(corpus.files(kb_path / 'security')) == 1
+            assert len(corpus.files(kb_path)) == 2
+            assert walk.call_count == 1
+
+            write_entry(kb_path / "bugs" / "KB-2026-01-03-001-cors.md", "CORS Preflight", "Preflight.")
+            assert len(corpus.files(kb_path, 'KB-*.md')) == 3
+            assert walk.call_count == 2
+
+    def test_entry_parsed_once_until_changed(self, kb_project):
+        """Test that entries are re-read only when the file changes"""
+        import kb_corpus
+        corpus = kb_corpus.Corpus()
+        kb_path = KBConfig().get_kb_path()
+        entry = corpus.files(kb_path / 'security')[0]
+
+        with patch('kb_corpus.parse_frontmatter', wraps=kb_corpus.parse_frontmatter) as parser:
+            assert entry.load() and entry.load()
+            assert parser.call_count == 1
+            assert entry.metadata['title'] == 'OAuth Token Refresh'
+            assert entry.body.startswith('# OAuth Token Refresh')
+
+            write_entry(entry.path, "OAuth Token Rotation", "Rotate refresh tokens on every use.",
+                        category="security")
+            assert entry.load()
+            assert parser.call_count == 2
+            assert entry.metadata['title'] == 'OAuth Token Rotation'
+
+    def test_block_list_frontmatter(self):
+        """Test that block-style YAML lists are parsed"""
+        from kb_common import parse_frontmatter
+        metadata = parse_frontmatter("---\ntitle: X\ntags:\n- auth\n- oauth\nsprint:\n---\nbody")
+        assert metadata == {'title': 'X', 'tags': ['auth', 'oauth'], 'sprint': ''}
+
+
+class TestKBSyncState:
+    """Tests for the Neo4j sync state manifest"""
+
+    def test_unchanged_files_skipped(self, tmp_path):
+        """Test that only new or edited files need a sync"""
+        from kb_sync_state import SyncState
+        doc = tmp_path / "doc.md"
+        doc.write_text("v1", encoding='utf-8')
+
+        state = SyncState(tmp_path / "state.json", "bolt://a/neo4j")
+        assert not state.is_current(doc)
+        state.record(doc, "doc", "hash-v1")
+        state.save()
+
+        state = SyncState.load(tmp_path / "state.json", "bolt://a/neo4j")
+        assert state.is_current(doc)
+
+        # Touched but not edited: re-read, but not sent
+        os.utime(doc, ns=(1, 1))
+        assert not state.is_current(doc)
+        assert state.is_synced(doc, "hash-v1")
+        assert state.is_current(doc)
+        assert not state.is_synced(doc, "hash-v2")
+
+        # Another database starts from scratch
+        assert SyncState.load(tmp_path / "state.json", "bolt://b/neo4j").files == {}
+
+    def test_missing_files(self, tmp_path):
+        """Test that vanished files are reported unless their node is still in use"""
+        from kb_sync_state import SyncState
+        state = SyncState(tmp_path / "state.json", "bolt://a/neo4j")
+        paths = {}
+        for name, node_id in [("a", "A"), ("b", "B"), ("c", "B")]:
+            paths[name] = tmp_path / f"{name}.md"
+            paths[name].write_text(name, encoding='utf-8')
+            state.record(paths[name], node_id, name)
+
+        paths["a"].unlink()
+        paths["b"].unlink()
+        assert state.missing([paths["b"]]) == []
+        assert state.missing() == [(state.key(paths["a"]), "A")]
+
+        state.forget([state.key(paths["a"])])
+        assert list(state.files) == [state.key(paths["c"])]
+
+
+class TestKBIndex:
+    """Tests for incremental INDEX.md generation"""
+
+    def test_only_changed_entries_reparsed(self, kb_project):
+        """Test that the manifest skips unchanged entries"""
+        import kb_index
+        config = KBConfig()
+
+        with patch('kb_manifest.parse_frontmatter', wraps=kb_index.parse_frontmatter) as parser:
+            with patch('builtins.print'):
+                kb_index.update_index()
+            assert parser.call_count == 3
+            assert 'OAuth Token Refresh' in config.get_index_path().read_text(encoding='utf-8')
+
+            parser.reset_mock()
+            with patch('builtins.print'):
+                kb_index.update_index()
+            assert parser.call_count == 0
+
+            write_entry(config.get_kb_path() / "security" / "KB-2026-01-02-002-oauth.md",
+                        "OAuth Token Rotation", "Rotate refresh tokens.", category="security")
+            with patch('builtins.print'):
+                kb_index.update_index()
+            assert parser.call_count == 1
+
+        index_content = config.get_index_path().read_text(encoding='utf-8')
+        assert 'OAuth Token Rotation' in index_content
+        assert 'OAuth Token Refresh' not in index_content
+
+    def test_removed_entries_dropped(self, kb_project):
+        """Test that deleted files disappear from INDEX.md"""
+        import kb_index
+        config = KBConfig()
+
+        with patch('builtins.print'):
+            kb_index.update_index()
+            (config.get_kb_path() / "bugs" / "KB-2026-01-02-001-hydration.md").unlink()
+            kb_index.update_index()
+
+        assert 'React Hydration Mismatch' not in config.get_index_path().read_text(encoding='utf-8')
+
+    def test_parallel_parse_matches_serial(self, kb_project):
+        """Test that --jobs N produces the same manifest as a serial run"""
+        from kb_manifest import EntryManifest
+        from kb_common import get_all_kb_entries
+        config = KBConfig()
+        entries = get_all_kb_entries(config.get_all_kb_paths())
+
+        serial = EntryManifest(config)
+        parallel = EntryManifest(config)
+        assert serial.refresh(entries) == parallel.refresh(entries, jobs=2)
+        assert serial.entries == parallel.entries
+
+    def test_map_parallel_keeps_order(self):
+        """Test that pooled results are merged in input order"""
+        from kb_common import map_parallel
+        items = [str(n) for n in range(50)]
+        assert map_parallel(int, items, jobs=3) == list(range(50))
+        assert map_parallel(int, [], jobs=3) == []
+
+
+class TestKBServe:
+    """Tests for the resident kb serve daemon"""
+
+    @pytest.fixture(autouse=True)
+    def not_resident(self, monkeypatch):
+        """kb serve keeps search indexes open for the rest of the process"""
+        import kb_search_index
+        monkeypatch.setattr(kb_search_index, '_resident', None)
+
+    def test_search_index_stays_open(self, kb_project):
+        """Test that a resident index is reused until another process writes it"""
+        from kb_search_index import SearchIndex, keep_resident, load_search_index
+        config = KBConfig()
+
+        keep_resident()
+        index = load_search_index(config)
+        index.close()
+        assert load_search_index(config) is index
+        assert index.search('oauth')
+
+        write_entry(config.get_kb_path() / "bugs" / "KB-2026-01-03-001-cors.md",
+                    "CORS Preflight", "Preflight OPTIONS request rejected.")
+        other = SearchIndex.load(config)
+        other.refresh()
+        other.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        other.close()
+
+        reopened = load_search_index(config, refresh=False)
+        assert reopened is not index
+        assert [r['title'] for r in reopened.search('preflight')] == ['CORS Preflight']
+
+    @pytest.mark.skipif(not hasattr(__import__('socket'), 'AF_UNIX'), reason="needs Unix sockets")
+    def test_forward_to_daemon(self, kb_project, capsys):
+        """Test that served commands run in the daemon and unserved ones stay local"""
+        import threading
+        from kb_serve import serve, forward, stop_server, socket_path
+
+        calls = []
+
+        def handler(command, args):
+            calls.append((command, args))
+            print(f"ran {command} {' '.join(args)}")
+            if args == ['fail']:
+                sys.exit(3)
+
+        assert forward(['search', 'oauth']) is None
+
+        server = threading.Thread(target=serve, args=(handler,), daemon=True)
+        server.start()
+        path = socket_path(KBConfig())
+        for _ in range(100):
+            if path.exists():
+                break
+            server.join(0.05)
+        capsys.readouterr()
+
+        try:
+            assert forward(['search', 'oauth']) == 0
+            assert capsys.readouterr().out == "ran search oauth\n"
+            assert forward(['stats', 'fail']) == 3
+            assert forward(['add']) is None
+            assert calls == [('search', ['oauth']), ('stats', ['fail'])]
+        finally:
+            stop_server()
+            server.join(5)
+
+        assert not server.is_alive()
+        assert not path.exists()
+        assert forward(['search', 'oauth']) is None
+
+    @pytest.mark.skipif(not hasattr(__import__('socket'), 'AF_UNIX'), reason="needs Unix sockets")
+    def test_stalled_client_does_not_block_daemon(self, kb_project, monkeypatch, capsys):
+        """Test that a client that never sends a request is dropped and the next one is served"""
+        import socket
+        import threading
+        import kb_serve
+        from kb_serve import serve, forward, stop_server, socket_path
+
+        monkeypatch.setattr(kb_serve, 'REQUEST_TIMEOUT', 0.2)
+        server = threading.Thread(target=serve, args=(lambda command, args: print("ok"),), daemon=True)
+        server.start()
+        path = socket_path(KBConfig())
+        for _ in range(100):
+            if path.exists():
+                break
+            server.join(0.05)
+        capsys.readouterr()
+
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            stalled.connect(str(path))
+            stalled.sendall(b'{"argv": ')
+            assert forward(['stats']) == 0
+            assert capsys.readouterr().out == "ok\n"
+        finally:
+            stalled.close()
+            stop_server()
+            server.join(5)
+
+        assert not server.is_alive()
+
+
+class TestKBCLIStartup:
+    """Tests for kb_cli.py startup cost"""
+
+    def import_times(self, *args):
+        """Run kb_cli.py under -X importtime; returns {top-level module: cumulative us}"""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(KB_CLI), *args],
+            capture_output=True, text=True, encoding='utf-8', errors='replace'
+        )
+        assert result.returncode == 0, result.stderr
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            if not name[1:].startswith(' '):
+                times[name.strip()] = int(cumulative)
+        return times
+
+    def test_help_imports_no_commands(self):
+        """Test that `kb help` does not load any command module"""
+        times = self.import_times('help')
+        assert [name for name in times if name.startswith('kb_')] == []
+
+    def test_help_within_startup_budget(self):
+        """Test that `kb help` imports stay within the startup budget"""
+        total_ms = sum(self.import_times('help').values()) / 1000
+        assert total_ms < STARTUP_IMPORT_BUDGET_MS, f"kb help imports took {total_ms:.1f} ms"
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
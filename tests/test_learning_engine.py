@@ -96,6 +96,39 @@ class TestIdGeneration:
         assert error_id.startswith("ERR_")
         assert res_id.startswith("RES_")
         assert pat_id.startswith("PAT_")
+    
+    def test_generate_id_is_content_addressed(self, engine_instance):
+        """Test that the same content always gives the same ID"""
+        assert engine_instance.generate_id("ERR", "test") == engine_instance.generate_id("ERR", "test")
+        assert engine_instance.generate_id("ERR", "test") != engine_instance.generate_id("ERR", "other")
+        assert engine_instance.generate_id("ERR", "test") != engine_instance.generate_id("RES", "test")
+    
+    def test_repeated_errors_share_a_node(self, engine_instance):
+        """Test that repeats of an error (up to case and spacing) merge onto one node"""
+        engine_instance.database = 'neo4j'
+        engine_instance.driver = MagicMock()
+        engine_instance._templates = sys.modules[LearningEngine.__module__].TemplateMiner()
+        session = engine_instance.driver.session.return_value.__enter__.return_value
+        tx = Mock()
+        tx.run.side_effect = lambda query, ids=(), **params: [{'id': id} for id in ids]
+        session.execute_write.side_effect = lambda work, *args: work(tx, *args)
+        
+        first = engine_instance.record_error("TypeError", "Cannot read property 'id' of undefined")
+        again = engine_instance.record_error("TypeError", "cannot read  property 'id' of undefined ")
+        other = engine_instance.record_error("TypeError", "Cannot read property 'name' of undefined")
+        
+        assert first == again != other
+        # One transaction per record, written without a LearningEvent
+        assert session.execute_write.call_count == 3
+        assert 'MERGE (e:Error {id: row.error_id})' in tx.run.call_args_list[0].args[0]
+        assert tx.run.call_args_list[0].kwargs['rows'][0]['error_id'] == first
+        assert not any('LearningEvent' in call.args[0] for call in tx.run.call_args_list)
+        
+        fix = engine_instance.record_error("TypeError", "x is undefined", resolution="Added null check",
+                                           resolution_approach="defensive_coding")
+        assert fix == engine_instance.record_error("ReferenceError", "y is undefined",
+                                                   resolution="added null check",
+                                                   resolution_approach="Defensive_Coding")
 
 
 class TestLearningEngineIntegration:
@@ -218,6 +251,497 @@ class TestLearningEngineIntegration:
             engine.close()
 
 
+class TestRecommendations:
+    """Test the single-query recommendation lookup (mocked driver)"""
+    
+    @pytest.fixture
+    def engine_instance(self):
+        """Create a LearningEngine instance with a mocked driver"""
+        if LearningEngine is None:
+            pytest.skip("LearningEngine not available")
+        
+        with patch.object(LearningEngine, '__init__', lambda x, *args, **kwargs: None):
+            engine = LearningEngine.__new__(LearningEngine)
+            engine.database = 'neo4j'
+            engine.driver = MagicMock()
+            return engine
+    
+    def test_single_round_trip(self, engine_instance):
+        """Test that all keywords are searched with one fulltext query"""
+        session = engine_instance.driver.session.return_value.__enter__.return_value
+        session.run.return_value = [{
+            'source': 'pattern',
+            'rec': {'pattern_id': 'PAT_1', 'task_type': 'auth', 'approach': 'JWT tokens',
+                    'success_count': 3, 'confidence': 0.9},
+            'matched': ['authentication', 'jwt']
+        }]
+        
+        recs = engine_instance.get_recommendations("implement user authentication with JWT")
+        
+        assert session.run.call_count == 1
+        query, params = session.run.call_args.args[0], session.run.call_args.kwargs
+        assert 'db.index.fulltext.queryNodes' in query
+        assert params['keywords'] == ['user', 'authentication', 'jwt']
+        assert params['search'] == 'user* authentication* jwt*'
+        assert recs == [{
+            'pattern_id': 'PAT_1', 'task_type': 'auth', 'approach': 'JWT tokens',
+            'success_count': 3, 'confidence': 0.9, 'matched_keyword': 'authentication',
+            'matched_keywords': ['authentication', 'jwt'], 'source': 'pattern'
+        }]
+    
+    def test_falls_back_without_fulltext_index(self, engine_instance):
+        """Test the keyword-scan fallback when the fulltext indexes are missing"""
+        session = engine_instance.driver.session.return_value.__enter__.return_value
+        session.run.side_effect = [Exception("no such fulltext schema index"), []]
+        
+        assert engine_instance.get_recommendations("deploy kubernetes cluster") == []
+        assert session.run.call_count == 2
+        assert 'queryNodes' not in session.run.call_args.args[0]
+    
+    def test_similar_errors_query_is_sanitised(self, engine_instance):
+        """Test that error messages reach Lucene as plain words with a score threshold"""
+        session = engine_instance.driver.session.return_value.__enter__.return_value
+        session.run.return_value = []
+        engine_instance._templates = sys.modules[LearningEngine.__module__].TemplateMiner()
+        
+        engine_instance.find_similar_errors('TypeError: Cannot read "id" of undefined')
+        
+        assert session.run.call_count == 1
+        params = session.run.call_args.kwargs
+        assert params['search'] == 'typeerror cannot read id of undefined'
+        assert params['min_score'] > 0
+
+
+class TestReasoningPath:
+    """Test the anchored, bounded reasoning path search (mocked driver)"""
+    
+    @pytest.fixture
+    def engine_instance(self):
+        """Create a LearningEngine instance with a mocked driver"""
+        if LearningEngine is None:
+            pytest.skip("LearningEngine not available")
+        
+        with patch.object(LearningEngine, '__init__', lambda x, *args, **kwargs: None):
+            engine = LearningEngine.__new__(LearningEngine)
+            engine.database = 'neo4j'
+            engine.driver = MagicMock()
+            return engine
+    
+    @staticmethod
+    def node(labels, **properties):
+        """Stand-in for a neo4j Node (a mapping with labels)"""
+        class Node(dict):
+            pass
+        node = Node(properties)
+        node.labels = frozenset(labels)
+        return node
+    
+    def test_anchored_bounded_query(self, engine_instance):
+        """Test that path ends come from indexes and hops and results are capped"""
+        session = engine_instance.driver.session.return_value.__enter__.return_value
+        session.run.return_value = [{
+            'nodes': [self.node(['Error'], id='ERR_1'), self.node(['Resolution'], id='RES_1')],
+            'rels': [],
+            'path_length': 1
+        }]
+        
+        paths = engine_instance.find_reasoning_path("TypeError", "null check", max_hops=2, limit=7)
+        
+        assert session.run.call_count == 1
+        query, params = session.run.call_args.args[0], session.run.call_args.kwargs
+        assert 'MATCH (e:Error), (r:Resolution)' not in query
+        assert "queryNodes('error_search'" in query
+        assert "queryNodes('resolution_search'" in query
+        assert 'shortestPath((e)-[*..2]-(r))' in query
+        assert params['limit'] == 7
+        assert params['to_search'] == 'null* check*'
+        assert paths == [{'length': 1, 'steps': [
+            {'index': 0, 'labels': ['Error'], 'properties': {'id': 'ERR_1'}},
+            {'index': 1, 'labels': ['Resolution'], 'properties': {'id': 'RES_1'}}
+        ]}]
+    
+    def test_falls_back_with_grouped_filters(self, engine_instance):
+        """Test the scan fallback applies each end's filter on its own"""
+        session = engine_instance.driver.session.return_value.__enter__.return_value
+        session.run.side_effect = [Exception("no such fulltext schema index"), []]
+        
+        assert engine_instance.find_reasoning_path("TypeError", "null check") == []
+        assert session.run.call_count == 2
+        query = session.run.call_args.args[0]
+        assert 'queryNodes' not in query
+        assert 'WHERE e.message CONTAINS $from_text OR e.type CONTAINS $from_text\n' in query
+        assert 'WHERE r.description CONTAINS $to_text OR r.approach CONTAINS $to_text\n' in query
+        assert 'LIMIT $anchors' in query
+    
+    def test_rejects_invalid_hop_cap(self, engine_instance):
+        """Test that the hop cap must allow at least one hop"""
+        with pytest.raises(ValueError):
+            engine_instance.find_reasoning_path("TypeError", "null check", max_hops=0)
+
+
+class TestErrorTemplates:
+    """Test error message templating and clustering"""
+    
+    @pytest.fixture
+    def error_templates(self):
+        sys.path.insert(0, str(PROJECT_ROOT / "tools" / "neo4j"))
+        import error_templates
+        return error_templates
+    
+    def test_mask_volatile_tokens(self, error_templates):
+        """Test that paths, numbers, addresses and ids become placeholders"""
+        mask = error_templates.mask_message
+        
+        assert mask("ReferenceError at /srv/app/src/index.js:42:7") == "ReferenceError at <PATH>:<NUM>:<NUM>"
+        assert mask("KeyError in src/models.py line 88") == "KeyError in <PATH> line <NUM>"
+        assert mask("refused by 10.0.0.12:5432") == "refused by <IP>"
+        assert mask("object at 0x7ffe12ab") == "object at <HEX>"
+        assert mask("job 123e4567-e89b-12d3-a456-426614174000 failed") == "job <UUID> failed"
+        assert mask("HTTP 404 from v2 api") == "HTTP <NUM> from v2 api"
+    
+    def test_messages_cluster_into_templates(self, error_templates, tmp_path):
+        """Test that variants share a cluster whose template generalizes, and ids persist"""
+        path = tmp_path / "templates.json"
+        miner = error_templates.TemplateMiner.load(path)
+        
+        first = miner.add("Timeout after 30s waiting for worker lock")
+        second = miner.add("Timeout after 45s waiting for scheduler lock")
+        other = miner.add("Cannot read property 'id' of undefined")
+        
+        assert first.id == second.id != other.id
+        assert first.template == "Timeout after <NUM>s waiting for <*> lock"
+        assert first.size == 2
+        assert miner.match("Timeout after 5s waiting for db lock").id == first.id
+        assert miner.match("Disk full") is None
+        
+        miner.save()
+        reloaded = error_templates.TemplateMiner.load(path)
+        assert reloaded.match("Timeout after 1s waiting for cache lock").template == first.template
+    
+    def test_replace_makes_source_of_truth_authoritative(self, error_templates, tmp_path):
+        """Test that replaced clusters route like mined ones and drop clusters only the cache knew"""
+        path = tmp_path / "templates.json"
+        cache = error_templates.TemplateMiner.load(path)
+        cache.add("Disk full on /dev/sda1")
+        cache.save()
+        
+        miner = error_templates.TemplateMiner.load(path)
+        miner.replace([("TPL_shared", "Timeout after <NUM>s waiting for <*> lock", 2)])
+        assert miner.add("Timeout after 9s waiting for queue lock").id == "TPL_shared"
+        miner.save()
+        
+        reloaded = error_templates.TemplateMiner.load(path)
+        assert list(reloaded.clusters) == ["TPL_shared"]
+        assert reloaded.clusters["TPL_shared"].size == 3
+    
+    def test_similar_errors_by_template(self, error_templates):
+        """Test that a known template answers with one indexed lookup"""
+        if LearningEngine is None:
+            pytest.skip("LearningEngine not available")
+        
+        with patch.object(LearningEngine, '__init__', lambda x, *args, **kwargs: None):
+            engine = LearningEngine.__new__(LearningEngine)
+        engine.database = 'neo4j'
+        engine.driver = MagicMock()
+        engine._templates = error_templates.TemplateMiner()
+        cluster = engine._templates.add("Connection refused by 10.0.0.1:5432")
+        session = engine.driver.session.return_value.__enter__.return_value
+        session.run.return_value = [{'error_id': 'ERR_1', 'error_type': 'ConnectionError',
+                                     'message': 'Connection refused by 10.0.0.1:5432',
+                                     'occurrences': 3, 'resolutions': [],
+                                     'template': cluster.template}]
+        
+        errors = engine.find_similar_errors("Connection refused by 10.1.1.1:6379")
+        
+        assert [error['error_id'] for error in errors] == ['ERR_1']
+        assert session.run.call_count == 1
+        assert session.run.call_args.kwargs['template_id'] == cluster.id
+        assert 'queryNodes' not in session.run.call_args.args[0]
+
+
+class TestLocalGraphStore:
+    """Test the embedded SQLite graph store"""
+    
+    @pytest.fixture
+    def store(self, tmp_path):
+        sys.path.insert(0, str(PROJECT_ROOT / "tools" / "neo4j"))
+        import graph_store
+        store = graph_store.open_graph_store(tmp_path / "graph.db")
+        yield store
+        store.close()
+    
+    def test_merge_sets_creates_and_increments(self, store):
+        """Test MERGE semantics: SET, ON CREATE SET and coalesce(x, 0) + n"""
+        store.merge_node('Error', 'ERR_1', {'type': 'TypeError'}, on_create={'first_seen': 'a'},
+                         increment={'occurrence_count': 1})
+        node = store.merge_node('Error', 'ERR_1', {'type': 'TypeError'}, on_create={'first_seen': 'b'},
+                                increment={'occurrence_count': 1})
+        
+        assert node == {'type': 'TypeError', 'first_seen': 'a', 'occurrence_count': 2}
+        assert store.count('Error') == 1
+        assert store.nodes('Error', {'type': 'TypeError'}) == [node]
+    
+    def test_relationships_follow_their_nodes(self, store):
+        """Test neighbours, extra labels and that deleting a node deletes its relationships"""
+        store.merge_node('Document', 'D1', {'id': 'D1'}, labels=['Plan'])
+        store.merge_node('Role', '@PM', {'name': '@PM'})
+        assert store.merge_edge(('Document', 'D1'), 'CREATED_BY', ('Role', '@PM'), increment={'n': 1})
+        assert not store.merge_edge(('Document', 'D1'), 'CREATED_BY', ('Role', '@QA'))
+        
+        assert store.count('Plan') == 1
+        assert store.neighbors(('Role', '@PM'), 'CREATED_BY', direction='in') == [({'n': 1}, {'id': 'D1'})]
+        
+        store.delete_nodes('Document', ['D1'])
+        assert store.count_edges('CREATED_BY') == 0
+    
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test that a backend missing an operation fails when created, not mid-sync"""
+        import graph_store
+        
+        class PartialStore(graph_store.GraphStore):
+            def close(self):
+                pass
+        
+        with pytest.raises(TypeError):
+            PartialStore()
+    
+    def test_transaction_rolls_back(self, store):
+        """Test that a failing transaction leaves nothing behind"""
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.merge_node('Pattern', 'PAT_1', {'id': 'PAT_1'})
+                raise RuntimeError("boom")
+        
+        assert store.count('Pattern') == 0
+    
+    def test_search_and_shortest_paths(self, store):
+        """Test keyword search ranking and bounded undirected shortest paths"""
+        for key in ('E1', 'E2'):
+            store.merge_node('Error', key, {'id': key, 'message': f"{key} connection timeout"})
+        store.merge_node('Resolution', 'R1', {'id': 'R1'})
+        store.merge_edge(('Error', 'E1'), 'RESOLVED_BY', ('Resolution', 'R1'))
+        store.merge_edge(('Error', 'E2'), 'RESOLVED_BY', ('Resolution', 'R1'))
+        
+        found = store.search('Error', ('message',), ['e1', 'timeout'])
+        assert [(node['id'], matched) for node, matched in found] == [('E1', ['e1', 'timeout']),
+                                                                       ('E2', ['timeout'])]
+        
+        paths = store.shortest_paths([('Error', 'E1')], [('Error', 'E2')], max_hops=2, limit=3)
+        assert [[props['id'] for _, props in path] for path in paths] == [['E1', 'R1', 'E2']]
+        assert store.shortest_paths([('Error', 'E1')], [('Error', 'E2')], max_hops=1, limit=3) == []
+    
+    def test_backend_selection(self, monkeypatch):
+        """Test that the local store is used without Neo4j credentials"""
+        sys.path.insert(0, str(PROJECT_ROOT / "tools" / "neo4j"))
+        import graph_store
+        for var in ('GRAPH_BACKEND', 'NEO4J_URI', 'NEO4J_USERNAME', 'NEO4J_PASSWORD'):
+            monkeypatch.delenv(var, raising=False)
+        assert graph_store.graph_backend() == 'sqlite'
+        
+        monkeypatch.setenv('NEO4J_URI', 'neo4j://localhost')
+        monkeypatch.setenv('NEO4J_USERNAME', 'neo4j')
+        monkeypatch.setenv('NEO4J_PASSWORD', 'secret')
+        assert graph_store.graph_backend() == 'neo4j'
+        
+        monkeypatch.setenv('GRAPH_BACKEND', 'SQLite')
+        assert graph_store.graph_backend() == 'sqlite'
+        monkeypatch.setenv('GRAPH_BACKEND', 'mongo')
+        with pytest.raises(ValueError):
+            graph_store.graph_backend()
+
+
+class TestLocalLearningEngine:
+    """Test the learning loop on the local graph store"""
+    
+    @pytest.fixture
+    def engine(self, tmp_path, monkeypatch):
+        if LearningEngine is None:
+            pytest.skip("LearningEngine not available")
+        
+        module = sys.modules[LearningEngine.__module__]
+        monkeypatch.setattr(module, 'TEMPLATE_INDEX_FILE', tmp_path / "templates.json")
+        engine = module.LocalLearningEngine(module.open_graph_store(tmp_path / "graph.db"))
+        yield engine
+        engine.close()
+    
+    def test_errors_aggregate_and_resolve(self, engine):
+        """Test that repeated errors share a node, a template and their resolutions"""
+        first = engine.record_error("TypeError", "Cannot read property 'id' of undefined at src/a.js:3",
+                                    resolution="Added null check", resolution_approach="guard clause")
+        engine.record_error("TypeError", "Cannot read property 'id' of undefined at src/b.js:9",
+                            resolution="Added null check", resolution_approach="guard clause")
+        
+        similar = engine.find_similar_errors("Cannot read property 'id' of undefined at lib/c.js:1")
+        assert similar[0]['error_type'] == 'TypeError'
+        assert similar[0]['resolutions'][0]['approach'] == 'guard clause'
+        assert similar[0]['template'] == "Cannot read property 'id' of undefined at <PATH>:<NUM>"
+        assert engine.get_learning_stats() == {'errors_tracked': 1, 'resolutions': 1, 'patterns': 0,
+                                               'learnings': 0, 'error_resolution_links': 1}
+        
+        paths = engine.find_reasoning_path("TypeError", "guard clause")
+        assert [step['properties']['id'] for step in paths[0]['steps']][-1] == first
+    
+    def test_patterns_rank_recommendations(self, engine):
+        """Test that recorded successes come back as recommendations"""
+        engine.record_success("task-1", "auth", "JWT tokens with refresh rotation", confidence=0.8)
+        engine.record_success("task-2", "auth", "JWT tokens with refresh rotation", confidence=0.6)
+        
+        [pattern] = engine.get_successful_patterns("auth")
+        assert pattern['success_count'] == 2
+        assert pattern['avg_confidence'] == pytest.approx(0.7)
+        
+        [rec] = engine.get_recommendations("implement jwt refresh tokens")
+        assert rec['source'] == 'pattern'
+        assert rec['matched_keywords'] == ['jwt', 'refresh', 'tokens']
+    
+    def test_template_ids_come_from_the_graph(self, engine, tmp_path, monkeypatch):
+        """Test that a machine without the local template index reuses the graph's template ids"""
+        engine.record_error("TimeoutError", "Timeout after 30s waiting for worker lock")
+        engine.close()
+        
+        # Another machine: same graph, no local index
+        module = sys.modules[LearningEngine.__module__]
+        monkeypatch.setattr(module, 'TEMPLATE_INDEX_FILE', tmp_path / "elsewhere.json")
+        other = module.LocalLearningEngine(module.open_graph_store(tmp_path / "graph.db"))
+        try:
+            other.record_error("TimeoutError", "Timeout after 45s waiting for scheduler lock")
+            similar = other.find_similar_errors("Timeout after 5s waiting for db lock")
+            assert len(similar) == 2
+            assert other.store.count('ErrorTemplate') == 1
+        finally:
+            other.close()
+    
+    def test_rolled_back_errors_are_not_templates(self, engine):
+        """Test that the errors of a replay that fails leave neither nodes nor templates"""
+        events = [
+            {'id': 'EVT_1', 'kind': 'record_error', 'queued_at': '2026-01-01T00:00:00+00:00',
+             'args': {'error_type': 'TypeError', 'message': 'x is undefined'}},
+            {'id': 'EVT_2', 'kind': 'drop_everything', 'queued_at': '2026-01-01T00:00:00+00:00',
+             'args': {}},
+        ]
+        
+        with pytest.raises(ValueError):
+            engine.replay_events(events)
+        assert engine.store.count('Error') == 0
+        assert engine.templates.clusters == {}
+    
+    def test_replayed_events_apply_once(self, engine, tmp_path):
+        """Test that queued records are written by a flush, and a batch replayed twice counts once"""
+        sys.path.insert(0, str(PROJECT_ROOT / "tools" / "neo4j"))
+        import learning_queue
+        queue = learning_queue.LearningQueue.open(tmp_path / "queue.db")
+        queue.append('record_error', {'error_type': 'TimeoutError', 'message': 'Timed out after 30s',
+                                      'resolution': 'Raised the timeout'})
+        queue.append('record_success', {'task_id': 'task-1', 'task_type': 'auth', 'approach': 'JWT'})
+        
+        events = queue.peek()
+        assert engine.replay_events(events) == 2
+        assert queue.flush(engine.replay_events) == {'replayed': 2, 'applied': 0, 'batches': 1}
+        queue.close()
+        
+        [error] = engine.find_similar_errors("Timed out after 45s")
+        assert error['occurrences'] == 1
+        assert error['resolutions'][0]['resolution'] == 'Raised the timeout'
+        assert engine.get_successful_patterns("auth")[0]['success_count'] == 1
+    
+    def test_only_recent_replays_are_kept(self, engine):
+        """Test that direct records leave no LearningEvent and expired ones are pruned"""
+        engine.record_success("task-1", "auth", "JWT")
+        assert engine.store.count('LearningEvent') == 0
+        
+        engine.store.merge_node('LearningEvent', 'EVT_old',
+                                {'id': 'EVT_old', 'applied_at': '2020-01-01T00:00:00+00:00'})
+        engine.replay_events([{'id': 'EVT_new', 'kind': 'record_success',
+                               'queued_at': '2026-01-01T00:00:00+00:00',
+                               'args': {'task_id': 'task-2', 'task_type': 'auth', 'approach': 'JWT'}}])
+        assert [event['id'] for event in engine.store.nodes('LearningEvent')] == ['EVT_new']
+
+
+class TestLearningQueue:
+    """Test the offline queue of learning records"""
+    
+    @pytest.fixture
+    def queue(self, tmp_path):
+        sys.path.insert(0, str(PROJECT_ROOT / "tools" / "neo4j"))
+        import learning_queue
+        queue = learning_queue.LearningQueue.open(tmp_path / "queue.db")
+        yield queue
+        queue.close()
+    
+    def test_append_keeps_order(self, queue):
+        """Test that events are kept durably, oldest first, with unique ids"""
+        first = queue.append('record_error', {'error_type': 'TypeError', 'message': 'x is undefined'})
+        second = queue.append('create_learning', {'title': 'T', 'category': 'C', 'insight': 'I'})
+        
+        events = queue.peek()
+        assert [event['id'] for event in events] == [first, second]
+        assert events[0]['args'] == {'error_type': 'TypeError', 'message': 'x is undefined'}
+        assert queue.pending() == 2
+        
+        with pytest.raises(ValueError):
+            queue.append('drop_everything', {})
+    
+    def test_flush_replays_in_batches(self, queue):
+        """Test that a flush replays batch by batch and empties the queue"""
+        for i in range(5):
+            queue.append('record_success', {'task_id': f'task-{i}', 'task_type': 't', 'approach': 'a'})
+        batches = []
+        
+        totals = queue.flush(lambda events: batches.append(events) or len(events), batch_size=2)
+        
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert totals == {'replayed': 5, 'applied': 5, 'batches': 3}
+        assert queue.pending() == 0
+    
+    def test_failed_replay_keeps_events(self, queue):
+        """Test that events stay queued, in order, when the database is unreachable"""
+        first = queue.append('record_success', {'task_id': 'task-1', 'task_type': 't', 'approach': 'a'})
+        queue.append('record_success', {'task_id': 'task-2', 'task_type': 't', 'approach': 'a'})
+        
+        def unreachable(events):
+            raise ConnectionError("Neo4j unreachable")
+        
+        with pytest.raises(ConnectionError):
+            queue.flush(unreachable)
+        assert queue.pending() == 2
+        assert queue.peek(1)[0]['id'] == first
+    
+    def test_replay_writes_only_unapplied_events(self):
+        """Test that the Neo4j replay skips events a previous replay already wrote"""
+        if LearningEngine is None:
+            pytest.skip("LearningEngine not available")
+        
+        with patch.object(LearningEngine, '__init__', lambda x, *args, **kwargs: None):
+            engine = LearningEngine.__new__(LearningEngine)
+        rows = engine._event_rows([
+            {'id': 'EVT_1', 'kind': 'record_error', 'queued_at': '2026-01-01T00:00:00+00:00',
+             'args': {'error_type': 'TypeError', 'message': 'm', 'resolution': 'fix'}},
+            {'id': 'EVT_2', 'kind': 'create_learning', 'queued_at': '2026-01-01T00:00:00+00:00',
+             'args': {'title': 'T', 'category': 'C', 'insight': 'I'}},
+        ])
+        assert rows['resolution'][0]['approach'] == 'manual fix'
+        
+        templates = sys.modules[LearningEngine.__module__].TemplateMiner()
+        
+        tx = Mock()
+        tx.run.side_effect = [None, [{'id': 'EVT_2'}], None, None, None, None]
+        applied, miner = LearningEngine._replay_events_tx(tx, rows, templates)
+        assert applied == 1
+        
+        # Expired events are pruned before the batch claims its own
+        assert 'DETACH DELETE ev' in tx.run.call_args_list[0].args[0]
+        # Errors, resolutions, successes, learnings: only the unapplied learning is written
+        written = [call.kwargs['rows'] for call in tx.run.call_args_list[2:]]
+        assert written == [[], [], [], rows['create_learning']]
+        # An error already applied is not counted into its template again
+        assert miner.clusters == {}
+        
+        tx.run.side_effect = [None, [{'id': 'EVT_1'}], None, None, None, None]
+        applied, miner = LearningEngine._replay_events_tx(tx, rows, templates)
+        assert rows['record_error'][0]['template_id'] in miner.clusters
+        assert templates.clusters == {}
+
+
 class TestRecommendationOutput:
     """Test recommendation formatting"""
     
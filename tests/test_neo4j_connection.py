@@ -0,0 +1,73 @@
+"""
+Unit tests for the shared Neo4j connection.
+Tests driver pooling and fulltext query building.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Project root (tools are imported from tools/neo4j)
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestSharedDriver:
+    """Test the pooled driver shared by all Neo4j tools"""
+    
+    @pytest.fixture
+    def connection(self, monkeypatch):
+        sys.path.insert(0, str(PROJECT_ROOT / "tools" / "neo4j"))
+        try:
+            import neo4j_connection as connection
+        except ImportError:
+            pytest.skip("neo4j driver not available")
+        monkeypatch.setattr(connection, "GraphDatabase", MagicMock())
+        monkeypatch.setattr(connection, "_drivers", {})
+        return connection
+    
+    def test_driver_is_shared(self, connection, monkeypatch):
+        """Test that callers with the same URI and user get one pooled driver"""
+        monkeypatch.setenv("NEO4J_MAX_POOL_SIZE", "8")
+        monkeypatch.setenv("NEO4J_ACQUISITION_TIMEOUT", "not-a-number")
+        
+        first = connection.get_driver("bolt://db", "neo4j", "secret")
+        assert connection.get_driver("bolt://db", "neo4j", "secret") is first
+        assert connection.GraphDatabase.driver.call_count == 1
+        
+        config = connection.GraphDatabase.driver.call_args.kwargs
+        assert config['max_connection_pool_size'] == 8
+        assert config['connection_acquisition_timeout'] == 60.0
+        
+        connection.get_driver("bolt://other", "neo4j", "secret")
+        assert connection.GraphDatabase.driver.call_count == 2
+        
+        # A rotated password must not get the driver built with the old one
+        connection.get_driver("bolt://db", "neo4j", "rotated")
+        assert connection.GraphDatabase.driver.call_count == 3
+        assert connection.GraphDatabase.driver.call_args.kwargs['auth'] == ("neo4j", "rotated")
+        
+        connection.close_all()
+        assert first.close.called
+        assert connection._drivers == {}
+    
+    def test_driver_availability_flag(self):
+        """Test that the availability flag reports whether the neo4j driver imports"""
+        import neo4j_connection
+        try:
+            from neo4j import GraphDatabase
+            installed = True
+        except ImportError:
+            installed = False
+        assert neo4j_connection.NEO4J_DRIVER_AVAILABLE == installed
+    
+    def test_fulltext_query_strips_lucene_syntax(self, connection):
+        """Test that free text becomes a safe Lucene query"""
+        assert connection.fulltext_query(['auth', 'jwt']) == 'auth* jwt*'
+        assert connection.fulltext_query('UI/UX Design', require_all=True) == '+ui* +ux* +design*'
+        assert connection.fulltext_query('TypeError: "x" AND (y)', prefix=False) == 'typeerror x and y'
+        assert connection.fulltext_query('?! --') == ''
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
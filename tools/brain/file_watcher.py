@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File Watcher
+
+Create/modify/delete events for markdown trees, used by the Learner's
+follow mode to keep INDEX.md, the search index and Neo4j in sync.
+
+- InotifyWatcher: kernel events on Linux (no dependencies, via ctypes)
+- PollingWatcher: stat-diff snapshots everywhere else
+- watch_changes(): debounces events into batches of {path: kind}
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__'}
+
+Event = Tuple[str, Path]
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class PollingWatcher:
+    """Stat-diff watcher: compares (mtime, size) snapshots of the trees"""
+
+    backend = "polling"
+
+    def __init__(self, roots: Iterable[Path], pattern: str = "*.md", interval: float = 1.0):
+        self.roots = [Path(root) for root in roots]
+        self.pattern = pattern
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        stamps: Dict[str, Tuple[int, int]] = {}
+        for root in self.roots:
+            self._scan_dir(str(root), stamps)
+        return stamps
+
+    def _scan_dir(self, directory: str, stamps: Dict[str, Tuple[int, int]]):
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            self._scan_dir(entry.path, stamps)
+                    elif fnmatch(entry.name, self.pattern):
+                        stat = entry.stat()
+                        stamps[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+
+    def poll(self, timeout: float) -> List[Event]:
+        """Wait timeout seconds, then report what changed since the last poll"""
+        if timeout > 0:
+            time.sleep(timeout)
+
+        previous, current = self.snapshot, self._scan()
+        self.snapshot = current
+
+        events = []
+        for path, stamp in current.items():
+            old = previous.get(path)
+            if old is None:
+                events.append((CREATED, Path(path)))
+            elif old != stamp:
+                events.append((MODIFIED, Path(path)))
+        for path in previous.keys() - current.keys():
+            events.append((DELETED, Path(path)))
+        return events
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """inotify(7) watcher with one watch per directory (Linux only)"""
+
+    backend = "inotify"
+
+    def __init__(self, roots: Iterable[Path], pattern: str = "*.md", interval: float = 1.0):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.roots = [Path(root) for root in roots]
+        self.pattern = pattern
+        self.interval = interval
+        self.dirs: Dict[int, str] = {}
+        self.files: Set[str] = set()
+
+        try:
+            for root in self.roots:
+                if root.is_dir():
+                    self._add_tree(str(root))
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: str):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            return  # Directory vanished before it could be watched
+        self.dirs[wd] = directory
+
+    def _add_tree(self, directory: str, events: Optional[List[Event]] = None):
+        """Watch a directory and everything below it"""
+        self._add_watch(directory)
+        for dir_path, dir_names, file_names in os.walk(directory):
+            dir_names[:] = [name for name in dir_names if name not in SKIP_DIRS]
+            for name in dir_names:
+                self._add_watch(os.path.join(dir_path, name))
+            for name in file_names:
+                if fnmatch(name, self.pattern):
+                    path = os.path.join(dir_path, name)
+                    self.files.add(path)
+                    if events is not None:
+                        # Written before the watch existed
+                        events.append((CREATED, Path(path)))
+
+    def _drop_tree(self, directory: str, events: List[Event]):
+        """Forget a directory that was moved away"""
+        prefix = directory + os.sep
+        for wd, path in list(self.dirs.items()):
+            if path == directory or path.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.dirs[wd]
+        for path in [path for path in self.files if path.startswith(prefix)]:
+            self.files.discard(path)
+            events.append((DELETED, Path(path)))
+
+    def _rescan(self) -> List[Event]:
+        """Recover from a queue overflow: every known file may have changed"""
+        for wd in list(self.dirs):
+            self.libc.inotify_rm_watch(self.fd, wd)
+        self.dirs.clear()
+        known, self.files = self.files, set()
+
+        for root in self.roots:
+            if root.is_dir():
+                self._add_tree(str(root))
+        events = [(MODIFIED, Path(path)) for path in sorted(self.files)]
+        events.extend((DELETED, Path(path)) for path in sorted(known - self.files))
+        return events
+
+    def _read(self) -> bytes:
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def poll(self, timeout: float) -> List[Event]:
+        """Wait up to timeout seconds for events"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        data = self._read()
+        events: List[Event] = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                events.extend(self._rescan())
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+
+            if mask & IN_ISDIR:
+                if name in SKIP_DIRS:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path, events)
+                elif mask & IN_MOVED_FROM:
+                    self._drop_tree(path, events)
+                continue
+
+            if not fnmatch(name, self.pattern):
+                continue
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.files.add(path)
+                events.append((CREATED, Path(path)))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.files.discard(path)
+                events.append((DELETED, Path(path)))
+            elif mask & (IN_MODIFY | IN_CLOSE_WRITE):
+                self.files.add(path)
+                events.append((MODIFIED, Path(path)))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(roots: Iterable[Path], pattern: str = "*.md", interval: float = 1.0,
+                   polling: bool = False):
+    """inotify watcher where available, stat-diff polling otherwise"""
+    roots = list(roots)
+    if not polling:
+        try:
+            return InotifyWatcher(roots, pattern, interval)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, pattern, interval)
+
+
+def coalesce(pending: Dict[Path, str], events: Iterable[Event]) -> Dict[Path, str]:
+    """Fold events into one change per path (e.g. created+modified -> created)"""
+    for kind, path in events:
+        previous = pending.get(path)
+        if kind == DELETED:
+            if previous == CREATED:
+                del pending[path]  # Never seen by consumers
+            else:
+                pending[path] = DELETED
+        elif kind == CREATED:
+            pending[path] = MODIFIED if previous == DELETED else CREATED
+        elif previous != CREATED:
+            pending[path] = MODIFIED
+    return pending
+
+
+def watch_changes(watcher, on_batch: Callable[[Dict[Path, str]], None],
+                  debounce: float = 0.5, max_delay: float = 5.0,
+                  stop: Optional[Callable[[], bool]] = None):
+    """Feed debounced batches of changes to on_batch until stop() returns True
+
+    A batch is flushed once no event arrived for `debounce` seconds, or at
+    the latest `max_delay` seconds after its first event.
+    """
+    pending: Dict[Path, str] = {}
+    first = last = 0.0
+
+    while not (stop and stop()):
+        events = watcher.poll(debounce if pending else watcher.interval)
+        now = time.monotonic()
+        if events:
+            if not pending:
+                first = now
+            coalesce(pending, events)
+            last = now
+
+        quiet = not events and now - last >= debounce
+        if pending and (quiet or now - first >= max_delay):
+            batch, pending = pending, {}
+            on_batch(batch)
+
+    if pending:
+        on_batch(pending)
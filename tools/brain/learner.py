@@ -10,9 +10,11 @@ The Learner is the "memory" that:
 - Automatically triggers /compound learning
 - Captures knowledge to the Knowledge Base
 - Updates Neo4j and indexes
+- Follows KB/docs edits live (--follow), updating indexes incrementally
 
 Usage:
     python tools/brain/learner.py --watch
+    python tools/brain/learner.py --watch --follow
     python tools/brain/learner.py --learn "Task completed: User authentication"
     python tools/brain/learner.py --stats
 """
@@ -22,7 +24,8 @@ import sys
 import subprocess
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
+from file_watcher import create_watcher, watch_changes
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -32,6 +35,12 @@ if sys.platform == 'win32':
     except:
         pass
 
+# KB index modules live with the KB CLI
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+# Learning records are queued for the learning engine, which may be offline
+sys.path.insert(0, str(Path(__file__).parent.parent / 'neo4j'))
+from learning_queue import queue_event, start_background_flush
+
 
 def get_project_root() -> Path:
     """Get the project root directory."""
@@ -81,7 +90,6 @@ def trigger_compound(description: str) -> Dict[str, Any]:
     # Run KB index update
     kb_cli = get_project_root() / "bin" / "kb_cli.py"
     neo4j_sync = get_tools_dir() / "neo4j" / "sync_skills_to_neo4j.py"
-    learning_engine = get_tools_dir() / "neo4j" / "learning_engine.py"
     
     results = {
         "description": description,
@@ -115,22 +123,21 @@ def trigger_compound(description: str) -> Dict[str, Any]:
     except Exception as e:
         results["steps"].append({"step": "Neo4j Sync", "status": "skipped", "error": str(e)})
     
-    # Step 3: Record success in learning engine
+    # Step 3: Record success in learning engine (queued locally, written in the background)
     try:
-        if learning_engine.exists():
-            subprocess.run(
-                [sys.executable, str(learning_engine), 
-                 "--record-success", description,
-                 "--task-type", "feature"],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            results["steps"].append({"step": "Learning Engine", "status": "success"})
+        event_id = queue_event("record_success", {
+            "task_id": description,
+            "task_type": "feature",
+            "approach": description
+        })
+        step = {"step": "Learning Engine", "status": "queued", "event": event_id}
+        if not start_background_flush():
+            step["note"] = "run learning_engine.py --flush-queue"
+        results["steps"].append(step)
     except Exception as e:
-        results["steps"].append({"step": "Learning Engine", "status": "skipped", "error": str(e)})
+        results["steps"].append({"step": "Learning Engine", "status": "failed", "error": str(e)})
     
-    results["success"] = all(s.get("status") in ["success", "skipped"] for s in results["steps"])
+    results["success"] = all(s.get("status") in ["success", "skipped", "queued"] for s in results["steps"])
     
     return results
 
@@ -194,6 +201,131 @@ def watch() -> Dict[str, Any]:
     }
 
 
+def get_sync_queue_path() -> Path:
+    """Get the pending Neo4j sync queue path."""
+    return get_project_root() / "docs" / ".brain-sync-queue.json"
+
+
+def load_sync_queue() -> Dict[str, str]:
+    """Load files waiting for Neo4j sync ({path: change})."""
+    queue_path = get_sync_queue_path()
+    if not queue_path.exists():
+        return {}
+    
+    with open(queue_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("pending", {})
+
+
+def save_sync_queue(pending: Dict[str, str]) -> None:
+    """Save files waiting for Neo4j sync."""
+    queue_path = get_sync_queue_path()
+    queue_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with open(queue_path, 'w', encoding='utf-8') as f:
+        json.dump({"pending": pending, "lastUpdated": datetime.now().isoformat()},
+                  f, indent=2, ensure_ascii=False)
+
+
+def flush_sync_queue(pending: Dict[str, str]) -> str:
+    """
+    Sync queued files to Neo4j in one run. Returns "success", "queued"
+    (sync unavailable or failed, files stay queued) or "skipped".
+    """
+    neo4j_sync = get_tools_dir() / "neo4j" / "sync_skills_to_neo4j.py"
+    if not pending:
+        return "success"
+    if not neo4j_sync.exists():
+        return "skipped"
+    
+    try:
+        result = subprocess.run(
+            [sys.executable, str(neo4j_sync), "--files"] + sorted(pending),
+            capture_output=True,
+            text=True,
+            timeout=120
+        )
+    except Exception:
+        return "queued"
+    return "success" if result.returncode == 0 else "queued"
+
+
+def apply_changes(changes: Dict[Path, str]) -> Dict[str, Any]:
+    """
+    Push a batch of KB/docs changes into INDEX.md, the search index and
+    the Neo4j sync queue.
+    """
+    from kb_index import update_index
+    
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "changes": {str(path): kind for path, kind in sorted(changes.items())},
+        "steps": []
+    }
+    
+    # Step 1: INDEX.md + search index (both only re-parse changed files)
+    try:
+        summary = update_index(quiet=True)
+        results["steps"].append({"step": "KB Index Update", "status": "success", **summary})
+    except Exception as e:
+        results["steps"].append({"step": "KB Index Update", "status": "failed", "error": str(e)})
+    
+    # Step 2: Neo4j - queue first so nothing is lost while the sync is unavailable
+    pending = load_sync_queue()
+    pending.update(results["changes"])
+    status = flush_sync_queue(pending)
+    if status == "success":
+        pending = {}
+    save_sync_queue(pending)
+    results["steps"].append({"step": "Neo4j Sync", "status": status, "queued": len(pending)})
+    
+    return results
+
+
+def create_kb_watcher(interval: float = 1.0, polling: bool = False):
+    """Create a watcher for the KB and docs markdown trees."""
+    from kb_common import KBConfig
+    return create_watcher(KBConfig().get_all_kb_paths(), "*.md", interval, polling)
+
+
+def follow(watcher, report: Callable[[Dict[str, Any]], None], debounce: float = 0.5,
+           stop: Optional[Callable[[], bool]] = None) -> None:
+    """
+    Follow mode - apply debounced batches of KB/docs changes until interrupted.
+    """
+    def on_batch(changes: Dict[Path, str]):
+        # INDEX.md is our own output
+        changes = {path: kind for path, kind in changes.items() if path.name != "INDEX.md"}
+        if changes:
+            report(apply_changes(changes))
+    
+    try:
+        watch_changes(watcher, on_batch, debounce=debounce, stop=stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def print_batch(result: Dict[str, Any]) -> None:
+    """Print one applied batch of changes."""
+    changes = result["changes"]
+    counts = {}
+    for kind in changes.values():
+        counts[kind] = counts.get(kind, 0) + 1
+    
+    print(f"🔄 {len(changes)} change(s): " + ", ".join(f"{n} {kind}" for kind, n in sorted(counts.items())))
+    for step in result["steps"]:
+        status = "✅" if step["status"] == "success" else "⚠️"
+        if step["step"] == "KB Index Update" and step["status"] == "success":
+            detail = f"{step['reparsed']} re-parsed, {step['removed']} removed"
+        elif "queued" in step:
+            detail = f"{step['status']}, {step['queued']} queued"
+        else:
+            detail = step.get("error", step["status"])
+        print(f"  {status} {step['step']}: {detail}")
+    sys.stdout.flush()
+
+
 def toggle_auto_learn(enabled: bool) -> Dict[str, Any]:
     """Toggle auto-learning."""
     log = load_learner_log()
@@ -234,6 +366,10 @@ def main():
     
     parser = argparse.ArgumentParser(description="Brain Learner - Layer 1 Root Component")
     parser.add_argument("--watch", action="store_true", help="Watch for completed tasks")
+    parser.add_argument("--follow", action="store_true", help="With --watch: keep running and apply changes live")
+    parser.add_argument("--polling", action="store_true", help="With --follow: use stat polling instead of inotify")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Quiet period before a batch is applied")
     parser.add_argument("--learn", type=str, help="Trigger learning for a task")
     parser.add_argument("--enable", action="store_true", help="Enable auto-learning")
     parser.add_argument("--disable", action="store_true", help="Disable auto-learning")
@@ -253,6 +389,18 @@ def main():
                     status = "✅" if step["status"] == "success" else "⚠️"
                     print(f"  {status} {step['step']}")
         
+        elif args.watch and args.follow:
+            watcher = create_kb_watcher(args.interval, args.polling)
+            if args.json:
+                report = lambda result: print(json.dumps(result), flush=True)
+            else:
+                print("👁️ Learner Follow Mode")
+                print("━" * 50)
+                print(f"Backend: {watcher.backend} | Ctrl+C to stop")
+                sys.stdout.flush()
+                report = print_batch
+            follow(watcher, report, debounce=args.debounce)
+        
         elif args.watch:
             result = watch()
             if args.json:
@@ -285,6 +433,7 @@ def main():
             print("Commands:")
             print("  --learn \"description\"  Trigger learning")
             print("  --watch               Watch mode")
+            print("  --watch --follow      Apply KB/docs changes live")
             print("  --enable/--disable    Toggle auto-learn")
             print("  --stats               Show statistics")
     
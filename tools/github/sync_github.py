@@ -1,9 +1,14 @@
 import os
 import re
+import sys
+from pathlib import Path
 from github import Github
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
+# Pooled driver shared by every Neo4j tool in the process
+sys.path.insert(0, str(Path(__file__).parent.parent / 'neo4j'))
+from neo4j_connection import get_driver
+
 load_dotenv()
 
 # Config
@@ -17,12 +22,13 @@ class GitHubNeo4jBridge:
     def __init__(self):
         if not all([URI, USERNAME, PASSWORD, GITHUB_TOKEN, GITHUB_REPO]):
             raise Exception("Missing environment variables in .env")
-        self.driver = GraphDatabase.driver(URI, auth=(USERNAME, PASSWORD))
+        self.driver = get_driver(URI, USERNAME, PASSWORD)
         self.github = Github(GITHUB_TOKEN)
         self.repo = self.github.get_repo(GITHUB_REPO)
 
     def close(self):
-        self.driver.close()
+        # The pool is shared with other in-process callers and closed at exit
+        self.driver = None
 
     def sync_issues(self):
         print(f"Syncing issues from {GITHUB_REPO}...")
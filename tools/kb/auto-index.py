@@ -26,8 +26,11 @@ if sys.platform == 'win32':
     except (AttributeError, OSError):
         pass
 
-# Add parent directory to path
+# Add parent directory and the KB CLI lib (shared corpus loader) to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_corpus import get_corpus
 
 try:
     from utils.common import print_success, print_error, print_warning, print_info, print_header, get_project_root
@@ -41,33 +44,6 @@ except ImportError:
     def get_project_root(): return Path.cwd()
 
 
-def parse_yaml_frontmatter(content):
-    """Extract YAML frontmatter from markdown content."""
-    pattern = r'^---\s*\n(.*?)\n---\s*\n'
-    match = re.match(pattern, content, re.DOTALL)
-    
-    if not match:
-        return {}
-    
-    yaml_content = match.group(1)
-    metadata = {}
-    
-    # Simple YAML parsing (key: value pairs)
-    for line in yaml_content.split('\n'):
-        if ':' in line:
-            key, _, value = line.partition(':')
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            
-            # Handle arrays like [tag1, tag2]
-            if value.startswith('[') and value.endswith(']'):
-                value = [v.strip().strip('"').strip("'") for v in value[1:-1].split(',')]
-            
-            metadata[key] = value
-    
-    return metadata
-
-
 def get_priority_emoji(priority):
     """Get emoji for priority level."""
     priority_map = {
@@ -96,7 +72,9 @@ def scan_knowledge_base(kb_path):
     """Scan knowledge base and extract all entries."""
     entries = []
     
-    for md_file in kb_path.rglob('*.md'):
+    for corpus_entry in get_corpus().files(kb_path):
+        md_file = corpus_entry.path
+        
         # Skip INDEX.md, README.md, and guide files
         if md_file.name.upper() in ['INDEX.MD', 'README.MD']:
             continue
@@ -105,13 +83,12 @@ def scan_knowledge_base(kb_path):
         if md_file.name.startswith('.'):
             continue
             
-        try:
-            content = md_file.read_text(encoding='utf-8')
-        except Exception as e:
-            print_warning(f"Could not read {md_file.name}: {e}")
+        if not corpus_entry.load():
+            print_warning(f"Could not read {md_file.name}: {corpus_entry.error}")
             continue
         
-        metadata = parse_yaml_frontmatter(content)
+        content = corpus_entry.content
+        metadata = corpus_entry.metadata
         
         # Extract title from frontmatter or filename
         title = metadata.get('title', '')
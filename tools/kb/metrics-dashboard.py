@@ -27,8 +27,11 @@ if sys.platform == 'win32':
     except (AttributeError, OSError):
         pass
 
-# Add parent directory to path
+# Add parent directory and the KB CLI lib (shared corpus loader) to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_corpus import get_corpus
 
 try:
     from utils.common import print_success, print_error, print_info, print_header, get_project_root
@@ -42,42 +45,22 @@ except ImportError:
     def get_kb_stats(): return {'total_entries': 0, 'by_category': {}}
 
 
-def parse_yaml_frontmatter(content):
-    """Extract YAML frontmatter from markdown content."""
-    pattern = r'^---\s*\n(.*?)\n---\s*\n'
-    match = re.match(pattern, content, re.DOTALL)
-    
-    if not match:
-        return {}
-    
-    yaml_content = match.group(1)
-    metadata = {}
-    
-    for line in yaml_content.split('\n'):
-        if ':' in line:
-            key, _, value = line.partition(':')
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            if value.startswith('[') and value.endswith(']'):
-                value = [v.strip().strip('"').strip("'") for v in value[1:-1].split(',')]
-            metadata[key] = value
-    
-    return metadata
-
-
 def get_kb_metrics(kb_path):
     """Calculate KB metrics."""
     entries = []
     
-    for md_file in kb_path.rglob('*.md'):
+    for corpus_entry in get_corpus().files(kb_path):
+        md_file = corpus_entry.path
         if md_file.name.upper() in ['INDEX.MD', 'README.MD']:
             continue
         if 'HOW-IT-WORKS' in md_file.name.upper() or 'AUTO-LEARNING-GUIDE' in md_file.name.upper():
             continue
         
+        if not corpus_entry.load():
+            continue
+        
         try:
-            content = md_file.read_text(encoding='utf-8')
-            metadata = parse_yaml_frontmatter(content)
+            metadata = corpus_entry.metadata
             
             date = metadata.get('date', '')
             if not date:
@@ -6,22 +6,31 @@ Parallel Brain Workflow Executor
 This script runs all Brain workflow operations in parallel for faster execution.
 Combines LEANN indexing, Neo4j syncs, and document processing into concurrent tasks.
 
+Syncs run in-process as a task graph: one corpus scan and one pooled Neo4j
+driver are shared by all tasks, and each relationship task starts as soon as
+the sync it depends on has finished. --isolated runs every sync in its own
+Python subprocess instead.
+
 Usage:
     python brain_parallel.py --setup      # First-time setup (sequential)
     python brain_parallel.py --sync       # Sync all indexes in parallel
     python brain_parallel.py --stats      # View all statistics
     python brain_parallel.py --full       # Full sync with all operations
+    python brain_parallel.py --full --isolated  # Same, one subprocess per sync
 """
 
+import io
 import asyncio
 import subprocess
 import sys
 import os
 import time
 import argparse
+import threading
+import traceback
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Set, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from datetime import datetime
 
 # Set UTF-8 encoding for Windows console
@@ -32,6 +41,15 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Sync modules are imported from here for in-process runs
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Markdown trees walked once and shared by the in-process syncs
+CORPUS_ROOTS = ('docs', '.agent')
+
+# In-process task: (name, func, dependencies); func gets the results of finished tasks by name
+GraphTask = Tuple[str, Callable[[Dict], object], Tuple[str, ...]]
+
 # Color codes for terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -118,6 +136,198 @@ def run_parallel_tasks(tasks: List[Tuple[List[str], str]], max_workers: int = 4)
     
     return results
 
+_task_output = threading.local()
+
+class TaskOutput:
+    """sys.stdout/sys.stderr stand-in that keeps each task thread's output apart"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def _target(self):
+        buffer = getattr(_task_output, 'buffer', None)
+        return self.stream if buffer is None else buffer
+    
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def run_task(name: str, func: Callable[[Dict], object], values: Dict) -> Tuple[str, bool, str, float]:
+    """
+    Run an in-process task, capturing what it prints.
+    Returns: (name, success, output, duration)
+    """
+    start_time = time.time()
+    _task_output.buffer = buffer = io.StringIO()
+    try:
+        values[name] = func(values)
+        success = True
+    except Exception:
+        traceback.print_exc()
+        success = False
+    finally:
+        _task_output.buffer = None
+    return (name, success, buffer.getvalue(), time.time() - start_time)
+
+def run_task_graph(tasks: List[GraphTask], max_workers: int = 4) -> List[Tuple[str, bool, str, float]]:
+    """
+    Run in-process tasks on a thread pool, each as soon as its dependencies succeeded.
+    Tasks depending on a failed task are skipped.
+    Returns: List of (name, success, output, duration) tuples
+    """
+    results = []
+    values: Dict[str, object] = {}
+    waiting = {name: (func, set(deps)) for name, func, deps in tasks}
+    succeeded: Set[str] = set()
+    failed: Set[str] = set()
+    
+    print(f"\n{Colors.CYAN}  Running {len(tasks)} tasks in-process (max {max_workers} workers)...{Colors.ENDC}\n")
+    
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = TaskOutput(stdout), TaskOutput(stderr)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            while waiting or running:
+                for name in [name for name, (_, deps) in waiting.items() if deps <= succeeded]:
+                    func, _ = waiting.pop(name)
+                    running[executor.submit(run_task, name, func, values)] = name
+                
+                if not running:
+                    # Nothing left that can run: dependencies failed or unknown
+                    for name, (_, deps) in waiting.items():
+                        missing = ', '.join(sorted(deps - succeeded))
+                        results.append((name, False, f"Skipped: needs {missing}", 0.0))
+                        print_task(f"{name} (needs {missing})", "skipped")
+                    break
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    del running[future]
+                    results.append(result)
+                    (succeeded if result[1] else failed).add(result[0])
+                    
+                    status = "success" if result[1] else "error"
+                    print_task(f"{result[0]} ({result[3]:.2f}s)", status)
+                
+                # Tasks waiting on a failed (or skipped) task can never run
+                blocked = [name for name, (_, deps) in waiting.items() if deps & failed]
+                while blocked:
+                    for name in blocked:
+                        _, deps = waiting.pop(name)
+                        results.append((name, False, f"Skipped: {', '.join(sorted(deps & failed))} failed", 0.0))
+                        print_task(f"{name} (dependency failed)", "skipped")
+                        failed.add(name)
+                    blocked = [name for name, (_, deps) in waiting.items() if deps & failed]
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+    
+    return results
+
+def command_task(cmd: List[str], cwd: Optional[Path] = None) -> Callable[[Dict], str]:
+    """Wrap a shell command as an in-process task (fails if the command fails)"""
+    def run(values: Dict) -> str:
+        name, success, output, duration = run_command(cmd, ' '.join(cmd), cwd)
+        print(output, end='')
+        if not success:
+            raise RuntimeError(f"{cmd[0]} failed after {duration:.2f}s")
+        return output
+    return run
+
+def build_sync_tasks(include_leann: bool = False, all_relationships: bool = False,
+                     root: Optional[Path] = None) -> List[GraphTask]:
+    """
+    Sync task graph: corpus scan -> KB and document syncs -> their relationships.
+    all_relationships recreates relationships even when nothing changed.
+    Paths are taken below root (default: the project root). Each sync is
+    closed by its relationship task, or by the sync task when that fails.
+    """
+    import sync_skills_to_neo4j as skills
+    import document_sync as documents
+    from kb_corpus import get_corpus
+    from graph_store import graph_backend, open_graph_store
+    
+    root = project_path() if root is None else Path(root)
+    backend = graph_backend()
+    uri = os.getenv('NEO4J_URI')
+    username = os.getenv('NEO4J_USERNAME')
+    password = os.getenv('NEO4J_PASSWORD')
+    database = os.getenv('NEO4J_DATABASE', 'neo4j')
+    
+    def open_sync(local_class, neo4j_class):
+        """Sync on the configured backend, and the target scoping its sync state (as the scripts do)"""
+        if backend == 'sqlite':
+            sync = local_class(open_graph_store())
+            return sync, sync.store.target
+        return neo4j_class(uri, username, password, database), f"{uri}/{database}"
+    
+    def scan_corpus(values: Dict) -> int:
+        corpus = get_corpus()
+        count = sum(len(corpus.files(root / directory)) for directory in CORPUS_ROOTS)
+        print(f"📚 Scanned {count} markdown files")
+        return count
+    
+    def sync_skills(values: Dict):
+        sync, target = open_sync(skills.LocalSkillSync, skills.Neo4jSkillSync)
+        try:
+            return sync, skills.sync_knowledge_base(sync, target, root / '.agent' / 'knowledge-base',
+                                                    root / 'docs')
+        except BaseException:
+            sync.close()
+            raise
+    
+    def sync_documents(values: Dict):
+        sync, target = open_sync(documents.LocalDocumentSync, documents.DocumentSyncNeo4j)
+        try:
+            return sync, documents.sync_document_tree(sync, target, root, ['all'])
+        except BaseException:
+            sync.close()
+            raise
+    
+    def skill_relationships(values: Dict):
+        sync, result = values["Sync KB to Neo4j"]
+        try:
+            if result is None and not all_relationships:
+                print("✅ No entries changed, skill relationships are current")
+                return
+            sync.create_skill_relationships()
+        finally:
+            sync.close()
+    
+    def document_relationships(values: Dict):
+        sync, result = values["Sync Documents to Neo4j"]
+        try:
+            if result is None and not all_relationships:
+                print("✅ No documents changed, document relationships are current")
+                return
+            doc_ids = None if all_relationships else result['synced_ids']
+            sync.link_documents(doc_ids, bool(result and result['removed']),
+                                title_keys=result['title_keys'] if result else ())
+        finally:
+            sync.close()
+    
+    tasks: List[GraphTask] = [
+        ("Scan Corpus", scan_corpus, ()),
+        ("Sync KB to Neo4j", sync_skills, ("Scan Corpus",)),
+        ("Sync Documents to Neo4j", sync_documents, ("Scan Corpus",)),
+        ("Create Skill Relationships", skill_relationships, ("Sync KB to Neo4j",)),
+        ("Create Document Relationships", document_relationships, ("Sync Documents to Neo4j",)),
+    ]
+    if include_leann:
+        tasks.insert(0, ("Update LEANN Index", command_task(["leann", "index", "--update"], root), ()))
+    return tasks
+
+def sync_in_process(include_leann: bool = False, all_relationships: bool = False,
+                    max_workers: int = 4) -> List[Tuple[str, bool, str, float]]:
+    """Run the sync task graph in this process, on the project root like the subprocesses"""
+    return run_task_graph(build_sync_tasks(include_leann, all_relationships), max_workers)
+
 def get_tools_dir() -> Path:
     """Get the tools directory path"""
     return Path(__file__).parent
@@ -126,16 +336,33 @@ def get_project_root() -> Path:
     """Get the project root directory"""
     return Path(__file__).parent.parent.parent
 
+def project_path() -> Path:
+    """The project root as the scripts see it when run from there ('.' from the root itself)
+
+    Stored paths such as a document's relative_path stay the same as with
+    the subprocesses, without changing the working directory of the process.
+    """
+    try:
+        return Path(os.path.relpath(get_project_root()))
+    except ValueError:
+        # Another drive (Windows): no relative path
+        return get_project_root().resolve()
+
 def check_dependencies() -> bool:
-    """Check if required dependencies are installed"""
-    required = ['neo4j', 'python-dotenv']
+    """Check if required dependencies are installed (neo4j only for the Neo4j backend)"""
+    from graph_store import graph_backend
     try:
-        import neo4j
         from dotenv import load_dotenv
+        load_dotenv()
+        if graph_backend() == 'neo4j':
+            import neo4j
         return True
     except ImportError as e:
         print(f"{Colors.RED}Missing dependency: {e}{Colors.ENDC}")
         return False
+    except ValueError as e:
+        print(f"{Colors.RED}{e}{Colors.ENDC}")
+        return False
 
 def setup_sequential():
     """Run setup tasks sequentially (required for first-time setup)"""
@@ -171,7 +398,7 @@ def setup_sequential():
     
     return results
 
-def sync_parallel(include_leann: bool = True):
+def sync_parallel(include_leann: bool = True, isolated: bool = False, max_workers: int = 4):
     """Run all sync operations in parallel"""
     print_header("Brain Sync (Parallel)")
     
@@ -190,11 +417,15 @@ def sync_parallel(include_leann: bool = True):
             subprocess.run(["leann", "--version"], capture_output=True, check=True)
             parallel_tasks.insert(0, (["leann", "index", "--update"], "Update LEANN Vector Index"))
         except (subprocess.CalledProcessError, FileNotFoundError):
+            include_leann = False
             print(f"{Colors.YELLOW}  ℹ️  LEANN not available - skipping vector index update{Colors.ENDC}")
     
     # Run all tasks in parallel
     start_time = time.time()
-    results = run_parallel_tasks(parallel_tasks, max_workers=4)
+    if isolated:
+        results = run_parallel_tasks(parallel_tasks, max_workers=max_workers)
+    else:
+        results = sync_in_process(include_leann, max_workers=max_workers)
     total_time = time.time() - start_time
     
     # Summary
@@ -228,32 +459,51 @@ def view_stats_parallel():
     
     return results
 
-def full_sync():
+def full_sync(isolated: bool = False, max_workers: int = 4):
     """Run complete sync with all operations"""
     print_header("Full Brain Sync")
     
+    # Check LEANN availability
+    try:
+        subprocess.run(["leann", "--version"], capture_output=True, check=True)
+        include_leann = True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        include_leann = False
+    
+    start_time = time.time()
+    if isolated:
+        all_results = full_sync_isolated(include_leann, max_workers)
+    else:
+        # Each relationship task starts as soon as its own sync is done
+        print(f"\n{Colors.BOLD}Sync and Relationships (in-process task graph){Colors.ENDC}")
+        all_results = sync_in_process(include_leann, all_relationships=True, max_workers=max_workers)
+    
+    total_time = time.time() - start_time
+    success_count = sum(1 for r in all_results if r[1])
+    
+    print(f"\n{Colors.GREEN}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.GREEN}  ✨ Full sync completed: {success_count}/{len(all_results)} tasks in {total_time:.2f}s{Colors.ENDC}")
+    print(f"{Colors.GREEN}{'='*60}{Colors.ENDC}")
+    
+    return all_results
+
+def full_sync_isolated(include_leann: bool, max_workers: int = 4) -> List[Tuple[str, bool, str, float]]:
+    """Full sync with one subprocess per operation, in two phases"""
     tools_dir = get_tools_dir()
-    project_root = get_project_root()
     
     # Phase 1: Independent sync tasks (parallel)
     print(f"\n{Colors.BOLD}Phase 1: Parallel Sync Operations{Colors.ENDC}")
     
     parallel_tasks = []
-    
-    # Check LEANN availability
-    try:
-        subprocess.run(["leann", "--version"], capture_output=True, check=True)
+    if include_leann:
         parallel_tasks.append((["leann", "index", "--update"], "Update LEANN Index"))
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
     
     parallel_tasks.extend([
         ([sys.executable, str(tools_dir / "sync_skills_to_neo4j.py")], "Sync KB to Neo4j"),
         ([sys.executable, str(tools_dir / "document_sync.py"), "--all"], "Sync Documents to Neo4j"),
     ])
     
-    start_time = time.time()
-    phase1_results = run_parallel_tasks(parallel_tasks, max_workers=4)
+    phase1_results = run_parallel_tasks(parallel_tasks, max_workers=max_workers)
     
     # Phase 2: Relationship creation (depends on Phase 1)
     print(f"\n{Colors.BOLD}Phase 2: Create Relationships{Colors.ENDC}")
@@ -271,40 +521,38 @@ def full_sync():
         status = "success" if result[1] else "error"
         print_task(f"{name} ({result[3]:.2f}s)", status)
     
-    total_time = time.time() - start_time
-    all_results = phase1_results + phase2_results
-    success_count = sum(1 for r in all_results if r[1])
-    
-    print(f"\n{Colors.GREEN}{'='*60}{Colors.ENDC}")
-    print(f"{Colors.GREEN}  ✨ Full sync completed: {success_count}/{len(all_results)} tasks in {total_time:.2f}s{Colors.ENDC}")
-    print(f"{Colors.GREEN}{'='*60}{Colors.ENDC}")
-    
-    return all_results
+    return phase1_results + phase2_results
 
 def record_learning(error_type: str = None, message: str = None, 
                    resolution: str = None, approach: str = None,
                    task_id: str = None, task_type: str = None,
                    success_approach: str = None):
-    """Record learning patterns (wrapper for learning_engine.py)"""
-    tools_dir = get_tools_dir()
+    """Record learning patterns through the learning queue
     
-    if error_type and message:
-        cmd = [sys.executable, str(tools_dir / "learning_engine.py"),
-               "--record-error", error_type, message]
-        if resolution:
-            cmd.extend(["--resolution", resolution])
-        if approach:
-            cmd.extend(["--approach", approach])
-        return run_command(cmd, "Record Error Pattern")
+    The record is queued locally (no database connection, so it is kept
+    while Neo4j is down) and a background `learning_engine.py --flush-queue`
+    writes it. Returns (name, success, output, duration) like run_command.
+    """
+    from learning_queue import queue_event, start_background_flush
     
+    if error_type and message:
+        name, kind = "Record Error Pattern", 'record_error'
+        kwargs = {'error_type': error_type, 'message': message,
+                  'resolution': resolution, 'resolution_approach': approach}
     elif task_id and task_type and success_approach:
-        cmd = [sys.executable, str(tools_dir / "learning_engine.py"),
-               "--record-success", task_id,
-               "--task-type", task_type,
-               "--success-approach", success_approach]
-        return run_command(cmd, "Record Success Pattern")
+        name, kind = "Record Success Pattern", 'record_success'
+        kwargs = {'task_id': task_id, 'task_type': task_type, 'approach': success_approach}
+    else:
+        return None
     
-    return None
+    start_time = time.time()
+    try:
+        event_id = queue_event(kind, kwargs)
+    except Exception as e:
+        return (name, False, str(e), time.time() - start_time)
+    flushing = start_background_flush()
+    output = f"Queued {kind} as {event_id}" + ("" if flushing else " (run learning_engine.py --flush-queue)")
+    return (name, True, output, time.time() - start_time)
 
 def get_recommendations(task_description: str):
     """Get recommendations for a task"""
@@ -322,6 +570,7 @@ Examples:
   python brain_parallel.py --setup       # First-time setup
   python brain_parallel.py --sync        # Quick parallel sync
   python brain_parallel.py --full        # Complete sync with relationships
+  python brain_parallel.py --full --isolated  # One subprocess per sync
   python brain_parallel.py --stats       # View all statistics
   python brain_parallel.py --recommend "implement auth"  # Get recommendations
         """
@@ -341,6 +590,8 @@ Examples:
                        help='Get recommendations for a task description')
     parser.add_argument('--workers', type=int, default=4,
                        help='Maximum parallel workers (default: 4)')
+    parser.add_argument('--isolated', action='store_true',
+                       help='Run each sync in its own Python subprocess instead of in-process')
     
     args = parser.parse_args()
     
@@ -356,9 +607,10 @@ Examples:
     if args.setup:
         setup_sequential()
     elif args.sync:
-        sync_parallel(include_leann=not args.no_leann)
+        sync_parallel(include_leann=not args.no_leann, isolated=args.isolated,
+                      max_workers=max(1, args.workers))
     elif args.full:
-        full_sync()
+        full_sync(isolated=args.isolated, max_workers=max(1, args.workers))
     elif args.stats:
         view_stats_parallel()
     elif args.recommend:
@@ -12,23 +12,36 @@ Features:
 - Creates versioning relationships (SUPERCEDES)
 - Links documents to sprints, tasks, and roles
 - Semantic content chunking for large documents
+- Change-only syncs: unchanged files are skipped, vanished files deleted
+- Pipeline mode: threads parse while async batch writes are in flight
 
 Usage:
     python tools/neo4j/document_sync.py --all
     python tools/neo4j/document_sync.py --type plans
     python tools/neo4j/document_sync.py --type reports
     python tools/neo4j/document_sync.py --dry-run
+    python tools/neo4j/document_sync.py --all --batch-size 1000
+    python tools/neo4j/document_sync.py --all --full
+    python tools/neo4j/document_sync.py --all --pipeline --workers 8 --concurrency 4
+    GRAPH_BACKEND=sqlite python tools/neo4j/document_sync.py --all
+
+Without Neo4j credentials (or with GRAPH_BACKEND=sqlite) documents are
+synced to a local SQLite graph instead (see graph_store.py).
 """
 
 import os
 import re
 import sys
+import time
+import asyncio
 import hashlib
+from itertools import chain
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 import argparse
 
 # Set UTF-8 encoding for Windows console
@@ -39,6 +52,16 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Shared corpus loader lives with the KB CLI
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+from kb_corpus import get_corpus
+from kb_sync_state import SyncState, content_hash
+
+# Pooled driver shared by every Neo4j tool in the process
+sys.path.insert(0, str(Path(__file__).parent))
+from neo4j_connection import create_async_driver, get_driver
+from graph_store import GraphStore, graph_backend, open_graph_store, timestamp
+
 # Load environment variables
 load_dotenv()
 
@@ -77,19 +100,44 @@ DOCUMENT_TYPES = {
     }
 }
 
+# Documents per UNWIND transaction
+DEFAULT_BATCH_SIZE = 500
+
+# Pipeline mode: parsing threads and batch writes in flight
+DEFAULT_WORKERS = 4
+DEFAULT_CONCURRENCY = 4
+
+# What was last synced, relative to --base-path
+SYNC_STATE_FILE = Path('.agent') / 'knowledge-base' / '.neo4j-sync-documents.json'
+
+# Document node properties written by sync
+DOCUMENT_FIELDS = (
+    'id', 'title', 'type', 'author', 'date', 'version', 'file_path', 'relative_path',
+    'word_count', 'line_count', 'content_length', 'content_preview', 'content_hash',
+    'reference_ids'
+)
+
+
+def title_key(title: str) -> str:
+    """Normalized title shared by all versions of a document ("Sprint Plan v2" -> "sprint plan")"""
+    title = re.sub(r'(?<![a-z0-9])v\d+(\.\d+)*(?![a-z0-9])', ' ', title.lower())
+    return ' '.join(re.findall(r'[a-z0-9]+', title))
+
 
 class DocumentSyncNeo4j:
     """Universal document sync to Neo4j Cloud"""
     
     def __init__(self, uri: str, user: str, password: str, database: str = "neo4j"):
         """Initialize Neo4j connection"""
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.driver = get_driver(uri, user, password)
+        self.auth = (uri, user, password)
         self.database = database
         print(f"✅ Connected to Neo4j Cloud: {uri}")
     
     def close(self):
-        """Close Neo4j connection"""
-        self.driver.close()
+        """Release Neo4j connection"""
+        # The pool is shared with other in-process callers and closed at exit
+        self.driver = None
         print("✅ Neo4j connection closed")
     
     def create_document_schema(self):
@@ -111,6 +159,7 @@ class DocumentSyncNeo4j:
             "CREATE INDEX document_type IF NOT EXISTS FOR (d:Document) ON (d.type)",
             "CREATE INDEX document_date IF NOT EXISTS FOR (d:Document) ON (d.created_date)",
             "CREATE FULLTEXT INDEX document_content IF NOT EXISTS FOR (d:Document) ON EACH [d.content_preview]",
+            "CREATE FULLTEXT INDEX document_search IF NOT EXISTS FOR (d:Document) ON EACH [d.title, d.content_preview]",
         ]
         
         with self.driver.session(database=self.database) as session:
@@ -315,7 +364,9 @@ class DocumentSyncNeo4j:
                 'line_count': line_count,
                 'content_length': len(content),
                 'content_preview': content_preview,
+                'content_hash': content_hash(content),
                 'references': references,
+                'reference_ids': [self.generate_document_id(Path(ref)) for ref in references],
                 'chunks': chunks,
                 'frontmatter': frontmatter
             }
@@ -330,110 +381,408 @@ class DocumentSyncNeo4j:
             print(f"      Version: v{doc['version']} | Sprint: {doc['sprint'] or 'N/A'}")
             return
         
-        with self.driver.session(database=self.database) as session:
-            # Create main Document node with type label
-            labels = f"Document:{doc['type']}"
-            session.run(f"""
-                MERGE (d:{labels} {{id: $id}})
-                SET d.title = $title,
-                    d.type = $type,
-                    d.author = $author,
-                    d.created_date = date($date),
-                    d.version = $version,
-                    d.file_path = $file_path,
-                    d.relative_path = $relative_path,
-                    d.word_count = $word_count,
-                    d.line_count = $line_count,
-                    d.content_length = $content_length,
-                    d.content_preview = $content_preview,
-                    d.synced_at = datetime()
-            """, 
-                id=doc['id'],
-                title=doc['title'],
-                type=doc['type'],
-                author=doc['author'],
-                date=doc['date'],
-                version=doc['version'],
-                file_path=doc['file_path'],
-                relative_path=doc['relative_path'],
-                word_count=doc['word_count'],
-                line_count=doc['line_count'],
-                content_length=doc['content_length'],
-                content_preview=doc['content_preview']
-            )
-            
-            # Create Role node and CREATED_BY relationship
-            if doc['author']:
-                session.run("""
-                    MATCH (d:Document {id: $doc_id})
-                    MERGE (r:Role {name: $author})
-                    MERGE (d)-[:CREATED_BY]->(r)
-                """, doc_id=doc['id'], author=doc['author'])
-            
-            # Create Sprint node and BELONGS_TO relationship
-            if doc['sprint']:
-                session.run("""
-                    MATCH (d:Document {id: $doc_id})
-                    MERGE (s:Sprint {id: $sprint})
-                    MERGE (d)-[:BELONGS_TO]->(s)
-                """, doc_id=doc['id'], sprint=doc['sprint'])
+        self.write_batch([doc])
+        print(f"  ✅ {doc['type']}: {doc['title']}")
+    
+    def sync_documents(self, docs: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE,
+                       dry_run: bool = False, state: Optional[SyncState] = None) -> int:
+        """Sync documents in batches of batch_size (one session and transaction each)
+
+        Written documents are recorded in state, batch by batch.
+        """
+        synced_count = 0
+        batch = []
+        
+        for doc in docs:
+            if dry_run:
+                self.sync_document(doc, dry_run=True)
+                synced_count += 1
+                continue
             
-            # Create content chunks for large documents
-            for chunk in doc['chunks']:
-                chunk_id = f"{doc['id']}_chunk_{chunk['index']}"
-                session.run("""
-                    MATCH (d:Document {id: $doc_id})
-                    MERGE (c:ContentChunk {id: $chunk_id})
-                    SET c.index = $index,
-                        c.header = $header,
-                        c.content = $content,
-                        c.length = $length
-                    MERGE (d)-[:HAS_CHUNK]->(c)
-                """,
-                    doc_id=doc['id'],
-                    chunk_id=chunk_id,
-                    index=chunk['index'],
-                    header=chunk['header'],
-                    content=chunk['content'],
-                    length=chunk['length']
-                )
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                self._flush(batch, state)
+                synced_count += len(batch)
+                print(f"  ✅ Synced {synced_count} documents")
+                batch = []
+        
+        if batch:
+            self._flush(batch, state)
+            synced_count += len(batch)
+            print(f"  ✅ Synced {synced_count} documents")
+        
+        return synced_count
+    
+    def _flush(self, batch: List[Dict], state: Optional[SyncState]):
+        """Write a batch, then record it as synced"""
+        self.write_batch(batch)
+        if state is not None:
+            for doc in batch:
+                state.record(doc['file_path'], doc['id'], doc['content_hash'])
+    
+    async def sync_documents_async(self, paths: Iterable[Path], batch_size: int = DEFAULT_BATCH_SIZE,
+                                   workers: int = DEFAULT_WORKERS,
+                                   concurrency: int = DEFAULT_CONCURRENCY,
+                                   state: Optional[SyncState] = None, full: bool = False,
+                                   synced_ids: Optional[List[str]] = None, driver=None) -> int:
+        """Parse and write documents as a producer/consumer pipeline
+
+        `workers` threads parse files into a bounded queue while up to
+        `concurrency` batches are written at once through an async driver
+        (created from this sync's credentials unless given), so parsing
+        overlaps with network round trips. Documents whose content hash is
+        already in state are dropped unless full. Written documents are
+        recorded in state and their ids appended to synced_ids.
+        """
+        loop = asyncio.get_running_loop()
+        queue_bound = batch_size * (concurrency + 1)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_bound)
+        slots = asyncio.Semaphore(concurrency)
+        pending_paths = iter(paths)
+        depths = []
+        synced_count = 0
+        
+        async def parse_worker(executor):
+            for path in pending_paths:
+                doc = await loop.run_in_executor(executor, self.parse_document, path)
+                if doc and (full or state is None or not state.is_synced(doc['file_path'], doc['content_hash'])):
+                    await queue.put(doc)
+        
+        async def end_of_input(producers):
+            try:
+                await asyncio.gather(*producers)
+            finally:
+                await queue.put(None)
+        
+        async def write(batch):
+            nonlocal synced_count
+            try:
+                async with driver.session(database=self.database) as session:
+                    # execute_write retries the whole batch on transient errors
+                    await session.execute_write(self._write_batch_tx_async, batch)
+            finally:
+                slots.release()
+            for doc in batch:
+                if state is not None:
+                    state.record(doc['file_path'], doc['id'], doc['content_hash'])
+                if synced_ids is not None:
+                    synced_ids.append(doc['id'])
+            synced_count += len(batch)
+            print(f"  ✅ Synced {synced_count} documents (queue depth {queue.qsize()}/{queue_bound})")
+        
+        async def dispatch(batch, writes):
+            await slots.acquire()
+            for task in writes:
+                if task.done() and task.exception():
+                    slots.release()
+                    raise task.exception()
+            writes.append(asyncio.ensure_future(write(batch)))
+        
+        own_driver = driver is None
+        if own_driver:
+            driver = create_async_driver(*self.auth)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        producers = [asyncio.ensure_future(parse_worker(executor)) for _ in range(workers)]
+        closer = asyncio.ensure_future(end_of_input(producers))
+        writes = []
+        try:
+            batch = []
+            while True:
+                depths.append(queue.qsize())
+                doc = await queue.get()
+                if doc is None:
+                    break
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    await dispatch(batch, writes)
+                    batch = []
+            if batch:
+                await dispatch(batch, writes)
             
-            print(f"  ✅ {doc['type']}: {doc['title']}")
+            await asyncio.gather(*writes)
+            await closer
+        except BaseException:
+            for task in producers + writes + [closer]:
+                task.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if own_driver:
+                await driver.close()
+        
+        print(f"  📊 Pipeline: {workers} parse workers, {concurrency} writes in flight, queue depth "
+              f"avg {sum(depths) / len(depths):.1f}, max {max(depths)} of {queue_bound}")
+        return synced_count
     
-    def create_reference_relationships(self):
-        """Create REFERENCES relationships between documents"""
+    def write_batch(self, docs: List[Dict]):
+        """Write parsed documents with UNWIND queries in a single transaction"""
+        with self.driver.session(database=self.database) as session:
+            # execute_write retries the whole batch on transient errors
+            session.execute_write(self._write_batch_tx, docs)
+    
+    @classmethod
+    def _write_batch_tx(cls, tx, docs: List[Dict]):
+        """Transaction function for write_batch (every statement is a MERGE, so retries are safe)"""
+        for query, params in cls._batch_statements(docs):
+            tx.run(query, **params)
+    
+    @classmethod
+    async def _write_batch_tx_async(cls, tx, docs: List[Dict]):
+        """Async transaction function for the pipeline's batch writes"""
+        for query, params in cls._batch_statements(docs):
+            result = await tx.run(query, **params)
+            await result.consume()
+    
+    @staticmethod
+    def _batch_statements(docs: List[Dict]) -> List[Tuple[str, Dict]]:
+        """(query, parameters) of the UNWIND statements that write a batch"""
+        statements = []
+        
+        # Labels cannot be parameters: one UNWIND per document type label
+        by_label = defaultdict(list)
+        for doc in docs:
+            by_label[doc['type']].append({field: doc[field] for field in DOCUMENT_FIELDS})
+        
+        for label, rows in by_label.items():
+            statements.append((f"""
+                UNWIND $rows AS row
+                MERGE (d:Document:{label} {{id: row.id}})
+                SET d.title = row.title,
+                    d.type = row.type,
+                    d.author = row.author,
+                    d.created_date = date(row.date),
+                    d.version = row.version,
+                    d.file_path = row.file_path,
+                    d.relative_path = row.relative_path,
+                    d.word_count = row.word_count,
+                    d.line_count = row.line_count,
+                    d.content_length = row.content_length,
+                    d.content_preview = row.content_preview,
+                    d.content_hash = row.content_hash,
+                    d.reference_ids = row.reference_ids,
+                    d.synced_at = datetime()
+            """, {'rows': rows}))
+        
+        # Create Role nodes and CREATED_BY relationships
+        authors = [{'doc_id': doc['id'], 'author': doc['author']} for doc in docs if doc['author']]
+        if authors:
+            statements.append(("""
+                UNWIND $rows AS row
+                MATCH (d:Document {id: row.doc_id})
+                MERGE (r:Role {name: row.author})
+                MERGE (d)-[:CREATED_BY]->(r)
+            """, {'rows': authors}))
+        
+        # Create Sprint nodes and BELONGS_TO relationships
+        sprints = [{'doc_id': doc['id'], 'sprint': doc['sprint']} for doc in docs if doc['sprint']]
+        if sprints:
+            statements.append(("""
+                UNWIND $rows AS row
+                MATCH (d:Document {id: row.doc_id})
+                MERGE (s:Sprint {id: row.sprint})
+                MERGE (d)-[:BELONGS_TO]->(s)
+            """, {'rows': sprints}))
+        
+        # Links and versions are recomputed after the sync
+        statements.append(("""
+            UNWIND $ids AS id
+            MATCH (:Document {id: id})-[r:REFERENCES|SUPERCEDES]-()
+            DELETE r
+        """, {'ids': [doc['id'] for doc in docs]}))
+        
+        # Replace content chunks (a changed document may have fewer)
+        statements.append(("""
+            UNWIND $ids AS id
+            MATCH (:Document {id: id})-[:HAS_CHUNK]->(c:ContentChunk)
+            DETACH DELETE c
+        """, {'ids': [doc['id'] for doc in docs]}))
+        
+        chunks = [
+            {
+                'doc_id': doc['id'],
+                'chunk_id': f"{doc['id']}_chunk_{chunk['index']}",
+                'index': chunk['index'],
+                'header': chunk['header'],
+                'content': chunk['content'],
+                'length': chunk['length']
+            }
+            for doc in docs for chunk in doc['chunks']
+        ]
+        if chunks:
+            statements.append(("""
+                UNWIND $rows AS row
+                MATCH (d:Document {id: row.doc_id})
+                MERGE (c:ContentChunk {id: row.chunk_id})
+                SET c.index = row.index,
+                    c.header = row.header,
+                    c.content = row.content,
+                    c.length = row.length
+                MERGE (d)-[:HAS_CHUNK]->(c)
+            """, {'rows': chunks}))
+        
+        return statements
+    
+    def delete_documents(self, doc_ids: List[str]):
+        """Delete documents (and their content chunks) in one transaction"""
+        with self.driver.session(database=self.database) as session:
+            session.execute_write(self._delete_documents_tx, doc_ids)
+    
+    @staticmethod
+    def _delete_documents_tx(tx, doc_ids: List[str]):
+        """Transaction function for delete_documents"""
+        tx.run("""
+            UNWIND $ids AS id
+            MATCH (d:Document {id: id})
+            OPTIONAL MATCH (d)-[:HAS_CHUNK]->(c:ContentChunk)
+            DETACH DELETE c, d
+        """, ids=doc_ids)
+    
+    def title_keys(self, doc_ids: Iterable[str]) -> Set[str]:
+        """Version groups (normalized titles) the documents are in now"""
+        doc_ids = list(doc_ids)
+        if not doc_ids:
+            return set()
+        with self.driver.session(database=self.database) as session:
+            rows = session.execute_read(self._fetch_tx, """
+                UNWIND $ids AS id
+                MATCH (d:Document {id: id})
+                RETURN d.title AS title
+            """, ids=doc_ids)
+        return {title_key(row['title'] or '') for row in rows}
+    
+    def create_reference_relationships(self, doc_ids: Optional[Iterable[str]] = None,
+                                       batch_size: int = DEFAULT_BATCH_SIZE):
+        """Create REFERENCES relationships from the markdown links of each document
+
+        Only links from or to doc_ids are written (all links when None).
+        """
         print("\n🔗 Creating document references...")
         
         with self.driver.session(database=self.database) as session:
-            # Connect documents that reference each other
-            result = session.run("""
-                MATCH (d1:Document)
-                WHERE d1.file_path IS NOT NULL
-                MATCH (d2:Document)
-                WHERE d2.file_path IS NOT NULL AND d1 <> d2
-                AND (d1.content_preview CONTAINS d2.title OR d1.relative_path CONTAINS d2.relative_path)
-                MERGE (d1)-[r:REFERENCES]->(d2)
-                RETURN count(r) as ref_count
+            rows = session.execute_read(self._fetch_tx, """
+                MATCH (d:Document)
+                RETURN d.id AS id, d.reference_ids AS reference_ids
             """)
-            record = result.single()
-            print(f"  ✅ Created {record['ref_count']} reference relationships")
+            links = self._reference_links(rows, doc_ids)
+            
+            ref_count = self._write_in_batches(session, """
+                UNWIND $rows AS row
+                MATCH (d1:Document {id: row.source})
+                MATCH (d2:Document {id: row.target})
+                MERGE (d1)-[r:REFERENCES]->(d2)
+                RETURN count(r) AS count
+            """, links, batch_size)
+            print(f"  ✅ Created {ref_count} reference relationships")
     
-    def create_version_chain(self):
-        """Create SUPERCEDES relationships for versioned documents"""
+    def create_version_chain(self, doc_ids: Optional[Iterable[str]] = None,
+                             batch_size: int = DEFAULT_BATCH_SIZE, title_keys: Iterable[str] = ()):
+        """Create SUPERCEDES relationships between consecutive versions of a document
+
+        Versions are grouped on a normalized title. Only groups containing
+        doc_ids, or named in title_keys, are rebuilt (all groups when
+        doc_ids is None).
+        """
         print("\n🔗 Creating version chains...")
         
         with self.driver.session(database=self.database) as session:
-            # Connect versions of same document
-            result = session.run("""
-                MATCH (d1:Document), (d2:Document)
-                WHERE d1 <> d2 
-                AND d1.title = d2.title 
-                AND d1.version > d2.version
-                MERGE (d1)-[r:SUPERCEDES]->(d2)
-                RETURN count(r) as chain_count
+            rows = session.execute_read(self._fetch_tx, """
+                MATCH (d:Document)
+                RETURN d.id AS id, d.title AS title, d.version AS version
             """)
-            record = result.single()
-            print(f"  ✅ Created {record['chain_count']} version chain relationships")
+            members, links = self._version_links(rows, doc_ids, title_keys)
+            
+            # Rebuilt groups drop their old chain first (a version may have been inserted)
+            self._write_in_batches(session, """
+                UNWIND $rows AS id
+                MATCH (:Document {id: id})-[r:SUPERCEDES]-()
+                DELETE r
+                RETURN count(r) AS count
+            """, members, batch_size)
+            chain_count = self._write_in_batches(session, """
+                UNWIND $rows AS row
+                MATCH (d1:Document {id: row.source})
+                MATCH (d2:Document {id: row.target})
+                MERGE (d1)-[r:SUPERCEDES]->(d2)
+                RETURN count(r) AS count
+            """, links, batch_size)
+            print(f"  ✅ Created {chain_count} version chain relationships")
+    
+    @staticmethod
+    def _reference_links(rows: List[Dict], doc_ids: Optional[Iterable[str]]) -> List[Dict]:
+        """{'source', 'target'} links between known documents, from or to doc_ids (all when None)"""
+        affected = None if doc_ids is None else set(doc_ids)
+        known = {row['id'] for row in rows}
+        return [
+            {'source': row['id'], 'target': target}
+            for row in rows for target in dict.fromkeys(row.get('reference_ids') or [])
+            if target in known and target != row['id']
+            and (affected is None or row['id'] in affected or target in affected)
+        ]
+    
+    @staticmethod
+    def _version_links(rows: List[Dict], doc_ids: Optional[Iterable[str]],
+                       title_keys: Iterable[str] = ()) -> Tuple[List[str], List[Dict]]:
+        """(members, newer -> older links) of the version groups containing doc_ids (all when None)
+
+        Groups named in title_keys are rebuilt too: a document whose title
+        changed left a gap in the chain of its old title.
+        """
+        affected = None if doc_ids is None else set(doc_ids)
+        affected_keys = set(title_keys)
+        groups = defaultdict(list)
+        for row in rows:
+            key = title_key(row.get('title') or '')
+            if key:
+                groups[key].append(row)
+        
+        members = []
+        links = []
+        for key, group in groups.items():
+            if len(group) < 2:
+                continue
+            if affected is not None and key not in affected_keys and not any(
+                    row['id'] in affected for row in group):
+                continue
+            
+            members.extend(row['id'] for row in group)
+            by_version = defaultdict(list)
+            for row in group:
+                by_version[row.get('version') or 1].append(row['id'])
+            versions = sorted(by_version)
+            for older, newer in zip(versions, versions[1:]):
+                links.extend(
+                    {'source': new_id, 'target': old_id}
+                    for new_id in by_version[newer] for old_id in by_version[older]
+                )
+        return members, links
+    
+    def link_documents(self, doc_ids: Optional[List[str]], removed: bool = False,
+                       batch_size: int = DEFAULT_BATCH_SIZE, title_keys: Iterable[str] = ()):
+        """Create relationships touching the synced documents (all if doc_ids is None)
+
+        Deletions can break any version chain, so removed relinks all chains.
+        title_keys are the version groups the synced documents were in
+        before the sync (see sync_document_tree).
+        """
+        self.create_reference_relationships(doc_ids, batch_size)
+        self.create_version_chain(None if removed else doc_ids, batch_size, title_keys)
+    
+    def _write_in_batches(self, session, query: str, rows: List, batch_size: int) -> int:
+        """Run an UNWIND $rows query in batches; returns the summed count column"""
+        total = 0
+        for start in range(0, len(rows), batch_size):
+            total += session.execute_write(self._count_tx, query, rows[start:start + batch_size])
+        return total
+    
+    @staticmethod
+    def _fetch_tx(tx, query: str, **params) -> List[Dict]:
+        """Transaction function returning all records as dicts"""
+        return [record.data() for record in tx.run(query, **params)]
+    
+    @staticmethod
+    def _count_tx(tx, query: str, rows: List) -> int:
+        """Transaction function returning the count column of a write"""
+        return tx.run(query, rows=rows).single()['count']
     
     def get_document_stats(self) -> Dict:
         """Get document graph statistics"""
@@ -460,8 +809,111 @@ class DocumentSyncNeo4j:
             }
 
 
+class LocalDocumentSync(DocumentSyncNeo4j):
+    """Document sync to a local graph store (GRAPH_BACKEND=sqlite)
+
+    Writes the same nodes and relationships as DocumentSyncNeo4j. Batches
+    are written synchronously (there is no pipeline mode).
+    """
+    
+    def __init__(self, store: GraphStore):
+        """Use a local graph store (closed with the sync)"""
+        self.store = store
+        self.driver = None
+        self.database = None
+        print(f"✅ Using local graph store: {store.target}")
+    
+    def close(self):
+        """Close the local store"""
+        self.store.close()
+        print("✅ Local graph store closed")
+    
+    def create_document_schema(self):
+        """Nothing to set up: the local store keeps its own indexes"""
+        print("\n🔧 Document schema ready (local graph store)")
+    
+    def write_batch(self, docs: List[Dict]):
+        """Write parsed documents in a single transaction"""
+        now = timestamp()
+        with self.store.transaction():
+            for doc in docs:
+                ref = ('Document', doc['id'])
+                props = {field: doc[field] for field in DOCUMENT_FIELDS if field != 'date'}
+                self.store.merge_node('Document', doc['id'], dict(props, created_date=doc['date'], synced_at=now),
+                                      labels=[doc['type']])
+                
+                if doc['author']:
+                    self.store.merge_node('Role', doc['author'], {'name': doc['author']})
+                    self.store.merge_edge(ref, 'CREATED_BY', ('Role', doc['author']))
+                if doc['sprint']:
+                    self.store.merge_node('Sprint', doc['sprint'], {'id': doc['sprint']})
+                    self.store.merge_edge(ref, 'BELONGS_TO', ('Sprint', doc['sprint']))
+                
+                # Links and versions are recomputed after the sync, chunks replaced
+                self.store.delete_edges(ref, ['REFERENCES', 'SUPERCEDES'], direction='both')
+                self.store.delete_nodes('ContentChunk', [chunk['id'] for _, chunk in
+                                                         self.store.neighbors(ref, 'HAS_CHUNK')])
+                for chunk in doc['chunks']:
+                    chunk_id = f"{doc['id']}_chunk_{chunk['index']}"
+                    self.store.merge_node('ContentChunk', chunk_id, {
+                        'id': chunk_id, 'index': chunk['index'], 'header': chunk['header'],
+                        'content': chunk['content'], 'length': chunk['length']
+                    })
+                    self.store.merge_edge(ref, 'HAS_CHUNK', ('ContentChunk', chunk_id))
+    
+    def delete_documents(self, doc_ids: List[str]):
+        """Delete documents (and their content chunks) in one transaction"""
+        with self.store.transaction():
+            for doc_id in doc_ids:
+                self.store.delete_nodes('ContentChunk', [chunk['id'] for _, chunk in
+                                                         self.store.neighbors(('Document', doc_id), 'HAS_CHUNK')])
+            self.store.delete_nodes('Document', doc_ids)
+    
+    def _merge_links(self, rel_type: str, links: List[Dict]) -> int:
+        return sum(self.store.merge_edge(('Document', link['source']), rel_type, ('Document', link['target']))
+                   for link in links)
+    
+    def create_reference_relationships(self, doc_ids: Optional[Iterable[str]] = None,
+                                       batch_size: int = DEFAULT_BATCH_SIZE):
+        """Create REFERENCES relationships from the markdown links of each document"""
+        print("\n🔗 Creating document references...")
+        links = self._reference_links(self.store.nodes('Document'), doc_ids)
+        with self.store.transaction():
+            ref_count = self._merge_links('REFERENCES', links)
+        print(f"  ✅ Created {ref_count} reference relationships")
+    
+    def title_keys(self, doc_ids: Iterable[str]) -> Set[str]:
+        """Version groups (normalized titles) the documents are in now"""
+        nodes = (self.store.node(('Document', doc_id)) for doc_id in doc_ids)
+        return {title_key(node.get('title') or '') for node in nodes if node is not None}
+    
+    def create_version_chain(self, doc_ids: Optional[Iterable[str]] = None,
+                             batch_size: int = DEFAULT_BATCH_SIZE, title_keys: Iterable[str] = ()):
+        """Create SUPERCEDES relationships between consecutive versions of a document"""
+        print("\n🔗 Creating version chains...")
+        members, links = self._version_links(self.store.nodes('Document'), doc_ids, title_keys)
+        with self.store.transaction():
+            for doc_id in members:
+                self.store.delete_edges(('Document', doc_id), ['SUPERCEDES'], direction='both')
+            chain_count = self._merge_links('SUPERCEDES', links)
+        print(f"  ✅ Created {chain_count} version chain relationships")
+    
+    def get_document_stats(self) -> Dict:
+        """Get document graph statistics"""
+        return {
+            'documents': self.store.count('Document'),
+            'plans': self.store.count('Plan'),
+            'reports': self.store.count('Report'),
+            'artifacts': self.store.count('Artifact'),
+            'workflows': self.store.count('Workflow'),
+            'sprints': self.store.count('Sprint'),
+            'chunks': self.store.count('ContentChunk')
+        }
+
+
 def find_documents(base_path: Path, doc_types: List[str] = None) -> List[Path]:
     """Find all document files based on type filters"""
+    corpus = get_corpus()
     documents = []
     
     if doc_types is None or 'all' in doc_types:
@@ -474,23 +926,111 @@ def find_documents(base_path: Path, doc_types: List[str] = None) -> List[Path]:
         config = DOCUMENT_TYPES[doc_type]
         for directory in config['directories']:
             dir_path = base_path / directory
-            if dir_path.exists():
-                for pattern in config['patterns']:
-                    # Use rglob for recursive search
-                    pattern_base = pattern.replace('**/', '')
-                    documents.extend(dir_path.rglob(pattern_base))
+            for pattern in config['patterns']:
+                # Recursive match against the shared corpus walk
+                pattern_base = pattern.replace('**/', '')
+                documents.extend(entry.path for entry in corpus.files(dir_path, pattern_base))
     
     # Also add any markdown files in docs/sprints
     sprints_dir = base_path / 'docs' / 'sprints'
-    if sprints_dir.exists():
-        for md_file in sprints_dir.rglob('*.md'):
-            if md_file not in documents:
-                documents.append(md_file)
+    documents.extend(entry.path for entry in corpus.files(sprints_dir))
     
     # Remove duplicates
     return list(set(documents))
 
 
+def sync_document_tree(sync: DocumentSyncNeo4j, target: str, base_path: Path,
+                       doc_types: Optional[List[str]] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                       full: bool = False, dry_run: bool = False, pipeline: bool = False,
+                       workers: int = DEFAULT_WORKERS,
+                       concurrency: int = DEFAULT_CONCURRENCY) -> Optional[Dict]:
+    """Send new and changed documents and delete those whose file is gone
+
+    Returns {'synced': count, 'synced_ids': [...], 'removed': [(path, id)],
+    'title_keys': {...}} (the version groups of the changed documents before
+    the sync), or None if the graph was already up to date. target (URI/database)
+    scopes the sync state. pipeline writes through sync_documents_async()
+    (ignored for dry runs).
+    """
+    # Find documents
+    documents = find_documents(base_path, doc_types)
+    
+    print(f"\n📚 Found {len(documents)} documents")
+    
+    # Only new or changed files are parsed and sent (--full resends all)
+    state = SyncState.load(base_path / SYNC_STATE_FILE, target)
+    changed_paths = [path for path in documents if full or not state.is_current(path)]
+    synced_ids = []
+    
+    def changed_docs():
+        for doc in map(sync.parse_document, changed_paths):
+            if doc and (full or not state.is_synced(doc['file_path'], doc['content_hash'])):
+                synced_ids.append(doc['id'])
+                yield doc
+    
+    pipeline = pipeline and not dry_run
+    if pipeline:
+        # The pipeline parses (and drops touched but unedited files) itself
+        docs = first_doc = None
+        nothing_changed = not changed_paths
+    else:
+        docs = changed_docs()
+        first_doc = next(docs, None)
+        nothing_changed = first_doc is None
+    removed = state.missing()
+    
+    if nothing_changed and not removed:
+        if state.dirty and not dry_run:
+            state.save()
+        print("\n✅ Already up to date, nothing to sync")
+        return None
+    
+    print(f"   {len(documents) - len(changed_paths)} unchanged since the last sync")
+    
+    # Create schema
+    title_keys = set()
+    if not dry_run:
+        sync.create_document_schema()
+        # A changed title moves a document out of its version group, whose chain must be relinked
+        keys = (state.key(path) for path in changed_paths)
+        title_keys = sync.title_keys(state.files[key]['id'] for key in keys if key in state.files)
+    
+    # Parse and sync in batches (parsing streams into the writer)
+    start = time.perf_counter()
+    try:
+        if pipeline:
+            synced_count = asyncio.run(sync.sync_documents_async(
+                changed_paths, batch_size, workers, concurrency,
+                state=state, full=full, synced_ids=synced_ids
+            ))
+        else:
+            synced_count = sync.sync_documents(
+                chain([first_doc], docs) if first_doc else [],
+                batch_size=batch_size,
+                dry_run=dry_run,
+                state=None if dry_run else state
+            )
+        
+        # Delete documents whose file is gone
+        if removed and dry_run:
+            print(f"  🗑️  [DRY RUN] Would delete {len(removed)} documents whose files are gone")
+        elif removed:
+            sync.delete_documents([doc_id for _, doc_id in removed])
+            state.forget(key for key, _ in removed)
+            print(f"  🗑️  Deleted {len(removed)} documents whose files are gone")
+    finally:
+        if state.dirty and not dry_run:
+            state.save()
+    
+    elapsed = time.perf_counter() - start
+    if not dry_run and synced_count:
+        print(f"  ⏱️  {synced_count} documents in {elapsed:.1f}s "
+              f"({synced_count / max(elapsed, 1e-6):.0f} docs/s)")
+    
+    return {'synced': synced_count, 'synced_ids': synced_ids, 'removed': removed,
+            'title_keys': title_keys}
+
+
 def main():
     """Main execution function"""
     parser = argparse.ArgumentParser(description='Sync all documents to Neo4j')
@@ -500,21 +1040,44 @@ def main():
     parser.add_argument('--base-path', default='.', help='Base project path')
     parser.add_argument('--dry-run', action='store_true', help='Preview without syncing')
     parser.add_argument('--stats-only', action='store_true', help='Show stats only')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Documents per write transaction (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--full', action='store_true', help='Resync unchanged documents too')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Parse on worker threads while batches are written asynchronously')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Pipeline parsing threads (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Pipeline batch writes in flight (default: {DEFAULT_CONCURRENCY})')
     args = parser.parse_args()
     
-    # Get Neo4j credentials
-    uri = os.getenv('NEO4J_URI')
-    username = os.getenv('NEO4J_USERNAME')
-    password = os.getenv('NEO4J_PASSWORD')
-    database = os.getenv('NEO4J_DATABASE', 'neo4j')
-    
-    if not all([uri, username, password]):
-        print("❌ Error: Neo4j credentials not found in .env file")
-        print("   Required: NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD")
+    try:
+        backend = graph_backend()
+    except ValueError as e:
+        print(f"❌ Error: {e}")
         return
     
-    # Initialize sync
-    sync = DocumentSyncNeo4j(uri, username, password, database)
+    if backend == 'sqlite':
+        sync = LocalDocumentSync(open_graph_store())
+        target = sync.store.target
+        if args.pipeline:
+            print("⚠️  --pipeline needs Neo4j, writing batches one at a time")
+            args.pipeline = False
+    else:
+        # Get Neo4j credentials
+        uri = os.getenv('NEO4J_URI')
+        username = os.getenv('NEO4J_USERNAME')
+        password = os.getenv('NEO4J_PASSWORD')
+        database = os.getenv('NEO4J_DATABASE', 'neo4j')
+        
+        if not all([uri, username, password]):
+            print("❌ Error: Neo4j credentials not found in .env file")
+            print("   Required: NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD")
+            return
+        
+        # Initialize sync
+        sync = DocumentSyncNeo4j(uri, username, password, database)
+        target = f"{uri}/{database}"
     
     try:
         # Stats only mode
@@ -530,29 +1093,19 @@ def main():
             print(f"   Content Chunks: {stats['chunks']}")
             return
         
-        # Create schema
-        if not args.dry_run:
-            sync.create_document_schema()
-        
-        # Find documents
-        base_path = Path(args.base_path)
-        doc_types = ['all'] if args.all else args.type
-        documents = find_documents(base_path, doc_types)
-        
-        print(f"\n📚 Found {len(documents)} documents to sync")
-        
-        # Parse and sync each document
-        synced_count = 0
-        for doc_path in documents:
-            doc = sync.parse_document(doc_path)
-            if doc:
-                sync.sync_document(doc, dry_run=args.dry_run)
-                synced_count += 1
+        batch_size = max(1, args.batch_size)
+        result = sync_document_tree(
+            sync, target, Path(args.base_path), ['all'] if args.all else args.type,
+            batch_size=batch_size, full=args.full, dry_run=args.dry_run, pipeline=args.pipeline,
+            workers=max(1, args.workers), concurrency=max(1, args.concurrency)
+        )
+        if result is None:
+            return
+        synced_count, removed = result['synced'], result['removed']
         
         # Create relationships
-        if not args.dry_run and synced_count > 0:
-            sync.create_reference_relationships()
-            sync.create_version_chain()
+        if not args.dry_run and (synced_count > 0 or removed):
+            sync.link_documents(result['synced_ids'], bool(removed), batch_size, result['title_keys'])
         
         # Final stats
         if not args.dry_run:
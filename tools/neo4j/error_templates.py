@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Error Templates
+
+Groups error messages that differ only in volatile tokens (paths, line
+numbers, addresses, ids) into templates, the way the Drain log parser does:
+
+1. mask_message() replaces obviously variable tokens with placeholders
+   (<URL>, <PATH>, <UUID>, <IP>, <HEX>, <NUM>)
+2. a message is routed by its token count and first tokens to a leaf of
+   a few clusters, and joins the most similar one (the same token at
+   enough positions); positions where they differ become <*>
+
+Routing is a dict lookup, so matching a message costs O(tokens + clusters
+in its leaf), however many errors were recorded.
+
+A cluster's id is fixed when the cluster is created, from the message that
+started it, so it depends on which message came first. Shared ids
+therefore come from one place: the learning engine loads the clusters from
+the graph's ErrorTemplate nodes (replace()). The small JSON index is only a
+local cache, used when the graph cannot be read.
+
+Usage:
+    miner = TemplateMiner.load(path)
+    cluster = miner.add("Timeout after 30s connecting to 10.0.0.1:5432")
+    cluster = miner.match(message)   # lookup only, learns nothing
+    miner.replace(graph_templates)   # (id, template, size) from the graph
+    miner.save()
+"""
+
+import os
+import re
+import json
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TEMPLATE_INDEX_VERSION = 1
+
+WILDCARD = '<*>'
+
+# Applied in order: earlier masks swallow what later ones would split
+MASKS = [
+    (re.compile(r'\b[a-z][a-z0-9+.-]*://\S+', re.IGNORECASE), '<URL>'),
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.IGNORECASE),
+     '<UUID>'),
+    (re.compile(r'(?:\b[A-Za-z]:|(?<![\w.]))(?:[\\/][\w.@-]+){2,}[\\/]?'), '<PATH>'),
+    (re.compile(r'\b[\w.-]+(?:[\\/][\w.-]+)+\.\w+\b'), '<PATH>'),
+    (re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b'), '<IP>'),
+    (re.compile(r'\b0x[0-9a-f]+\b', re.IGNORECASE), '<HEX>'),
+    (re.compile(r'\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{8,}\b', re.IGNORECASE), '<HEX>'),
+    (re.compile(r'(?<![\w<])[-+]?\d+(?:\.\d+)*'), '<NUM>'),
+]
+
+HAS_DIGIT = re.compile(r'\d')
+
+
+def mask_message(message: str) -> str:
+    """Message with its volatile tokens replaced by placeholders"""
+    message = ' '.join(str(message or '').split())
+    for pattern, placeholder in MASKS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+@dataclass
+class TemplateCluster:
+    """Messages sharing one template"""
+    __slots__ = ('id', 'tokens', 'size', 'route')
+    id: str
+    tokens: List[str]
+    size: int
+    route: Tuple[str, ...]
+
+    @property
+    def template(self) -> str:
+        return ' '.join(self.tokens)
+
+
+class TemplateMiner:
+    """Drain-style template miner over masked error messages
+
+    depth is the number of leading tokens used for routing; a message joins
+    a cluster when at least similarity of its tokens equal the template's
+    (wildcards never count as equal). An authoritative miner (see replace())
+    overwrites the cache on save() instead of merging into it.
+    """
+
+    def __init__(self, path: Optional[Path] = None, depth: int = 2, similarity: float = 0.5):
+        self.path = Path(path) if path else None
+        self.depth = depth
+        self.similarity = similarity
+        self.clusters: Dict[str, TemplateCluster] = {}
+        self.leaves: Dict[Tuple[str, ...], List[TemplateCluster]] = {}
+        self.dirty = False
+        self.authoritative = False
+
+    @classmethod
+    def load(cls, path: Path, **options) -> 'TemplateMiner':
+        """Load the cluster index from disk (empty if missing or outdated)"""
+        miner = cls(path, **options)
+        for cluster in miner._read():
+            miner._insert(cluster)
+        return miner
+
+    def _read(self) -> List[TemplateCluster]:
+        if self.path is None or not self.path.exists():
+            return []
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return []
+        if data.get('version') != TEMPLATE_INDEX_VERSION or data.get('depth') != self.depth:
+            return []
+        return [TemplateCluster(cluster_id, item['tokens'], item['size'], tuple(item['route']))
+                for cluster_id, item in data.get('clusters', {}).items()]
+
+    def replace(self, templates: Iterable[Tuple[str, str, int]]):
+        """Make the (id, template, size) clusters of the source of truth the only ones"""
+        self.clusters, self.leaves = {}, {}
+        for cluster_id, template, size in templates:
+            tokens = template.split()
+            self._insert(TemplateCluster(cluster_id, tokens, size, self._route(tokens)))
+        self.authoritative = True
+        self.dirty = True
+
+    def save(self):
+        """Write the cluster index atomically, keeping clusters other processes added meanwhile
+
+        Clusters only the cache knows are dropped once the miner is authoritative.
+        """
+        if self.path is None or not self.dirty:
+            return
+        if not self.authoritative:
+            for cluster in self._read():
+                if cluster.id not in self.clusters:
+                    self._insert(cluster)
+
+        data = {
+            'version': TEMPLATE_INDEX_VERSION,
+            'depth': self.depth,
+            'clusters': {cluster.id: {'tokens': cluster.tokens, 'size': cluster.size,
+                                      'route': list(cluster.route)}
+                         for cluster in self.clusters.values()}
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(data, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def copy(self) -> 'TemplateMiner':
+        """Independent copy, to add() to until the writes that go with it commit"""
+        miner = TemplateMiner(self.path, self.depth, self.similarity)
+        for cluster in self.clusters.values():
+            miner._insert(TemplateCluster(cluster.id, list(cluster.tokens), cluster.size, cluster.route))
+        miner.dirty, miner.authoritative = self.dirty, self.authoritative
+        return miner
+
+    def _insert(self, cluster: TemplateCluster):
+        self.clusters[cluster.id] = cluster
+        self.leaves.setdefault(cluster.route, []).append(cluster)
+
+    def _route(self, tokens: List[str]) -> Tuple[str, ...]:
+        """Leaf key: token count, then the first tokens (variable-looking ones as <*>)"""
+        prefix = [WILDCARD if HAS_DIGIT.search(token) or token.startswith('<') else token
+                  for token in tokens[:self.depth]]
+        return (str(len(tokens)), *prefix)
+
+    def _best(self, tokens: List[str]) -> Optional[TemplateCluster]:
+        best, best_score = None, -1.0
+        for cluster in self.leaves.get(self._route(tokens), []):
+            equal = sum(1 for mine, theirs in zip(cluster.tokens, tokens)
+                        if mine == theirs and mine != WILDCARD)
+            score = equal / len(tokens) if tokens else 1.0
+            if score >= self.similarity and score > best_score:
+                best, best_score = cluster, score
+        return best
+
+    def match(self, message: str) -> Optional[TemplateCluster]:
+        """Cluster add() would put a message in, without changing any template"""
+        return self._best(mask_message(message).split())
+
+    def add(self, message: str) -> TemplateCluster:
+        """Assign a message to its cluster, generalizing the template or starting a new one"""
+        tokens = mask_message(message).split()
+        cluster = self._best(tokens)
+        if cluster is None:
+            template = ' '.join(tokens)
+            cluster_id = 'TPL_' + hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+            cluster = self.clusters.get(cluster_id)
+            if cluster is None:
+                cluster = TemplateCluster(cluster_id, tokens, 0, self._route(tokens))
+                self._insert(cluster)
+        else:
+            cluster.tokens = [mine if mine == theirs else WILDCARD
+                              for mine, theirs in zip(cluster.tokens, tokens)]
+        cluster.size += 1
+        self.dirty = True
+        return cluster
@@ -1,8 +1,22 @@
 import os
+import re
+import sys
 import glob
-from neo4j import GraphDatabase
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
 from dotenv import load_dotenv
 
+# Shared sync state lives with the KB CLI
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+from kb_sync_state import SyncState
+
+# Pooled driver shared by every Neo4j tool in the process
+sys.path.insert(0, str(Path(__file__).parent))
+from neo4j_connection import get_driver
+
 # Load environment variables
 load_dotenv()
 
@@ -10,46 +24,282 @@ URI = os.getenv("NEO4J_URI")
 USERNAME = os.getenv("NEO4J_USERNAME")
 PASSWORD = os.getenv("NEO4J_PASSWORD")
 
+# File nodes per UNWIND transaction
+DEFAULT_BATCH_SIZE = 500
+
+# What was last ingested, inside the project
+SYNC_STATE_FILE = Path('.agent') / 'knowledge-base' / '.neo4j-sync-structure.json'
+
+# Never ingested, whatever .gitignore says
+IGNORE_DIRS = {'.git', 'node_modules', '.agent', '__pycache__'}
+
+
+class GitIgnore:
+    """.gitignore rules of a tree, for walks outside a git checkout
+
+    Supports comments, negation (!), directory-only (trailing /), anchored
+    (leading or inner /) and *, ?, [...] and ** globs. Rules of a nested
+    .gitignore only apply below its directory, and the last matching rule wins.
+    """
+
+    def __init__(self):
+        # (directory prefix, compiled pattern, negated, directory only)
+        self.rules: List[Tuple[str, re.Pattern, bool, bool]] = []
+
+    def load(self, directory: str, rel_dir: str):
+        """Add the rules of directory/.gitignore (rel_dir: its path in the tree, '' at the top)"""
+        try:
+            with open(os.path.join(directory, '.gitignore'), encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+
+        prefix = rel_dir + '/' if rel_dir else ''
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.strip('/') if dir_only else line
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if not line:
+                continue
+
+            pattern = self._translate(line)
+            if not anchored:
+                pattern = '(?:.*/)?' + pattern
+            self.rules.append((prefix, re.compile(pattern + '$'), negated, dir_only))
+
+    @staticmethod
+    def _translate(glob_pattern: str) -> str:
+        """Regex for a gitignore glob (* and ? never cross a /, ** does)"""
+        parts = []
+        i = 0
+        while i < len(glob_pattern):
+            char = glob_pattern[i]
+            if glob_pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+                continue
+            if glob_pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+                continue
+            if char == '*':
+                parts.append('[^/]*')
+            elif char == '?':
+                parts.append('[^/]')
+            elif char == '[':
+                end = glob_pattern.find(']', i + 1)
+                if end < 0:
+                    parts.append(re.escape(char))
+                else:
+                    body = glob_pattern[i + 1:end]
+                    if body.startswith('!'):
+                        body = '^' + body[1:]
+                    parts.append('[' + body.replace('\\', '\\\\') + ']')
+                    i = end
+            else:
+                parts.append(re.escape(char))
+            i += 1
+        return ''.join(parts)
+
+    def ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Check if a path (relative to the tree, / separated) is ignored"""
+        ignored = False
+        for prefix, pattern, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if prefix and not rel_path.startswith(prefix):
+                continue
+            if pattern.match(rel_path[len(prefix):]):
+                ignored = not negated
+        return ignored
+
+
+def walk_project_files(base_path: Path) -> List[str]:
+    """Files below base_path (relative, / separated) that .gitignore does not exclude"""
+    gitignore = GitIgnore()
+    files = []
+
+    def walk(directory: str, rel_dir: str):
+        gitignore.load(directory, rel_dir)
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            return
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORE_DIRS and not gitignore.ignored(rel_path, is_dir=True):
+                        walk(entry.path, rel_path)
+                elif entry.is_file() and not gitignore.ignored(rel_path):
+                    files.append(rel_path)
+            except OSError:
+                continue
+
+    walk(str(base_path), '')
+    return files
+
+
+def list_project_files(base_path: Path) -> List[str]:
+    """Files of the project (relative, / separated), with .gitignore rules applied
+
+    Inside a git checkout `git ls-files` lists tracked and untracked files
+    (exactly git's ignore rules, without walking ignored trees); elsewhere
+    the tree is walked and its .gitignore files are read.
+    """
+    try:
+        output = subprocess.run(
+            ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+            cwd=base_path, capture_output=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return walk_project_files(base_path)
+
+    files = []
+    for path in os.fsdecode(output).split('\0'):
+        if path and not IGNORE_DIRS.intersection(path.split('/')[:-1]):
+            files.append(path)
+    return sorted(set(files))
+
+
 class Neo4jBrain:
     def __init__(self, uri, user, password):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.driver = get_driver(uri, user, password)
+        self.target = uri
 
     def close(self):
-        self.driver.close()
+        # The pool is shared with other in-process callers and closed at exit
+        self.driver = None
 
     def initialize_schema(self):
         with self.driver.session() as session:
             # Create constraints
             session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (f:File) REQUIRE f.path IS UNIQUE")
+            session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (d:Directory) REQUIRE d.path IS UNIQUE")
             session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (r:Requirement) REQUIRE r.id IS UNIQUE")
             session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (i:Issue) REQUIRE i.number IS UNIQUE")
             session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (ro:Role) REQUIRE ro.name IS UNIQUE")
             print("[SUCCESS] Neo4j Schema Initialized")
 
-    def ingest_project_structure(self, base_path):
-        """Walks the directory and creates File nodes and directory HIERARCHY."""
-        with self.driver.session() as session:
-            # Ignore some directories
-            ignore_dirs = {'.git', 'node_modules', '.agent', '__pycache__'}
-            
-            for root, dirs, files in os.walk(base_path):
-                # Filter ignore dirs
-                dirs[:] = [d for d in dirs if d not in ignore_dirs]
-                
-                rel_root = os.path.relpath(root, base_path)
-                if rel_root == ".": rel_root = "root"
-                
-                for file in files:
-                    rel_path = os.path.relpath(os.path.join(root, file), base_path)
-                    ext = os.path.splitext(file)[1]
-                    
-                    session.run("""
-                        MERGE (f:File {path: $path})
-                        SET f.name = $name, f.extension = $ext, f.last_updated = timestamp()
-                        MERGE (d:Directory {path: $dir})
-                        MERGE (d)-[:CONTAINS]->(f)
-                    """, path=rel_path, name=file, ext=ext, dir=rel_root)
-        print(f"[SUCCESS] Ingested project structure from {base_path}")
+    def ingest_project_structure(self, base_path, batch_size: int = DEFAULT_BATCH_SIZE,
+                                 full: bool = False) -> Dict:
+        """Creates File nodes and directory HIERARCHY for the project's files.
+
+        Files ignored by .gitignore are skipped. Only files added or changed
+        since the last ingest (recorded in SYNC_STATE_FILE) are written, in
+        UNWIND batches of batch_size, and File nodes of deleted or newly
+        ignored files are removed. full rewrites every file.
+        Returns {'ingested', 'removed', 'unchanged'} counts.
+        """
+        base_path = Path(base_path)
+        state = SyncState.load(base_path / SYNC_STATE_FILE, self.target)
+        start = time.perf_counter()
+
+        changed = []
+        live = set()
+        live_paths = set()
+        for rel_path in list_project_files(base_path):
+            file_path = base_path / rel_path
+            if full or not state.is_current(file_path):
+                if not file_path.is_file():
+                    continue  # Tracked by git but deleted from the work tree
+                changed.append((rel_path, file_path))
+            live.add(state.key(file_path))
+            live_paths.add(os.path.normpath(rel_path))
+
+        # File node path -> state key (None: in the graph but never recorded)
+        stale = {synced['id']: key for key, synced in state.files.items() if key not in live}
+        if full or not state.files:
+            # Nothing recorded yet: also drop files ingested before ignore rules
+            # applied (build outputs, lockfiles)
+            with self.driver.session() as session:
+                for path in session.execute_read(self._ingested_paths_tx):
+                    if path not in live_paths:
+                        stale.setdefault(path, None)
+        removed = list(stale.items())
+
+        try:
+            for i in range(0, len(changed), batch_size):
+                batch = changed[i:i + batch_size]
+                rows = [self._file_row(rel_path) for rel_path, _ in batch]
+                with self.driver.session() as session:
+                    session.execute_write(self._ingest_batch_tx, rows)
+                for row, (_, file_path) in zip(rows, batch):
+                    # Structure only: files are never read, so there is no content hash
+                    state.record(file_path, row['path'], '')
+                print(f"  [INGEST] {min(i + batch_size, len(changed))}/{len(changed)} files")
+
+            for i in range(0, len(removed), batch_size):
+                batch = removed[i:i + batch_size]
+                with self.driver.session() as session:
+                    session.execute_write(self._remove_files_tx, [path for path, _ in batch])
+                state.forget(key for _, key in batch if key is not None)
+            if removed:
+                print(f"  [REMOVE] {len(removed)} files deleted or ignored since the last ingest")
+        finally:
+            if state.dirty:
+                state.save()
+
+        elapsed = time.perf_counter() - start
+        print(f"[SUCCESS] Ingested project structure from {base_path} "
+              f"({len(changed)} written, {len(live) - len(changed)} unchanged, {elapsed:.1f}s)")
+        return {'ingested': len(changed), 'removed': len(removed),
+                'unchanged': len(live) - len(changed)}
+
+    @staticmethod
+    def _file_row(rel_path: str) -> Dict:
+        """File node properties (paths use the platform separator, as before)"""
+        path = os.path.normpath(rel_path)
+        name = os.path.basename(path)
+        return {
+            'path': path,
+            'name': name,
+            'ext': os.path.splitext(name)[1],
+            'dir': os.path.dirname(path) or "root"
+        }
+
+    @staticmethod
+    def _ingest_batch_tx(tx, rows: List[Dict]):
+        """Transaction function for ingest_project_structure (MERGEs, so retries are safe)"""
+        tx.run("""
+            UNWIND $rows AS row
+            MERGE (f:File {path: row.path})
+            SET f.name = row.name, f.extension = row.ext, f.last_updated = timestamp()
+            MERGE (d:Directory {path: row.dir})
+            MERGE (d)-[:CONTAINS]->(f)
+        """, rows=rows)
+
+    @staticmethod
+    def _ingested_paths_tx(tx) -> List[str]:
+        """Paths of the File nodes placed in a Directory by an ingest"""
+        result = tx.run("MATCH (:Directory)-[:CONTAINS]->(f:File) RETURN DISTINCT f.path AS path")
+        return [record['path'] for record in result]
+
+    @staticmethod
+    def _remove_files_tx(tx, paths: List[str]):
+        """Delete File nodes, then the directories they leave empty"""
+        dirs = tx.run("""
+            UNWIND $paths AS path
+            MATCH (f:File {path: path})
+            OPTIONAL MATCH (d:Directory)-[:CONTAINS]->(f)
+            DETACH DELETE f
+            RETURN collect(DISTINCT d.path) AS dirs
+        """, paths=paths).single()['dirs']
+        tx.run("""
+            UNWIND $dirs AS dir
+            MATCH (d:Directory {path: dir})
+            WHERE NOT (d)--()
+            DELETE d
+        """, dirs=dirs)
 
     def link_issue_to_file(self, issue_number, file_path, rel_type="AFFECTS"):
         with self.driver.session() as session:
@@ -71,14 +321,22 @@ class Neo4jBrain:
             return result.single()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Ingest the project structure into Neo4j')
+    parser.add_argument('path', nargs='?', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Files per write transaction (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--full', action='store_true', help='Rewrite unchanged files too')
+    args = parser.parse_args()
+
     if not URI or not PASSWORD:
         print("[ERROR] NEO4J_URI or NEO4J_PASSWORD not found in .env")
     else:
         brain = Neo4jBrain(URI, USERNAME, PASSWORD)
         try:
             brain.initialize_schema()
-            # Ingest current directory
-            brain.ingest_project_structure(".")
+            # Ingest the project (only what changed since the last run)
+            brain.ingest_project_structure(args.path, batch_size=max(1, args.batch_size),
+                                           full=args.full)
             print("[SUCCESS] Project brain is now updated in the cloud.")
         except Exception as e:
             print(f"[ERROR] Operation failed: {e}")
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local Graph Store
+
+An embedded property graph in one SQLite file, so the learning engine,
+skill and document syncs and skill queries run without a Neo4j server
+(CI, laptops, small teams). It offers the operations those tools need
+rather than Cypher: MERGE-style node and relationship upserts, neighbour
+lookups, keyword search over node properties and bounded shortest paths.
+
+Nodes are identified by (label, key), the property their Neo4j constraint
+makes unique (id, or name for Skill, Technology, Category, Person, Role).
+Relationships are unique per (source, type, target) and deleting a node
+deletes its relationships.
+
+Backend selection (GRAPH_BACKEND, also read from .env):
+    neo4j   the Neo4j server in NEO4J_URI
+    sqlite  the local store in GRAPH_STORE_PATH
+            (default .agent/knowledge-base/.graph.db)
+    unset   neo4j when NEO4J_URI, NEO4J_USERNAME and NEO4J_PASSWORD are set,
+            sqlite otherwise
+
+Usage:
+    from graph_store import graph_backend, open_graph_store
+    if graph_backend() == 'sqlite':
+        store = open_graph_store()
+        store.merge_node('Error', 'ERR_1', {'type': 'TypeError'}, increment={'occurrence_count': 1})
+"""
+
+import os
+import re
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+GRAPH_BACKENDS = ('neo4j', 'sqlite')
+
+GRAPH_STORE_VERSION = 1
+
+# Local store (kept with the knowledge base it was synced from)
+GRAPH_STORE_FILE = Path(__file__).parent.parent.parent / '.agent' / 'knowledge-base' / '.graph.db'
+
+# Host parameters per IN (...) list (SQLite's default limit is 999)
+SQL_BATCH_SIZE = 500
+
+FIELD_NAME = re.compile(r'^\w+$')
+
+# (label, key) of a node
+NodeRef = Tuple[str, str]
+
+
+def graph_backend() -> str:
+    """Backend the tools should use: 'neo4j' or 'sqlite'"""
+    backend = os.getenv('GRAPH_BACKEND', '').strip().lower()
+    if backend in GRAPH_BACKENDS:
+        return backend
+    if backend:
+        raise ValueError(f"Unknown GRAPH_BACKEND {backend!r} (expected one of {', '.join(GRAPH_BACKENDS)})")
+    credentials = ('NEO4J_URI', 'NEO4J_USERNAME', 'NEO4J_PASSWORD')
+    return 'neo4j' if all(os.getenv(var) for var in credentials) else 'sqlite'
+
+
+def open_graph_store(path: Optional[Path] = None) -> 'SQLiteGraphStore':
+    """Local store at path (default GRAPH_STORE_PATH, else GRAPH_STORE_FILE)"""
+    return SQLiteGraphStore.open(path or os.getenv('GRAPH_STORE_PATH') or GRAPH_STORE_FILE)
+
+
+def timestamp() -> str:
+    """Current time as stored for datetime() properties (ISO 8601, UTC)"""
+    return datetime.now(timezone.utc).isoformat()
+
+
+class GraphStore(ABC):
+    """Property graph operations the Neo4j tools need, for local backends
+
+    Node and relationship properties are JSON-compatible dicts. Writes made
+    inside `with store.transaction():` are committed together. A backend
+    must implement every method to be instantiated.
+    """
+
+    target = ''
+
+    @abstractmethod
+    def close(self):
+        """Release the store"""
+
+    @abstractmethod
+    def transaction(self):
+        """Context manager committing the writes of its block together"""
+
+    @abstractmethod
+    def merge_node(self, label: str, key: str, props: Optional[Dict] = None,
+                   labels: Iterable[str] = (), on_create: Optional[Dict] = None,
+                   increment: Optional[Dict] = None) -> Dict:
+        """Create or update a node; returns its properties
+
+        props are set, on_create only set on a new node, and increment
+        added to the current (or zero) value. labels are extra labels.
+        """
+
+    @abstractmethod
+    def node(self, ref: NodeRef) -> Optional[Dict]:
+        """Properties of a node, None if it does not exist"""
+
+    @abstractmethod
+    def find(self, key: str) -> Optional[NodeRef]:
+        """(label, key) of a node with this key, whatever its label"""
+
+    @abstractmethod
+    def nodes(self, label: str, where: Optional[Dict] = None) -> List[Dict]:
+        """Properties of the nodes with a label whose properties equal where"""
+
+    @abstractmethod
+    def count(self, label: str) -> int:
+        """Number of nodes with a label"""
+
+    @abstractmethod
+    def delete_nodes(self, label: str, keys: Iterable[str]) -> int:
+        """Delete nodes and their relationships; returns the number deleted"""
+
+    @abstractmethod
+    def merge_edge(self, source: NodeRef, rel_type: str, target: NodeRef,
+                   props: Optional[Dict] = None, increment: Optional[Dict] = None) -> bool:
+        """Create or update a relationship (False if either node is missing)"""
+
+    @abstractmethod
+    def delete_edges(self, ref: NodeRef, rel_types: Optional[Sequence[str]] = None,
+                     direction: str = 'out') -> int:
+        """Delete the relationships of a node ('out', 'in' or 'both'); returns the number deleted"""
+
+    @abstractmethod
+    def neighbors(self, ref: NodeRef, rel_type: Optional[str] = None, direction: str = 'out',
+                  label: Optional[str] = None) -> List[Tuple[Dict, Dict]]:
+        """(relationship properties, node properties) of a node's neighbours"""
+
+    @abstractmethod
+    def count_edges(self, rel_type: str) -> int:
+        """Number of relationships of a type"""
+
+    @abstractmethod
+    def search(self, label: str, fields: Sequence[str], terms: Sequence[str]) -> List[Tuple[Dict, List[str]]]:
+        """(properties, terms matched) of nodes whose fields contain any of terms
+
+        Matching is case-insensitive substring matching; most terms matched first.
+        """
+
+    @abstractmethod
+    def shortest_paths(self, sources: Iterable[NodeRef], targets: Iterable[NodeRef],
+                       max_hops: int, limit: int) -> List[List[Tuple[List[str], Dict]]]:
+        """Shortest undirected path of at most max_hops from each source to each target
+
+        Paths are lists of (labels, properties) nodes, shortest first.
+        """
+
+
+class SQLiteGraphStore(GraphStore):
+    """GraphStore in a SQLite database (WAL mode, so readers do not block a writer)"""
+
+    def __init__(self, path: Path, conn: sqlite3.Connection):
+        self.path = Path(path)
+        self.conn = conn
+        self.target = f"sqlite:{self.path.resolve()}"
+        self._depth = 0
+
+    @classmethod
+    def open(cls, path: Path) -> 'SQLiteGraphStore':
+        """Open the store (created if missing, recreated if outdated)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: transaction() issues BEGIN and COMMIT itself. A store may
+        # be used from several threads in turn (brain_parallel hands a sync
+        # from one task to the next), never at the same time.
+        conn = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+        if conn.execute("PRAGMA user_version").fetchone()[0] != GRAPH_STORE_VERSION:
+            conn.executescript(f"""
+                BEGIN;
+                DROP TABLE IF EXISTS edges;
+                DROP TABLE IF EXISTS nodes;
+                CREATE TABLE nodes (
+                    nid INTEGER PRIMARY KEY,
+                    label TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    props TEXT NOT NULL,
+                    UNIQUE (label, key)
+                );
+                CREATE INDEX nodes_key ON nodes (key);
+                CREATE TABLE edges (
+                    source INTEGER NOT NULL REFERENCES nodes (nid) ON DELETE CASCADE,
+                    type TEXT NOT NULL,
+                    target INTEGER NOT NULL REFERENCES nodes (nid) ON DELETE CASCADE,
+                    props TEXT NOT NULL,
+                    PRIMARY KEY (source, type, target)
+                ) WITHOUT ROWID;
+                CREATE INDEX edges_target ON edges (target, type);
+                PRAGMA user_version = {GRAPH_STORE_VERSION};
+                COMMIT;
+            """)
+        return cls(path, conn)
+
+    def close(self):
+        """Close the store database"""
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Commit the writes of the block together (nested blocks join the outer one)"""
+        self._depth += 1
+        outer = self._depth == 1
+        try:
+            if outer:
+                self.conn.execute("BEGIN IMMEDIATE")
+            yield self
+            if outer:
+                self.conn.execute("COMMIT")
+        except BaseException:
+            if outer and self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._depth -= 1
+
+    # ==================== NODES ====================
+
+    @staticmethod
+    def _labels(text: str) -> List[str]:
+        return text.strip(':').split(':')
+
+    @staticmethod
+    def _label_match(label: str) -> str:
+        return f":{label}:"
+
+    def _nid(self, ref: NodeRef) -> Optional[int]:
+        row = self.conn.execute("SELECT nid FROM nodes WHERE label = ? AND key = ?", ref).fetchone()
+        return row[0] if row else None
+
+    def merge_node(self, label: str, key: str, props: Optional[Dict] = None,
+                   labels: Iterable[str] = (), on_create: Optional[Dict] = None,
+                   increment: Optional[Dict] = None) -> Dict:
+        with self.transaction():
+            row = self.conn.execute("SELECT nid, labels, props FROM nodes WHERE label = ? AND key = ?",
+                                    (label, key)).fetchone()
+            if row:
+                data = json.loads(row[2])
+                all_labels = [*self._labels(row[1]), *labels]
+            else:
+                data = dict(on_create or {})
+                all_labels = [label, *labels]
+            data.update(props or {})
+            for field, amount in (increment or {}).items():
+                data[field] = (data.get(field) or 0) + amount
+
+            label_text = ':' + ':'.join(dict.fromkeys(all_labels)) + ':'
+            if row:
+                self.conn.execute("UPDATE nodes SET labels = ?, props = ? WHERE nid = ?",
+                                  (label_text, json.dumps(data), row[0]))
+            else:
+                self.conn.execute("INSERT INTO nodes (label, key, labels, props) VALUES (?, ?, ?, ?)",
+                                  (label, key, label_text, json.dumps(data)))
+        return data
+
+    def node(self, ref: NodeRef) -> Optional[Dict]:
+        row = self.conn.execute("SELECT props FROM nodes WHERE label = ? AND key = ?", ref).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, key: str) -> Optional[NodeRef]:
+        row = self.conn.execute("SELECT label, key FROM nodes WHERE key = ? LIMIT 1", (key,)).fetchone()
+        return tuple(row) if row else None
+
+    def nodes(self, label: str, where: Optional[Dict] = None) -> List[Dict]:
+        conditions = ["instr(labels, ?) > 0"]
+        params = [self._label_match(label)]
+        for field, value in (where or {}).items():
+            conditions.append(f"json_extract(props, '$.{self._field(field)}') = ?")
+            params.append(value)
+        query = f"SELECT props FROM nodes WHERE {' AND '.join(conditions)} ORDER BY nid"
+        return [json.loads(props) for props, in self.conn.execute(query, params)]
+
+    def count(self, label: str) -> int:
+        return self.conn.execute("SELECT count(*) FROM nodes WHERE instr(labels, ?) > 0",
+                                 (self._label_match(label),)).fetchone()[0]
+
+    def delete_nodes(self, label: str, keys: Iterable[str]) -> int:
+        deleted = 0
+        keys = list(keys)
+        with self.transaction():
+            for start in range(0, len(keys), SQL_BATCH_SIZE):
+                chunk = keys[start:start + SQL_BATCH_SIZE]
+                deleted += self.conn.execute(
+                    f"DELETE FROM nodes WHERE label = ? AND key IN ({', '.join('?' * len(chunk))})",
+                    [label, *chunk]
+                ).rowcount
+        return deleted
+
+    # ==================== RELATIONSHIPS ====================
+
+    def merge_edge(self, source: NodeRef, rel_type: str, target: NodeRef,
+                   props: Optional[Dict] = None, increment: Optional[Dict] = None) -> bool:
+        with self.transaction():
+            source_id, target_id = self._nid(source), self._nid(target)
+            if source_id is None or target_id is None:
+                return False
+
+            row = self.conn.execute("SELECT props FROM edges WHERE source = ? AND type = ? AND target = ?",
+                                    (source_id, rel_type, target_id)).fetchone()
+            data = json.loads(row[0]) if row else {}
+            data.update(props or {})
+            for field, amount in (increment or {}).items():
+                data[field] = (data.get(field) or 0) + amount
+            self.conn.execute("INSERT OR REPLACE INTO edges (source, type, target, props) VALUES (?, ?, ?, ?)",
+                              (source_id, rel_type, target_id, json.dumps(data)))
+        return True
+
+    def delete_edges(self, ref: NodeRef, rel_types: Optional[Sequence[str]] = None,
+                     direction: str = 'out') -> int:
+        nid = self._nid(ref)
+        if nid is None:
+            return 0
+
+        ends = {'out': ['source'], 'in': ['target'], 'both': ['source', 'target']}[direction]
+        condition = ' OR '.join(f"{end} = ?" for end in ends)
+        params = [nid] * len(ends)
+        if rel_types:
+            condition = f"({condition}) AND type IN ({', '.join('?' * len(rel_types))})"
+            params.extend(rel_types)
+        with self.transaction():
+            return self.conn.execute(f"DELETE FROM edges WHERE {condition}", params).rowcount
+
+    def neighbors(self, ref: NodeRef, rel_type: Optional[str] = None, direction: str = 'out',
+                  label: Optional[str] = None) -> List[Tuple[Dict, Dict]]:
+        nid = self._nid(ref)
+        if nid is None:
+            return []
+
+        sides = {'out': [('source', 'target')], 'in': [('target', 'source')],
+                 'both': [('source', 'target'), ('target', 'source')]}[direction]
+        selects = []
+        params = []
+        for near, far in sides:
+            conditions = [f"e.{near} = ?"]
+            params.append(nid)
+            if rel_type:
+                conditions.append("e.type = ?")
+                params.append(rel_type)
+            if label:
+                conditions.append("instr(n.labels, ?) > 0")
+                params.append(self._label_match(label))
+            selects.append(f"SELECT e.props, n.props, n.nid FROM edges e JOIN nodes n ON n.nid = e.{far} "
+                           f"WHERE {' AND '.join(conditions)}")
+        query = ' UNION ALL '.join(selects) + " ORDER BY 3"
+        return [(json.loads(edge), json.loads(node)) for edge, node, _ in self.conn.execute(query, params)]
+
+    def count_edges(self, rel_type: str) -> int:
+        return self.conn.execute("SELECT count(*) FROM edges WHERE type = ?", (rel_type,)).fetchone()[0]
+
+    # ==================== QUERIES ====================
+
+    @staticmethod
+    def _field(field: str) -> str:
+        if not FIELD_NAME.match(field):
+            raise ValueError(f"Invalid property name: {field!r}")
+        return field
+
+    def search(self, label: str, fields: Sequence[str], terms: Sequence[str]) -> List[Tuple[Dict, List[str]]]:
+        terms = list(dict.fromkeys(term.lower() for term in terms if term))
+        if not terms:
+            return []
+
+        text = " || ' ' || ".join(f"coalesce(json_extract(props, '$.{self._field(field)}'), '')"
+                                  for field in fields)
+        matches = ' OR '.join(f"instr(lower({text}), ?) > 0" for _ in terms)
+        query = f"SELECT props FROM nodes WHERE instr(labels, ?) > 0 AND ({matches}) ORDER BY nid"
+
+        found = []
+        for props, in self.conn.execute(query, [self._label_match(label), *terms]):
+            node = json.loads(props)
+            node_text = ' '.join(str(node.get(field) or '') for field in fields).lower()
+            found.append((node, [term for term in terms if term in node_text]))
+        found.sort(key=lambda item: len(item[1]), reverse=True)
+        return found
+
+    def _adjacent(self, nids: List[int]) -> List[Tuple[int, int]]:
+        """(node, neighbour) pairs of nids, relationships followed both ways"""
+        pairs = []
+        for start in range(0, len(nids), SQL_BATCH_SIZE):
+            chunk = nids[start:start + SQL_BATCH_SIZE]
+            marks = ', '.join('?' * len(chunk))
+            pairs.extend(self.conn.execute(f"""
+                SELECT source, target FROM edges WHERE source IN ({marks})
+                UNION ALL
+                SELECT target, source FROM edges WHERE target IN ({marks})
+            """, chunk + chunk))
+        return pairs
+
+    def shortest_paths(self, sources: Iterable[NodeRef], targets: Iterable[NodeRef],
+                       max_hops: int, limit: int) -> List[List[Tuple[List[str], Dict]]]:
+        source_ids = [nid for nid in map(self._nid, sources) if nid is not None]
+        target_ids = {nid for nid in map(self._nid, targets) if nid is not None}
+
+        paths = []
+        for source in dict.fromkeys(source_ids):
+            # Breadth-first, one query per hop, until every target is reached
+            parents = {source: None}
+            frontier = [source]
+            for _ in range(max_hops):
+                if not frontier or target_ids <= parents.keys():
+                    break
+                reached = []
+                for node, neighbour in self._adjacent(frontier):
+                    if neighbour not in parents:
+                        parents[neighbour] = node
+                        reached.append(neighbour)
+                frontier = reached
+
+            for target in target_ids:
+                if target == source or target not in parents:
+                    continue
+                path = [target]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                paths.append(path[::-1])
+
+        paths.sort(key=len)
+        paths = paths[:limit]
+
+        nodes = {}
+        wanted = list({nid for path in paths for nid in path})
+        for start in range(0, len(wanted), SQL_BATCH_SIZE):
+            chunk = wanted[start:start + SQL_BATCH_SIZE]
+            for nid, labels, props in self.conn.execute(
+                    f"SELECT nid, labels, props FROM nodes WHERE nid IN ({', '.join('?' * len(chunk))})", chunk):
+                nodes[nid] = (self._labels(labels), json.loads(props))
+        return [[nodes[nid] for nid in path] for path in paths]
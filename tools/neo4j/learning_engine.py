@@ -19,17 +19,31 @@ Usage:
     python tools/neo4j/learning_engine.py --recommend "implement user authentication"
     python tools/neo4j/learning_engine.py --similar-errors "ConnectionError"
     python tools/neo4j/learning_engine.py --reasoning-path "TypeError" "null check"
+    python tools/neo4j/learning_engine.py --benchmark-reasoning 10000
+    python tools/neo4j/learning_engine.py --record-error "TypeError" "..." --queue
+    python tools/neo4j/learning_engine.py --flush-queue
+    GRAPH_BACKEND=sqlite python tools/neo4j/learning_engine.py --stats
+
+Without Neo4j credentials (or with GRAPH_BACKEND=sqlite) the engine keeps
+its graph in a local SQLite file instead (see graph_store.py).
+
+--record-error, --record-success and --create-learning append to a local
+queue (see learning_queue.py) and start --flush-queue in the background,
+so they never wait on the database; with --queue they only append.
 """
 
 import os
 import re
 import sys
 import json
+import time
+import hashlib
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 import argparse
 
 # Set UTF-8 encoding for Windows console
@@ -40,22 +54,94 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Pooled driver shared by every Neo4j tool in the process
+sys.path.insert(0, str(Path(__file__).parent))
+from neo4j_connection import fulltext_query, get_driver
+from error_templates import TemplateMiner, mask_message
+from graph_store import GraphStore, graph_backend, open_graph_store, timestamp
+from learning_queue import (DEFAULT_FLUSH_BATCH_SIZE, EVENT_KINDS, LearningQueue, new_event, queue_event,
+                            start_background_flush)
+
 # Load environment variables
 load_dotenv()
 
+# Keywords of a task description searched for recommendations
+MAX_RECOMMENDATION_KEYWORDS = 10
+
+# Fulltext hits scoring below this are too weak to report
+MIN_SEARCH_SCORE = 0.5
+
+# Local graph store: share of the searched words a node must contain
+MIN_LOCAL_MATCH = 0.5
+
+# Reasoning paths: longest path searched and paths returned by default, and
+# errors / resolutions taken as path ends (paths are searched between at
+# most MAX_REASONING_ANCHORS x MAX_REASONING_ANCHORS pairs)
+DEFAULT_REASONING_HOPS = 5
+DEFAULT_REASONING_PATHS = 3
+MAX_REASONING_ANCHORS = 10
+
+# Synthetic nodes written per transaction by --benchmark-reasoning
+BENCHMARK_BATCH_SIZE = 1000
+
+# Error template clusters (kept locally so template ids stay stable)
+TEMPLATE_INDEX_FILE = Path(__file__).parent.parent.parent / '.agent' / 'knowledge-base' / '.error-templates.json'
+
+# Errors re-linked per transaction by --rebuild-templates
+TEMPLATE_BATCH_SIZE = 1000
+
+# Hours a replayed event's LearningEvent node is kept, so a batch replayed
+# again meanwhile (an interrupted or concurrent flush) is skipped; older
+# ones are pruned by the next replay
+LEARNING_EVENT_TTL_HOURS = 24
+
+
+def normalize_signature(*parts: str) -> str:
+    """Case- and whitespace-insensitive key for the parts that identify a node"""
+    return '\x1f'.join(' '.join(str(part or '').split()).lower() for part in parts)
+
 
 class LearningEngine:
     """Self-learning engine using Neo4j knowledge graph"""
     
     def __init__(self, uri: str, user: str, password: str, database: str = "neo4j"):
         """Initialize Neo4j connection"""
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.driver = get_driver(uri, user, password)
         self.database = database
         print(f"✅ Learning engine connected to Neo4j: {uri}")
     
     def close(self):
-        """Close Neo4j connection"""
-        self.driver.close()
+        """Release Neo4j connection (and save the error templates learned)"""
+        # The pool is shared with other in-process callers and closed at exit
+        self.driver = None
+        if self.__dict__.get('_templates') is not None:
+            self._templates.save()
+    
+    @property
+    def templates(self) -> TemplateMiner:
+        """Error template clusters, loaded on first use
+        
+        The graph's ErrorTemplate nodes are the source of truth, so every
+        machine sharing the graph gives a message the same template id. The
+        local index only stands in when the graph cannot be read.
+        """
+        if self.__dict__.get('_templates') is None:
+            miner = TemplateMiner.load(TEMPLATE_INDEX_FILE)
+            try:
+                miner.replace(self._stored_templates())
+            except Exception as e:
+                print(f"⚠️  Using the local template cache, the graph could not be read ({e})")
+            self._templates = miner
+        return self._templates
+    
+    def _stored_templates(self) -> List[Tuple[str, str, int]]:
+        """(id, template, size) of the ErrorTemplate nodes"""
+        with self.driver.session(database=self.database) as session:
+            return [(record['id'], record['template'] or '', record['size'] or 0)
+                    for record in session.run("""
+                        MATCH (t:ErrorTemplate)
+                        RETURN t.id AS id, t.template AS template, t.size AS size
+                    """)]
     
     def create_learning_schema(self):
         """Create schema for learning nodes"""
@@ -64,6 +150,8 @@ class LearningEngine:
             "CREATE CONSTRAINT resolution_id IF NOT EXISTS FOR (r:Resolution) REQUIRE r.id IS UNIQUE",
             "CREATE CONSTRAINT pattern_id IF NOT EXISTS FOR (p:Pattern) REQUIRE p.id IS UNIQUE",
             "CREATE CONSTRAINT learning_id IF NOT EXISTS FOR (l:Learning) REQUIRE l.id IS UNIQUE",
+            "CREATE CONSTRAINT error_template_id IF NOT EXISTS FOR (t:ErrorTemplate) REQUIRE t.id IS UNIQUE",
+            "CREATE CONSTRAINT learning_event_id IF NOT EXISTS FOR (ev:LearningEvent) REQUIRE ev.id IS UNIQUE",
         ]
         
         indexes = [
@@ -71,7 +159,13 @@ class LearningEngine:
             "CREATE INDEX error_message IF NOT EXISTS FOR (e:Error) ON (e.message)",
             "CREATE INDEX pattern_type IF NOT EXISTS FOR (p:Pattern) ON (p.type)",
             "CREATE INDEX resolution_approach IF NOT EXISTS FOR (r:Resolution) ON (r.approach)",
+            "CREATE INDEX learning_event_applied IF NOT EXISTS FOR (ev:LearningEvent) ON (ev.applied_at)",
             "CREATE FULLTEXT INDEX error_search IF NOT EXISTS FOR (e:Error) ON EACH [e.message, e.context]",
+            "CREATE FULLTEXT INDEX resolution_search IF NOT EXISTS FOR (r:Resolution) ON EACH [r.description, r.approach]",
+            # Recommendations
+            "CREATE FULLTEXT INDEX pattern_search IF NOT EXISTS FOR (p:Pattern) ON EACH [p.approach, p.type]",
+            "CREATE FULLTEXT INDEX kb_entry_search IF NOT EXISTS FOR (k:KBEntry) ON EACH [k.title, k.content_preview]",
+            "CREATE FULLTEXT INDEX document_search IF NOT EXISTS FOR (d:Document) ON EACH [d.title, d.content_preview]",
         ]
         
         with self.driver.session(database=self.database) as session:
@@ -94,71 +188,82 @@ class LearningEngine:
             print("  ✅ Learning schema ready")
     
     def generate_id(self, prefix: str, content: str) -> str:
-        """Generate unique ID for learning nodes"""
-        import hashlib
-        hash_str = hashlib.sha256(f"{prefix}_{content}_{datetime.now().isoformat()}".encode()).hexdigest()[:12]
+        """Generate the ID of a learning node from what identifies it
+        
+        IDs are content-addressed: the same prefix and content always give
+        the same ID, so MERGE finds the existing node and repeats aggregate
+        onto it instead of creating a new one.
+        """
+        hash_str = hashlib.sha256(f"{prefix}_{content}".encode('utf-8')).hexdigest()[:12]
         return f"{prefix}_{hash_str}"
     
     # ==================== ERROR TRACKING ====================
     
     def record_error(self, error_type: str, message: str, context: Dict = None, 
                     resolution: str = None, resolution_approach: str = None) -> str:
-        """Record an error and optionally its resolution"""
-        error_id = self.generate_id("ERR", f"{error_type}_{message[:50]}")
-        context_str = json.dumps(context) if context else "{}"
+        """Record an error and optionally its resolution
         
-        with self.driver.session(database=self.database) as session:
-            # Create or update Error node
-            session.run("""
-                MERGE (e:Error {id: $error_id})
-                SET e.type = $error_type,
-                    e.message = $message,
-                    e.context = $context,
-                    e.first_seen = coalesce(e.first_seen, datetime()),
-                    e.last_seen = datetime(),
-                    e.occurrence_count = coalesce(e.occurrence_count, 0) + 1
-            """, 
-                error_id=error_id,
-                error_type=error_type,
-                message=message,
-                context=context_str
-            )
-            
-            # If resolution provided, create Resolution and link
-            if resolution:
-                resolution_id = self.generate_id("RES", resolution[:50])
-                session.run("""
-                    MATCH (e:Error {id: $error_id})
-                    MERGE (r:Resolution {id: $resolution_id})
-                    SET r.description = $resolution,
-                        r.approach = $approach,
-                        r.created_at = datetime(),
-                        r.success_count = coalesce(r.success_count, 0) + 1
-                    MERGE (e)-[rel:RESOLVED_BY]->(r)
-                    SET rel.last_used = datetime(),
-                        rel.use_count = coalesce(rel.use_count, 0) + 1
-                """,
-                    error_id=error_id,
-                    resolution_id=resolution_id,
-                    resolution=resolution,
-                    approach=resolution_approach or "manual fix"
-                )
-                
-                print(f"✅ Recorded error '{error_type}' with resolution")
-                return resolution_id
-            
-            print(f"✅ Recorded error '{error_type}'")
-            return error_id
+        Messages that differ only in volatile tokens (paths, line numbers,
+        addresses, ids) are the same Error, and every Error is an instance
+        of the ErrorTemplate its message clusters into. Written in one
+        transaction.
+        """
+        error_id = self.generate_id("ERR", normalize_signature(error_type, mask_message(message)))
+        self._write_events([new_event('record_error', {
+            'error_type': error_type, 'message': message, 'context': context,
+            'resolution': resolution, 'resolution_approach': resolution_approach
+        })])
+        
+        if resolution:
+            approach = resolution_approach or "manual fix"
+            print(f"✅ Recorded error '{error_type}' with resolution")
+            return self.generate_id("RES", normalize_signature(resolution, approach))
+        
+        print(f"✅ Recorded error '{error_type}'")
+        return error_id
     
     def find_similar_errors(self, error_message: str, limit: int = 5) -> List[Dict]:
-        """Find similar errors and their resolutions"""
+        """Find similar errors and their resolutions
+        
+        Errors of the message's template come first (a local template match,
+        then one indexed lookup); the fulltext index is searched when the
+        message fits no known template.
+        """
         with self.driver.session(database=self.database) as session:
-            # Try fulltext search first
+            template = self.templates.match(error_message)
+            if template is not None:
+                result = session.run("""
+                    MATCH (t:ErrorTemplate {id: $template_id})<-[:INSTANCE_OF]-(e:Error)
+                    OPTIONAL MATCH (e)-[rel:RESOLVED_BY]->(r:Resolution)
+                    WITH t, e, collect({
+                               resolution: r.description,
+                               approach: r.approach,
+                               success_count: r.success_count,
+                               use_count: rel.use_count
+                           }) as resolutions
+                    RETURN e.id as error_id,
+                           e.type as error_type,
+                           e.message as message,
+                           e.occurrence_count as occurrences,
+                           resolutions,
+                           t.template as template
+                    ORDER BY occurrences DESC
+                    LIMIT $limit
+                """, template_id=template.id, limit=limit)
+                
+                errors = [dict(record) for record in result]
+                if errors:
+                    return errors
+            
+            # Otherwise fulltext search
             try:
+                search = fulltext_query(error_message, prefix=False)
+                if not search:
+                    raise ValueError("no searchable words in error message")
                 result = session.run("""
-                    CALL db.index.fulltext.queryNodes("error_search", $search_query) 
+                    CALL db.index.fulltext.queryNodes("error_search", $search) 
                     YIELD node as e, score
-                    WHERE score > 0.5
+                    WHERE score > $min_score
                     OPTIONAL MATCH (e)-[rel:RESOLVED_BY]->(r:Resolution)
                     RETURN e.id as error_id, 
                            e.type as error_type,
@@ -173,11 +278,11 @@ class LearningEngine:
                            score
                     ORDER BY score DESC
                     LIMIT $limit
-                """, search_query=error_message, limit=limit)
+                """, search=search, min_score=MIN_SEARCH_SCORE, limit=limit)
                 
                 return [dict(record) for record in result]
             except Exception:
-                # Fallback to CONTAINS search
+                # Fallback to CONTAINS search (error_search index missing: run --setup)
                 result = session.run("""
                     MATCH (e:Error)
                     WHERE e.message CONTAINS $search_query OR e.type CONTAINS $search_query
@@ -196,45 +301,69 @@ class LearningEngine:
                 
                 return [dict(record) for record in result]
     
+    def rebuild_error_templates(self) -> int:
+        """Cluster every recorded error again, from scratch
+        
+        For graphs recorded before templates existed (a lost local index
+        is reloaded from the graph instead). Returns the number of templates.
+        """
+        self._templates = miner = TemplateMiner(TEMPLATE_INDEX_FILE)
+        miner.authoritative = True
+        with self.driver.session(database=self.database) as session:
+            errors = [(record['id'], miner.add(record['message'] or ''))
+                      for record in session.run("""
+                          MATCH (e:Error)
+                          RETURN e.id AS id, e.message AS message
+                          ORDER BY e.first_seen
+                      """)]
+            
+            # Final templates only, once every message generalized them
+            rows = [{'error_id': error_id, 'template_id': cluster.id,
+                     'template': cluster.template, 'size': cluster.size}
+                    for error_id, cluster in errors]
+            for start in range(0, len(rows), TEMPLATE_BATCH_SIZE):
+                session.execute_write(self._link_templates_tx, rows[start:start + TEMPLATE_BATCH_SIZE])
+            session.run("""
+                MATCH (t:ErrorTemplate)
+                WHERE NOT (t)<-[:INSTANCE_OF]-()
+                DELETE t
+            """)
+        
+        miner.dirty = True
+        miner.save()
+        return len(miner.clusters)
+    
+    @staticmethod
+    def _link_templates_tx(tx, rows: List[Dict]):
+        """Point errors at their (re-mined) templates"""
+        tx.run("""
+            UNWIND $rows AS row
+            MATCH (e:Error {id: row.error_id})
+            MERGE (t:ErrorTemplate {id: row.template_id})
+            SET t.template = row.template,
+                t.size = row.size,
+                t.updated_at = datetime(),
+                e.template_id = row.template_id
+            MERGE (e)-[:INSTANCE_OF]->(t)
+            WITH e, t
+            OPTIONAL MATCH (e)-[old:INSTANCE_OF]->(other:ErrorTemplate)
+            WHERE other <> t
+            DELETE old
+        """, rows=rows)
+    
     # ==================== SUCCESS PATTERN TRACKING ====================
     
     def record_success(self, task_id: str, task_type: str, approach: str, 
                       outcome: str = "completed", confidence: float = 1.0) -> str:
-        """Record a successful task completion pattern"""
-        pattern_id = self.generate_id("PAT", f"{task_type}_{approach[:30]}")
+        """Record a successful task completion pattern (in one transaction)"""
+        pattern_id = self.generate_id("PAT", normalize_signature(task_type, approach))
+        self._write_events([new_event('record_success', {
+            'task_id': task_id, 'task_type': task_type, 'approach': approach,
+            'outcome': outcome, 'confidence': confidence
+        })])
         
-        with self.driver.session(database=self.database) as session:
-            # Create Task node
-            session.run("""
-                MERGE (t:Task {id: $task_id})
-                SET t.type = $task_type,
-                    t.status = $outcome,
-                    t.completed_at = datetime()
-            """, task_id=task_id, task_type=task_type, outcome=outcome)
-            
-            # Create or update Pattern node
-            session.run("""
-                MERGE (p:Pattern {id: $pattern_id})
-                SET p.type = $task_type,
-                    p.approach = $approach,
-                    p.last_success = datetime(),
-                    p.success_count = coalesce(p.success_count, 0) + 1,
-                    p.total_confidence = coalesce(p.total_confidence, 0) + $confidence
-            """, 
-                pattern_id=pattern_id,
-                task_type=task_type,
-                approach=approach,
-                confidence=confidence
-            )
-            
-            # Link Task to Pattern
-            session.run("""
-                MATCH (t:Task {id: $task_id}), (p:Pattern {id: $pattern_id})
-                MERGE (t)-[:USED_PATTERN]->(p)
-            """, task_id=task_id, pattern_id=pattern_id)
-            
-            print(f"✅ Recorded success pattern: {approach} for {task_type}")
-            return pattern_id
+        print(f"✅ Recorded success pattern: {approach} for {task_type}")
+        return pattern_id
     
     def get_successful_patterns(self, task_type: str = None, limit: int = 10) -> List[Dict]:
         """Get most successful patterns for a task type"""
@@ -270,83 +399,99 @@ class LearningEngine:
     # ==================== RECOMMENDATION ENGINE ====================
     
     def get_recommendations(self, task_description: str, limit: int = 5) -> List[Dict]:
-        """Get recommendations based on task description"""
-        recommendations = []
+        """Get recommendations based on task description
+
+        Patterns, KB entries and documents are searched with all keywords in
+        one query (a single round trip) and ranked together: by the number of
+        keywords matched, then success weight (pattern confidence summed over
+        its successes), then fulltext score.
+        """
+        keywords = self._extract_keywords(task_description)[:MAX_RECOMMENDATION_KEYWORDS]
+        if not keywords:
+            return []
         
-        # Extract keywords from task description
-        keywords = self._extract_keywords(task_description)
+        recommendations = []
+        for record in self._recommendation_records(keywords, limit):
+            rec = dict(record['rec'])
+            rec['matched_keyword'] = record['matched'][0]
+            rec['matched_keywords'] = record['matched']
+            rec['source'] = record['source']
+            recommendations.append(rec)
+        return recommendations
+    
+    def _recommendation_records(self, keywords: List[str], limit: int) -> List[Dict]:
+        """Best {'source', 'rec', 'matched'} records for keywords, ranked"""
+        params = {
+            'keywords': keywords,
+            'search': fulltext_query(keywords),
+            'min_score': MIN_SEARCH_SCORE,
+            'candidates': max(limit, 3) * 2,
+            'limit': limit
+        }
         
         with self.driver.session(database=self.database) as session:
-            # Search for relevant patterns
-            for keyword in keywords[:5]:  # Limit keyword search
-                result = session.run("""
-                    MATCH (p:Pattern)
-                    WHERE toLower(p.approach) CONTAINS toLower($keyword)
-                       OR toLower(p.type) CONTAINS toLower($keyword)
-                    RETURN p.id as pattern_id,
-                           p.type as task_type,
-                           p.approach as approach,
-                           p.success_count as success_count,
-                           p.total_confidence / p.success_count as confidence
-                    ORDER BY p.success_count DESC
-                    LIMIT 3
-                """, keyword=keyword)
-                
-                for record in result:
-                    rec = dict(record)
-                    rec['matched_keyword'] = keyword
-                    rec['source'] = 'pattern'
-                    recommendations.append(rec)
-            
-            # Search for relevant KB entries
-            for keyword in keywords[:3]:
-                result = session.run("""
-                    MATCH (k:KBEntry)
-                    WHERE toLower(k.title) CONTAINS toLower($keyword)
-                       OR toLower(k.content_preview) CONTAINS toLower($keyword)
-                    OPTIONAL MATCH (k)-[:TEACHES]->(s:Skill)
-                    RETURN k.id as kb_id,
-                           k.title as title,
-                           k.category as category,
-                           collect(s.name)[..3] as skills
-                    LIMIT 3
-                """, keyword=keyword)
-                
-                for record in result:
-                    rec = dict(record)
-                    rec['matched_keyword'] = keyword
-                    rec['source'] = 'knowledge_base'
-                    recommendations.append(rec)
-            
-            # Search for relevant documents
-            for keyword in keywords[:3]:
-                result = session.run("""
-                    MATCH (d:Document)
-                    WHERE toLower(d.title) CONTAINS toLower($keyword)
-                       OR toLower(d.content_preview) CONTAINS toLower($keyword)
-                    RETURN d.id as doc_id,
-                           d.title as title,
-                           d.type as doc_type,
-                           d.author as author
-                    LIMIT 3
-                """, keyword=keyword)
-                
-                for record in result:
-                    rec = dict(record)
-                    rec['matched_keyword'] = keyword
-                    rec['source'] = 'document'
-                    recommendations.append(rec)
-        
-        # Deduplicate and rank
-        seen = set()
-        unique_recs = []
-        for rec in recommendations:
-            key = rec.get('pattern_id') or rec.get('kb_id') or rec.get('doc_id')
-            if key not in seen:
-                seen.add(key)
-                unique_recs.append(rec)
+            try:
+                return [dict(record) for record in
+                        session.run(self._recommendation_query(fulltext=True), **params)]
+            except Exception:
+                # Fulltext indexes missing (run --setup): same ranking over a keyword scan
+                return [dict(record) for record in
+                        session.run(self._recommendation_query(fulltext=False), **params)]
+    
+    @staticmethod
+    def _recommendation_candidates(index: str, label: str, var: str, fields: Tuple[str, ...],
+                                   fulltext: bool) -> str:
+        """Cypher yielding (var, score, matched) for nodes matching any of $keywords"""
+        text = " + ' ' + ".join(f"coalesce({var}.{field}, '')" for field in fields)
+        if fulltext:
+            lookup = (f"CALL db.index.fulltext.queryNodes('{index}', $search) YIELD node AS {var}, score "
+                      f"WHERE score >= $min_score")
+        else:
+            lookup = f"MATCH ({var}:{label}) WITH {var}, 0.0 AS score"
+        return f"""{lookup}
+                WITH {var}, score, [keyword IN $keywords WHERE toLower({text}) CONTAINS keyword] AS matched
+                WHERE size(matched) > 0
+                WITH {var}, score, matched
+                ORDER BY size(matched) DESC, score DESC
+                LIMIT $candidates"""
+    
+    def _recommendation_query(self, fulltext: bool = True) -> str:
+        """Single ranked query over patterns, KB entries and documents"""
+        patterns = self._recommendation_candidates(
+            'pattern_search', 'Pattern', 'p', ('approach', 'type'), fulltext)
+        entries = self._recommendation_candidates(
+            'kb_entry_search', 'KBEntry', 'k', ('title', 'content_preview'), fulltext)
+        documents = self._recommendation_candidates(
+            'document_search', 'Document', 'd', ('title', 'content_preview'), fulltext)
         
-        return unique_recs[:limit]
+        return f"""
+            CALL {{
+                {patterns}
+                RETURN 'pattern' AS source,
+                       {{pattern_id: p.id, task_type: p.type, approach: p.approach,
+                         success_count: p.success_count,
+                         confidence: p.total_confidence / p.success_count}} AS rec,
+                       matched,
+                       coalesce(p.total_confidence, toFloat(p.success_count), 0.0) AS weight,
+                       score
+              UNION ALL
+                {entries}
+                OPTIONAL MATCH (k)-[:TEACHES]->(s:Skill)
+                WITH k, score, matched, collect(s.name)[..3] AS skills
+                RETURN 'knowledge_base' AS source,
+                       {{kb_id: k.id, title: k.title, category: k.category, skills: skills}} AS rec,
+                       matched, 0.0 AS weight, score
+              UNION ALL
+                {documents}
+                RETURN 'document' AS source,
+                       {{doc_id: d.id, title: d.title, doc_type: d.type, author: d.author}} AS rec,
+                       matched, 0.0 AS weight, score
+            }}
+            WITH source, rec, matched, weight, score
+            ORDER BY size(matched) DESC, weight DESC, score DESC
+            LIMIT $limit
+            RETURN source, rec, matched
+        """
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract meaningful keywords from text"""
@@ -377,81 +522,369 @@ class LearningEngine:
     
     # ==================== REASONING PATH ====================
     
-    def find_reasoning_path(self, from_error: str, to_resolution: str) -> List[Dict]:
-        """Find the reasoning path from an error to a resolution"""
+    def find_reasoning_path(self, from_error: str, to_resolution: str,
+                            max_hops: int = DEFAULT_REASONING_HOPS,
+                            limit: int = DEFAULT_REASONING_PATHS) -> List[Dict]:
+        """Find the reasoning path from an error to a resolution
+        
+        Path ends are looked up first: errors of that type or whose message
+        matches from_error, and resolutions with that approach or whose
+        description matches to_resolution (best MAX_REASONING_ANCHORS of each,
+        through the fulltext indexes). Shortest paths of at most max_hops are
+        then searched between those pairs only, shortest first.
+        """
+        max_hops = int(max_hops)
+        if max_hops < 1:
+            raise ValueError("max_hops must be at least 1")
+        
+        paths = []
+        for length, nodes in self._reasoning_paths(from_error, to_resolution, max_hops, limit):
+            paths.append({
+                'length': length,
+                'steps': [{'index': i, 'labels': labels, 'properties': properties}
+                          for i, (labels, properties) in enumerate(nodes)]
+            })
+        return paths
+    
+    def _reasoning_paths(self, from_error: str, to_resolution: str, max_hops: int,
+                         limit: int) -> List[Tuple[int, List[Tuple[List[str], Dict]]]]:
+        """(length, [(labels, properties)]) of the paths find_reasoning_path reports"""
+        params = {
+            'from_text': from_error,
+            'from_search': fulltext_query(from_error),
+            'to_text': to_resolution,
+            'to_search': fulltext_query(to_resolution),
+            'min_score': MIN_SEARCH_SCORE,
+            'anchors': MAX_REASONING_ANCHORS,
+            'limit': limit
+        }
+        
         with self.driver.session(database=self.database) as session:
-            # Find shortest path between error and resolution
-            result = session.run("""
-                MATCH (e:Error), (r:Resolution)
-                WHERE e.message CONTAINS $from_error OR e.type CONTAINS $from_error
-                AND (r.description CONTAINS $to_resolution OR r.approach CONTAINS $to_resolution)
-                MATCH path = shortestPath((e)-[*..5]-(r))
+            records = None
+            if params['from_search'] and params['to_search']:
+                try:
+                    records = list(session.run(self._reasoning_path_query(max_hops, fulltext=True),
+                                               **params))
+                except Exception:
+                    pass  # Fulltext indexes missing (run --setup): scan below
+            if records is None:
+                records = list(session.run(self._reasoning_path_query(max_hops, fulltext=False),
+                                           **params))
+            
+            return [(record['path_length'], [(list(node.labels), dict(node)) for node in record['nodes']])
+                    for record in records]
+    
+    @staticmethod
+    def _reasoning_path_query(max_hops: int, fulltext: bool = True) -> str:
+        """Shortest paths between the best-matching errors and resolutions"""
+        def anchors(var: str, label: str, index: str, key: str, fields: Tuple[str, ...],
+                    side: str, carry: str = '') -> str:
+            if fulltext:
+                return f"""
+                CALL {{
+                    MATCH ({var}:{label} {{{key}: ${side}_text}})
+                    RETURN {var}, 1 AS exact, 0.0 AS score
+                  UNION ALL
+                    CALL db.index.fulltext.queryNodes('{index}', ${side}_search)
+                    YIELD node AS {var}, score
+                    WHERE score >= $min_score
+                    RETURN {var}, 0 AS exact, score
+                }}
+                WITH {carry}{var}, max(exact) AS exact, max(score) AS score
+                ORDER BY exact DESC, score DESC
+                LIMIT $anchors"""
+            matches = ' OR '.join(f"{var}.{field} CONTAINS ${side}_text" for field in fields)
+            return f"""
+                CALL {{
+                    MATCH ({var}:{label})
+                    WHERE {matches}
+                    RETURN {var}
+                    LIMIT $anchors
+                }}"""
+        
+        errors = anchors('e', 'Error', 'error_search', 'type', ('message', 'type'), 'from')
+        resolutions = anchors('r', 'Resolution', 'resolution_search', 'approach',
+                              ('description', 'approach'), 'to', carry='errors, ')
+        return f"""{errors}
+                WITH collect(e) AS errors
+                {resolutions}
+                WITH errors, collect(r) AS resolutions
+                UNWIND errors AS e
+                UNWIND resolutions AS r
+                MATCH path = shortestPath((e)-[*..{max_hops}]-(r))
                 RETURN nodes(path) as nodes,
                        relationships(path) as rels,
                        length(path) as path_length
-                LIMIT 3
-            """, from_error=from_error, to_resolution=to_resolution)
-            
-            paths = []
-            for record in result:
-                path_info = {
-                    'length': record['path_length'],
-                    'steps': []
-                }
-                
-                nodes = record['nodes']
-                for i, node in enumerate(nodes):
-                    step = {
-                        'index': i,
-                        'labels': list(node.labels),
-                        'properties': dict(node)
-                    }
-                    path_info['steps'].append(step)
-                
-                paths.append(path_info)
+                ORDER BY path_length
+                LIMIT $limit
+        """
+    
+    def benchmark_reasoning_path(self, errors: int = 10000, links: int = 3, samples: int = 20,
+                                 max_hops: int = DEFAULT_REASONING_HOPS, seed: int = 0) -> Dict:
+        """Time find_reasoning_path on a synthetic graph (removed again afterwards)
+        
+        Writes `errors` Error and as many Resolution nodes, tagged with a run
+        id, links each error to `links` random resolutions and times `samples`
+        random error type -> approach lookups. Latencies are in milliseconds.
+        """
+        rng = random.Random(seed)
+        run = f"bench_{int(time.time())}"
+        kinds = 50
+        self.create_learning_schema()
+        
+        try:
+            self._write_benchmark(run, kinds, errors, links, rng)
             
-            return paths
+            latencies = []
+            found = 0
+            for _ in range(samples):
+                kind = rng.randrange(kinds)
+                started = time.perf_counter()
+                paths = self.find_reasoning_path(f"BenchError{kind}", f"bench_approach_{kind}",
+                                                 max_hops=max_hops)
+                latencies.append((time.perf_counter() - started) * 1000)
+                found += bool(paths)
+        finally:
+            self._delete_benchmark(run)
+        
+        latencies.sort()
+        return {
+            'errors': errors,
+            'resolutions': errors,
+            'links': errors * links,
+            'samples': samples,
+            'found': found,
+            'median_ms': statistics.median(latencies) if latencies else 0.0,
+            'p95_ms': latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            'max_ms': latencies[-1] if latencies else 0.0
+        }
+    
+    def _write_benchmark(self, run: str, kinds: int, errors: int, links: int, rng: random.Random):
+        """Write the synthetic graph of a benchmark run, in batches"""
+        with self.driver.session(database=self.database) as session:
+            # Every node first, so links can point at any resolution
+            for start in range(0, errors, BENCHMARK_BATCH_SIZE):
+                rows = list(range(start, min(start + BENCHMARK_BATCH_SIZE, errors)))
+                session.execute_write(self._benchmark_nodes_tx, run, kinds, rows)
+            for start in range(0, errors, BENCHMARK_BATCH_SIZE):
+                rows = [{'i': i, 'links': [rng.randrange(errors) for _ in range(links)]}
+                        for i in range(start, min(start + BENCHMARK_BATCH_SIZE, errors))]
+                session.execute_write(self._benchmark_links_tx, run, rows)
+    
+    @staticmethod
+    def _benchmark_nodes_tx(tx, run: str, kinds: int, rows: List[int]):
+        """Synthetic error i and resolution i for every i in rows"""
+        tx.run("""
+            UNWIND $rows AS i
+            CREATE (:Error {id: $run + '_ERR_' + i, benchmark: $run,
+                            type: 'BenchError' + (i % $kinds),
+                            message: 'benchmark failure ' + i + ' in module' + (i % 100),
+                            occurrence_count: 1})
+            CREATE (:Resolution {id: $run + '_RES_' + i, benchmark: $run,
+                                 description: 'benchmark fix ' + i,
+                                 approach: 'bench_approach_' + (i % $kinds),
+                                 success_count: 1})
+        """, run=run, kinds=kinds, rows=rows)
+    
+    @staticmethod
+    def _benchmark_links_tx(tx, run: str, rows: List[Dict]):
+        """RESOLVED_BY from synthetic error row.i to each resolution in row.links"""
+        tx.run("""
+            UNWIND $rows AS row
+            MATCH (e:Error {id: $run + '_ERR_' + row.i})
+            UNWIND row.links AS link
+            MATCH (r:Resolution {id: $run + '_RES_' + link})
+            MERGE (e)-[:RESOLVED_BY]->(r)
+        """, run=run, rows=rows)
+    
+    def _delete_benchmark(self, run: str):
+        """Remove the nodes of a benchmark run, in batches"""
+        with self.driver.session(database=self.database) as session:
+            while True:
+                deleted = session.run("""
+                    MATCH (n) WHERE (n:Error OR n:Resolution) AND n.benchmark = $run
+                    WITH n LIMIT $batch
+                    DETACH DELETE n
+                    RETURN count(*) AS deleted
+                """, run=run, batch=BENCHMARK_BATCH_SIZE).single()['deleted']
+                if not deleted:
+                    break
     
     # ==================== LEARNING CREATION ====================
     
     def create_learning(self, title: str, category: str, insight: str, 
                        source_type: str = "manual", related_ids: List[str] = None) -> str:
-        """Create a new learning entry"""
-        learning_id = self.generate_id("LRN", title[:50])
+        """Create a learning entry (the same title and category update it)"""
+        learning_id = self.generate_id("LRN", normalize_signature(category, title))
+        self._write_events([new_event('create_learning', {
+            'title': title, 'category': category, 'insight': insight,
+            'source_type': source_type, 'related_ids': related_ids
+        })])
+        
+        print(f"✅ Created learning: {title}")
+        return learning_id
+    
+    # ==================== OFFLINE QUEUE ====================
+    
+    def _event_rows(self, events: List[Dict]) -> Dict[str, List[Dict]]:
+        """Write parameters of queued events, by statement (IDs as the record methods derive them)"""
+        rows = {'record_error': [], 'resolution': [], 'record_success': [], 'create_learning': []}
+        for event in events:
+            args, at = event['args'], event['queued_at']
+            row = {'event_id': event['id'], 'at': at}
+            if event['kind'] == 'record_error':
+                message = args['message']
+                context = args.get('context')
+                row.update(error_id=self.generate_id(
+                               "ERR", normalize_signature(args['error_type'], mask_message(message))),
+                           error_type=args['error_type'], message=message,
+                           context=json.dumps(context) if context else "{}")
+                rows['record_error'].append(row)
+                if args.get('resolution'):
+                    approach = args.get('resolution_approach') or "manual fix"
+                    rows['resolution'].append(dict(
+                        row, resolution=args['resolution'], approach=approach,
+                        resolution_id=self.generate_id(
+                            "RES", normalize_signature(args['resolution'], approach))))
+            elif event['kind'] == 'record_success':
+                row.update(task_id=args['task_id'], task_type=args['task_type'],
+                           approach=args['approach'], outcome=args.get('outcome', "completed"),
+                           confidence=args.get('confidence', 1.0),
+                           pattern_id=self.generate_id(
+                               "PAT", normalize_signature(args['task_type'], args['approach'])))
+                rows['record_success'].append(row)
+            elif event['kind'] == 'create_learning':
+                row.update(title=args['title'], category=args['category'], insight=args['insight'],
+                           source_type=args.get('source_type', "manual"),
+                           related_ids=args.get('related_ids') or [],
+                           learning_id=self.generate_id(
+                               "LRN", normalize_signature(args['category'], args['title'])))
+                rows['create_learning'].append(row)
+            else:
+                raise ValueError(f"Unknown learning event {event['kind']!r}")
+        return rows
+    
+    def replay_events(self, events: List[Dict]) -> int:
+        """Write queued learning events (see learning_queue.py) in one transaction
         
+        Each event leaves a LearningEvent node with its id in the same
+        transaction, and events that already have one are skipped, so a
+        batch replayed twice is counted once. The nodes are pruned after
+        LEARNING_EVENT_TTL_HOURS. Only applied errors are added to the error
+        templates, once the transaction commits. Returns the events applied.
+        """
+        return self._write_events(events, claim=True)
+    
+    def _write_events(self, events: List[Dict], claim: bool = False) -> int:
+        """Write learning events in one transaction (claim: skip and mark replayed ones)"""
+        rows = self._event_rows(events)
         with self.driver.session(database=self.database) as session:
-            session.run("""
-                CREATE (l:Learning {
-                    id: $learning_id,
-                    title: $title,
-                    category: $category,
-                    insight: $insight,
-                    source_type: $source_type,
-                    created_at: datetime(),
-                    confidence: 1.0,
-                    applied_count: 0
-                })
-            """,
-                learning_id=learning_id,
-                title=title,
-                category=category,
-                insight=insight,
-                source_type=source_type
-            )
-            
-            # Link to related nodes
-            if related_ids:
-                for related_id in related_ids:
-                    session.run("""
-                        MATCH (l:Learning {id: $learning_id})
-                        OPTIONAL MATCH (n) WHERE n.id = $related_id
-                        FOREACH (x IN CASE WHEN n IS NOT NULL THEN [1] ELSE [] END |
-                            MERGE (l)-[:DERIVED_FROM]->(n)
-                        )
-                    """, learning_id=learning_id, related_id=related_id)
-            
-            print(f"✅ Created learning: {title}")
-            return learning_id
+            applied, self._templates = session.execute_write(
+                self._replay_events_tx, rows, self.templates, claim)
+        return applied
+    
+    @staticmethod
+    def _replay_events_tx(tx, rows: Dict[str, List[Dict]], templates: TemplateMiner,
+                          claim: bool = True) -> Tuple[int, TemplateMiner]:
+        """Claim the events not applied yet, then write them statement by statement
+        
+        Without claim every event is written and no LearningEvent is left.
+        Returns the events applied and a copy of templates with their errors
+        added (templates itself is left alone, as the transaction may fail).
+        """
+        event_ids = list(dict.fromkeys(
+            row['event_id'] for kind_rows in rows.values() for row in kind_rows))
+        if claim:
+            tx.run("""
+                MATCH (ev:LearningEvent)
+                WHERE ev.applied_at < datetime() - duration({hours: $ttl})
+                DETACH DELETE ev
+            """, ttl=LEARNING_EVENT_TTL_HOURS)
+            fresh = {record['id'] for record in tx.run("""
+                UNWIND $ids AS id
+                MERGE (ev:LearningEvent {id: id})
+                ON CREATE SET ev.applied_at = datetime(), ev.fresh = true
+                WITH ev WHERE ev.fresh
+                REMOVE ev.fresh
+                RETURN ev.id AS id
+            """, ids=event_ids)}
+        else:
+            fresh = set(event_ids)
+        
+        def unapplied(kind: str) -> List[Dict]:
+            return [row for row in rows[kind] if row['event_id'] in fresh]
+        
+        miner = templates.copy()
+        errors = unapplied('record_error')
+        for row in errors:
+            template = miner.add(row['message'])
+            row.update(template_id=template.id, template=template.template,
+                       template_size=template.size)
+        
+        # Rows are applied in queue order, so repeats of one error add up
+        tx.run("""
+            UNWIND $rows AS row
+            MERGE (e:Error {id: row.error_id})
+            SET e.type = row.error_type,
+                e.message = row.message,
+                e.context = row.context,
+                e.template_id = row.template_id,
+                e.first_seen = coalesce(e.first_seen, datetime(row.at)),
+                e.last_seen = datetime(row.at),
+                e.occurrence_count = coalesce(e.occurrence_count, 0) + 1
+            MERGE (t:ErrorTemplate {id: row.template_id})
+            SET t.template = row.template,
+                t.size = row.template_size,
+                t.updated_at = datetime()
+            MERGE (e)-[:INSTANCE_OF]->(t)
+            WITH e, t
+            OPTIONAL MATCH (e)-[old:INSTANCE_OF]->(other:ErrorTemplate)
+            WHERE other <> t
+            DELETE old
+        """, rows=errors)
+        tx.run("""
+            UNWIND $rows AS row
+            MATCH (e:Error {id: row.error_id})
+            MERGE (r:Resolution {id: row.resolution_id})
+            SET r.description = row.resolution,
+                r.approach = row.approach,
+                r.created_at = coalesce(r.created_at, datetime(row.at)),
+                r.success_count = coalesce(r.success_count, 0) + 1
+            MERGE (e)-[rel:RESOLVED_BY]->(r)
+            SET rel.last_used = datetime(row.at),
+                rel.use_count = coalesce(rel.use_count, 0) + 1
+        """, rows=unapplied('resolution'))
+        tx.run("""
+            UNWIND $rows AS row
+            MERGE (t:Task {id: row.task_id})
+            SET t.type = row.task_type,
+                t.status = row.outcome,
+                t.completed_at = datetime(row.at)
+            MERGE (p:Pattern {id: row.pattern_id})
+            SET p.type = row.task_type,
+                p.approach = row.approach,
+                p.last_success = datetime(row.at),
+                p.success_count = coalesce(p.success_count, 0) + 1,
+                p.total_confidence = coalesce(p.total_confidence, 0) + row.confidence
+            MERGE (t)-[:USED_PATTERN]->(p)
+        """, rows=unapplied('record_success'))
+        tx.run("""
+            UNWIND $rows AS row
+            MERGE (l:Learning {id: row.learning_id})
+            ON CREATE SET l.created_at = datetime(row.at),
+                          l.confidence = 1.0,
+                          l.applied_count = 0
+            SET l.title = row.title,
+                l.category = row.category,
+                l.insight = row.insight,
+                l.source_type = row.source_type,
+                l.updated_at = datetime(row.at)
+            WITH l, row
+            UNWIND row.related_ids AS related_id
+            MATCH (n) WHERE n.id = related_id
+            MERGE (l)-[:DERIVED_FROM]->(n)
+        """, rows=unapplied('create_learning'))
+        return len(fresh), miner
     
     # ==================== STATISTICS ====================
     
@@ -478,6 +911,312 @@ class LearningEngine:
             }
 
 
+class LocalLearningEngine(LearningEngine):
+    """Learning engine on a local graph store (GRAPH_BACKEND=sqlite)
+
+    Records the same nodes and relationships as LearningEngine. Keyword
+    matching over node properties takes the place of the fulltext indexes:
+    a match needs at least MIN_LOCAL_MATCH of the searched words.
+    """
+    
+    def __init__(self, store: GraphStore):
+        """Use a local graph store (closed with the engine)"""
+        self.store = store
+        self.driver = None
+        self.database = None
+        print(f"✅ Learning engine using local graph store: {store.target}")
+    
+    def close(self):
+        """Close the local store (and save the error templates learned)"""
+        super().close()
+        self.store.close()
+    
+    def create_learning_schema(self):
+        """Nothing to set up: the local store keeps its own indexes"""
+        print("  ✅ Learning schema ready (local graph store)")
+    
+    @staticmethod
+    def _words(text: str) -> List[str]:
+        return list(dict.fromkeys(word.lower() for word in re.findall(r'\w+', text or '')))
+    
+    def _matching(self, label: str, fields: Tuple[str, ...], text: str) -> List[Tuple[Dict, float]]:
+        """(node, share of the words of text matched) of nodes matching enough of them"""
+        words = self._words(text)
+        found = [(node, len(matched) / len(words))
+                 for node, matched in self.store.search(label, fields, words)]
+        return [(node, score) for node, score in found if score >= MIN_LOCAL_MATCH]
+    
+    def _link_template(self, error_id: str, template):
+        """Make an error an instance of its template (only)"""
+        self.store.merge_node('ErrorTemplate', template.id, {
+            'id': template.id, 'template': template.template, 'size': template.size,
+            'updated_at': timestamp()
+        })
+        self.store.merge_node('Error', error_id, {'template_id': template.id})
+        self.store.delete_edges(('Error', error_id), ['INSTANCE_OF'])
+        self.store.merge_edge(('Error', error_id), 'INSTANCE_OF', ('ErrorTemplate', template.id))
+    
+    def record_error(self, error_type: str, message: str, context: Dict = None,
+                    resolution: str = None, resolution_approach: str = None) -> str:
+        """Record an error and optionally its resolution (see LearningEngine.record_error)"""
+        error_id = self.generate_id("ERR", normalize_signature(error_type, mask_message(message)))
+        miner = self.templates.copy()
+        template = miner.add(message)
+        now = timestamp()
+        
+        with self.store.transaction():
+            self.store.merge_node('Error', error_id, {
+                'id': error_id,
+                'type': error_type,
+                'message': message,
+                'context': json.dumps(context) if context else "{}",
+                'last_seen': now
+            }, on_create={'first_seen': now}, increment={'occurrence_count': 1})
+            self._link_template(error_id, template)
+            
+            if resolution:
+                approach = resolution_approach or "manual fix"
+                resolution_id = self.generate_id("RES", normalize_signature(resolution, approach))
+                self.store.merge_node('Resolution', resolution_id, {
+                    'id': resolution_id, 'description': resolution, 'approach': approach
+                }, on_create={'created_at': now}, increment={'success_count': 1})
+                self.store.merge_edge(('Error', error_id), 'RESOLVED_BY', ('Resolution', resolution_id),
+                                      {'last_used': now}, increment={'use_count': 1})
+        self._templates = miner
+        
+        if resolution:
+            print(f"✅ Recorded error '{error_type}' with resolution")
+            return resolution_id
+        
+        print(f"✅ Recorded error '{error_type}'")
+        return error_id
+    
+    def _error_record(self, error: Dict) -> Dict:
+        """An error with its resolutions, as find_similar_errors reports it"""
+        resolutions = [{
+            'resolution': resolution.get('description'),
+            'approach': resolution.get('approach'),
+            'success_count': resolution.get('success_count'),
+            'use_count': rel.get('use_count')
+        } for rel, resolution in self.store.neighbors(('Error', error['id']), 'RESOLVED_BY')]
+        return {
+            'error_id': error['id'],
+            'error_type': error.get('type'),
+            'message': error.get('message'),
+            'occurrences': error.get('occurrence_count'),
+            'resolutions': resolutions
+        }
+    
+    def find_similar_errors(self, error_message: str, limit: int = 5) -> List[Dict]:
+        """Errors of the message's template, else errors matching its words"""
+        template = self.templates.match(error_message)
+        if template is not None:
+            errors = [error for _, error in self.store.neighbors(('ErrorTemplate', template.id),
+                                                                 'INSTANCE_OF', direction='in')]
+            if errors:
+                errors.sort(key=lambda error: error.get('occurrence_count') or 0, reverse=True)
+                return [dict(self._error_record(error), template=template.template)
+                        for error in errors[:limit]]
+        
+        found = self._matching('Error', ('type', 'message', 'context'), error_message)
+        found.sort(key=lambda item: item[1], reverse=True)
+        return [dict(self._error_record(error), score=score) for error, score in found[:limit]]
+    
+    def _stored_templates(self) -> List[Tuple[str, str, int]]:
+        """(id, template, size) of the ErrorTemplate nodes"""
+        return [(template['id'], template.get('template') or '', template.get('size') or 0)
+                for template in self.store.nodes('ErrorTemplate')]
+    
+    def rebuild_error_templates(self) -> int:
+        """Cluster every recorded error again, from scratch"""
+        self._templates = miner = TemplateMiner(TEMPLATE_INDEX_FILE)
+        miner.authoritative = True
+        errors = sorted(self.store.nodes('Error'), key=lambda error: error.get('first_seen') or '')
+        assigned = [(error['id'], miner.add(error.get('message') or '')) for error in errors]
+        
+        with self.store.transaction():
+            # Final templates only, once every message generalized them
+            for error_id, cluster in assigned:
+                self._link_template(error_id, cluster)
+            unused = [template['id'] for template in self.store.nodes('ErrorTemplate')
+                      if not self.store.neighbors(('ErrorTemplate', template['id']), 'INSTANCE_OF',
+                                                  direction='in')]
+            self.store.delete_nodes('ErrorTemplate', unused)
+        
+        miner.dirty = True
+        miner.save()
+        return len(miner.clusters)
+    
+    def record_success(self, task_id: str, task_type: str, approach: str,
+                      outcome: str = "completed", confidence: float = 1.0) -> str:
+        """Record a successful task completion pattern"""
+        pattern_id = self.generate_id("PAT", normalize_signature(task_type, approach))
+        now = timestamp()
+        
+        with self.store.transaction():
+            self.store.merge_node('Task', task_id, {
+                'id': task_id, 'type': task_type, 'status': outcome, 'completed_at': now
+            })
+            self.store.merge_node('Pattern', pattern_id, {
+                'id': pattern_id, 'type': task_type, 'approach': approach, 'last_success': now
+            }, increment={'success_count': 1, 'total_confidence': confidence})
+            self.store.merge_edge(('Task', task_id), 'USED_PATTERN', ('Pattern', pattern_id))
+        
+        print(f"✅ Recorded success pattern: {approach} for {task_type}")
+        return pattern_id
+    
+    def get_successful_patterns(self, task_type: str = None, limit: int = 10) -> List[Dict]:
+        """Get most successful patterns for a task type"""
+        patterns = [{
+            'pattern_id': pattern['id'],
+            'task_type': pattern.get('type'),
+            'approach': pattern.get('approach'),
+            'success_count': pattern.get('success_count') or 0,
+            'avg_confidence': (pattern.get('total_confidence') or 0) / (pattern.get('success_count') or 1),
+            'last_used': pattern.get('last_success')
+        } for pattern in self.store.nodes('Pattern', {'type': task_type} if task_type else None)]
+        patterns.sort(key=lambda p: (p['success_count'], p['avg_confidence']), reverse=True)
+        return patterns[:limit]
+    
+    def _recommendation_records(self, keywords: List[str], limit: int) -> List[Dict]:
+        """Patterns, KB entries and documents containing the keywords, ranked like the Neo4j query"""
+        candidates = max(limit, 3) * 2
+        records = []
+        
+        for pattern, matched in self.store.search('Pattern', ('approach', 'type'), keywords)[:candidates]:
+            success_count = pattern.get('success_count') or 0
+            records.append(({
+                'source': 'pattern',
+                'rec': {'pattern_id': pattern['id'], 'task_type': pattern.get('type'),
+                        'approach': pattern.get('approach'), 'success_count': success_count,
+                        'confidence': (pattern.get('total_confidence') or 0) / (success_count or 1)},
+                'matched': matched
+            }, pattern.get('total_confidence') or float(success_count)))
+        
+        for entry, matched in self.store.search('KBEntry', ('title', 'content_preview'), keywords)[:candidates]:
+            skills = [skill['name'] for _, skill in
+                      self.store.neighbors(('KBEntry', entry['id']), 'TEACHES', label='Skill')]
+            records.append(({
+                'source': 'knowledge_base',
+                'rec': {'kb_id': entry['id'], 'title': entry.get('title'),
+                        'category': entry.get('category'), 'skills': skills[:3]},
+                'matched': matched
+            }, 0.0))
+        
+        for doc, matched in self.store.search('Document', ('title', 'content_preview'), keywords)[:candidates]:
+            records.append(({
+                'source': 'document',
+                'rec': {'doc_id': doc['id'], 'title': doc.get('title'), 'doc_type': doc.get('type'),
+                        'author': doc.get('author')},
+                'matched': matched
+            }, 0.0))
+        
+        records.sort(key=lambda item: (len(item[0]['matched']), item[1]), reverse=True)
+        return [record for record, _ in records[:limit]]
+    
+    def _anchors(self, label: str, key: str, text: str, fields: Tuple[str, ...]) -> List[Dict]:
+        """Nodes whose key equals text, then those matching its words (MAX_REASONING_ANCHORS)"""
+        found = self._matching(label, fields, text)
+        found.sort(key=lambda item: item[1], reverse=True)
+        nodes = {node['id']: node for node in self.store.nodes(label, {key: text})}
+        for node, _ in found:
+            nodes.setdefault(node['id'], node)
+        return list(nodes.values())[:MAX_REASONING_ANCHORS]
+    
+    def _reasoning_paths(self, from_error: str, to_resolution: str, max_hops: int,
+                         limit: int) -> List[Tuple[int, List[Tuple[List[str], Dict]]]]:
+        """Shortest paths between the best-matching errors and resolutions"""
+        errors = self._anchors('Error', 'type', from_error, ('message', 'type'))
+        resolutions = self._anchors('Resolution', 'approach', to_resolution, ('description', 'approach'))
+        paths = self.store.shortest_paths([('Error', error['id']) for error in errors],
+                                          [('Resolution', resolution['id']) for resolution in resolutions],
+                                          max_hops, limit)
+        return [(len(path) - 1, path) for path in paths]
+    
+    def _write_benchmark(self, run: str, kinds: int, errors: int, links: int, rng: random.Random):
+        """Write the synthetic graph of a benchmark run, in one transaction"""
+        with self.store.transaction():
+            for i in range(errors):
+                self.store.merge_node('Error', f"{run}_ERR_{i}", {
+                    'id': f"{run}_ERR_{i}", 'benchmark': run, 'type': f"BenchError{i % kinds}",
+                    'message': f"benchmark failure {i} in module{i % 100}", 'occurrence_count': 1
+                })
+                self.store.merge_node('Resolution', f"{run}_RES_{i}", {
+                    'id': f"{run}_RES_{i}", 'benchmark': run, 'description': f"benchmark fix {i}",
+                    'approach': f"bench_approach_{i % kinds}", 'success_count': 1
+                })
+            for i in range(errors):
+                for _ in range(links):
+                    self.store.merge_edge(('Error', f"{run}_ERR_{i}"), 'RESOLVED_BY',
+                                          ('Resolution', f"{run}_RES_{rng.randrange(errors)}"))
+    
+    def _delete_benchmark(self, run: str):
+        """Remove the nodes of a benchmark run"""
+        with self.store.transaction():
+            for label in ('Error', 'Resolution'):
+                self.store.delete_nodes(label, [node['id'] for node in
+                                                self.store.nodes(label, {'benchmark': run})])
+    
+    def create_learning(self, title: str, category: str, insight: str,
+                       source_type: str = "manual", related_ids: List[str] = None) -> str:
+        """Create a learning entry (the same title and category update it)"""
+        learning_id = self.generate_id("LRN", normalize_signature(category, title))
+        now = timestamp()
+        
+        with self.store.transaction():
+            self.store.merge_node('Learning', learning_id, {
+                'id': learning_id, 'title': title, 'category': category, 'insight': insight,
+                'source_type': source_type, 'updated_at': now
+            }, on_create={'created_at': now, 'confidence': 1.0, 'applied_count': 0})
+            
+            # Link to related nodes
+            for related_id in related_ids or []:
+                related = self.store.find(related_id)
+                if related is not None:
+                    self.store.merge_edge(('Learning', learning_id), 'DERIVED_FROM', related)
+        
+        print(f"✅ Created learning: {title}")
+        return learning_id
+    
+    def replay_events(self, events: List[Dict]) -> int:
+        """Write queued learning events in one transaction (see LearningEngine.replay_events)
+        
+        The local store is always reachable, so events wait in the queue only
+        briefly; they are recorded with the time of the replay.
+        """
+        applied, templates = 0, self.templates
+        expired = (datetime.now(timezone.utc) - timedelta(hours=LEARNING_EVENT_TTL_HOURS)).isoformat()
+        try:
+            with self.store.transaction():
+                self.store.delete_nodes('LearningEvent', [
+                    event['id'] for event in self.store.nodes('LearningEvent')
+                    if (event.get('applied_at') or '') < expired])
+                for event in events:
+                    if event['kind'] not in EVENT_KINDS:
+                        raise ValueError(f"Unknown learning event {event['kind']!r}")
+                    if self.store.node(('LearningEvent', event['id'])) is not None:
+                        continue
+                    self.store.merge_node('LearningEvent', event['id'],
+                                          {'id': event['id'], 'applied_at': timestamp()})
+                    getattr(self, event['kind'])(**event['args'])
+                    applied += 1
+        except BaseException:
+            # The errors of a rolled back batch are not templates either
+            self._templates = templates
+            raise
+        return applied
+    
+    def get_learning_stats(self) -> Dict:
+        """Get learning statistics"""
+        return {
+            'errors_tracked': self.store.count('Error'),
+            'resolutions': self.store.count('Resolution'),
+            'patterns': self.store.count('Pattern'),
+            'learnings': self.store.count('Learning'),
+            'error_resolution_links': self.store.count_edges('RESOLVED_BY')
+        }
+
+
 def print_recommendations(recommendations: List[Dict]):
     """Pretty print recommendations"""
     if not recommendations:
@@ -505,7 +1244,8 @@ def print_recommendations(recommendations: List[Dict]):
             print(f"     Type: {rec['doc_type']}")
             print(f"     Author: {rec['author']}")
         
-        print(f"     Matched: '{rec.get('matched_keyword', 'N/A')}'")
+        matched = rec.get('matched_keywords') or [rec.get('matched_keyword', 'N/A')]
+        print(f"     Matched: {', '.join(repr(keyword) for keyword in matched)}")
         print()
 
 
@@ -520,6 +1260,8 @@ def print_similar_errors(errors: List[Dict]):
     for i, err in enumerate(errors, 1):
         print(f"  {i}. [{err['error_type']}] {err['message'][:60]}...")
         print(f"     Occurrences: {err['occurrences']}")
+        if err.get('template'):
+            print(f"     Template: {err['template'][:60]}")
         
         resolutions = err.get('resolutions', [])
         if resolutions and resolutions[0].get('resolution'):
@@ -531,6 +1273,30 @@ def print_similar_errors(errors: List[Dict]):
         print()
 
 
+def learning_event(args) -> Optional[Tuple[str, Dict]]:
+    """(method, arguments) of the record the command line asks for, if any"""
+    if args.record_error:
+        error_type, message = args.record_error
+        return 'record_error', {'error_type': error_type, 'message': message,
+                                'resolution': args.resolution, 'resolution_approach': args.approach}
+    if args.record_success:
+        return 'record_success', {'task_id': args.record_success, 'task_type': args.task_type,
+                                  'approach': args.success_approach, 'outcome': args.outcome}
+    if args.create_learning:
+        title, category, insight = args.create_learning
+        return 'create_learning', {'title': title, 'category': category, 'insight': insight}
+    return None
+
+
+def queue_record(kind: str, kwargs: Dict, flush: bool = True):
+    """Queue a record (no database connection) and, with flush, write it in the background"""
+    event_id = queue_event(kind, kwargs)
+    if flush and start_background_flush():
+        print(f"📥 Queued {kind} as {event_id}; writing it in the background")
+    else:
+        print(f"📥 Queued {kind} as {event_id}; run --flush-queue to write it")
+
+
 def main():
     """Main execution function"""
     parser = argparse.ArgumentParser(description='Self-Learning Engine for Neo4j')
@@ -541,6 +1307,8 @@ def main():
     parser.add_argument('--resolution', help='Resolution for the error')
     parser.add_argument('--approach', help='Approach used for resolution')
     parser.add_argument('--similar-errors', help='Find similar errors by message')
+    parser.add_argument('--rebuild-templates', action='store_true',
+                        help='Cluster all recorded errors into templates again')
     
     # Success patterns
     parser.add_argument('--record-success', metavar='TASK_ID', help='Record successful task')
@@ -554,11 +1322,27 @@ def main():
     # Reasoning path
     parser.add_argument('--reasoning-path', nargs=2, metavar=('FROM', 'TO'),
                         help='Find reasoning path from error to resolution')
+    parser.add_argument('--max-hops', type=int, default=DEFAULT_REASONING_HOPS,
+                        help=f'Longest reasoning path searched (default: {DEFAULT_REASONING_HOPS})')
+    parser.add_argument('--max-paths', type=int, default=DEFAULT_REASONING_PATHS,
+                        help=f'Reasoning paths returned (default: {DEFAULT_REASONING_PATHS})')
+    parser.add_argument('--benchmark-reasoning', type=int, metavar='ERRORS',
+                        help='Time reasoning path lookups on a synthetic graph of ERRORS errors '
+                             '(written to the database and removed afterwards)')
     
     # Learning
     parser.add_argument('--create-learning', nargs=3, metavar=('TITLE', 'CATEGORY', 'INSIGHT'),
                         help='Create a new learning entry')
     
+    # Offline queue
+    parser.add_argument('--queue', action='store_true',
+                        help='Only queue the record for --flush-queue '
+                             '(no background flush)')
+    parser.add_argument('--flush-queue', action='store_true',
+                        help='Write the queued records to the graph')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_FLUSH_BATCH_SIZE,
+                        help=f'Queued records per write transaction (default: {DEFAULT_FLUSH_BATCH_SIZE})')
+    
     # Stats
     parser.add_argument('--stats', action='store_true', help='Show learning statistics')
     parser.add_argument('--patterns', action='store_true', help='Show successful patterns')
@@ -566,17 +1350,39 @@ def main():
     
     args = parser.parse_args()
     
-    # Get Neo4j credentials
-    uri = os.getenv('NEO4J_URI')
-    username = os.getenv('NEO4J_USERNAME')
-    password = os.getenv('NEO4J_PASSWORD')
-    database = os.getenv('NEO4J_DATABASE', 'neo4j')
+    if args.record_success and not args.success_approach:
+        print("❌ Error: --success-approach is required")
+        return
+    
+    # Records are queued first, so a database that is down never blocks them
+    event = learning_event(args)
+    if event is not None:
+        queue_record(*event, flush=not args.queue)
+        return
+    if args.queue:
+        print("❌ Error: --queue needs --record-error, --record-success or --create-learning")
+        return
     
-    if not all([uri, username, password]):
-        print("❌ Error: Neo4j credentials not found in .env file")
+    try:
+        backend = graph_backend()
+    except ValueError as e:
+        print(f"❌ Error: {e}")
         return
     
-    engine = LearningEngine(uri, username, password, database)
+    if backend == 'sqlite':
+        engine = LocalLearningEngine(open_graph_store())
+    else:
+        # Get Neo4j credentials
+        uri = os.getenv('NEO4J_URI')
+        username = os.getenv('NEO4J_USERNAME')
+        password = os.getenv('NEO4J_PASSWORD')
+        database = os.getenv('NEO4J_DATABASE', 'neo4j')
+        
+        if not all([uri, username, password]):
+            print("❌ Error: Neo4j credentials not found in .env file")
+            return
+        
+        engine = LearningEngine(uri, username, password, database)
     
     try:
         # Setup schema
@@ -585,33 +1391,16 @@ def main():
             print("✅ Learning schema setup complete")
             return
         
-        # Record error
-        if args.record_error:
-            error_type, message = args.record_error
-            engine.record_error(
-                error_type=error_type,
-                message=message,
-                resolution=args.resolution,
-                resolution_approach=args.approach
-            )
+        # Rebuild error templates
+        if args.rebuild_templates:
+            count = engine.rebuild_error_templates()
+            print(f"✅ Grouped recorded errors into {count} templates")
         
         # Find similar errors
         elif args.similar_errors:
             errors = engine.find_similar_errors(args.similar_errors)
             print_similar_errors(errors)
         
-        # Record success
-        elif args.record_success:
-            if not args.success_approach:
-                print("❌ Error: --success-approach is required")
-                return
-            engine.record_success(
-                task_id=args.record_success,
-                task_type=args.task_type,
-                approach=args.success_approach,
-                outcome=args.outcome
-            )
-        
         # Get recommendations
         elif args.recommend:
             recommendations = engine.get_recommendations(args.recommend)
@@ -620,7 +1409,8 @@ def main():
         # Find reasoning path
         elif args.reasoning_path:
             from_error, to_resolution = args.reasoning_path
-            paths = engine.find_reasoning_path(from_error, to_resolution)
+            paths = engine.find_reasoning_path(from_error, to_resolution,
+                                               max_hops=args.max_hops, limit=args.max_paths)
             if paths:
                 print(f"\n🧠 Found {len(paths)} reasoning paths:\n")
                 for i, path in enumerate(paths, 1):
@@ -631,10 +1421,30 @@ def main():
             else:
                 print("\n📭 No reasoning paths found")
         
-        # Create learning
-        elif args.create_learning:
-            title, category, insight = args.create_learning
-            engine.create_learning(title, category, insight)
+        # Benchmark reasoning paths
+        elif args.benchmark_reasoning:
+            print(f"\n⏱️  Benchmarking reasoning paths on {args.benchmark_reasoning} synthetic errors...")
+            result = engine.benchmark_reasoning_path(args.benchmark_reasoning, max_hops=args.max_hops)
+            print(f"   Graph: {result['errors']} errors, {result['resolutions']} resolutions, "
+                  f"{result['links']} links")
+            print(f"   {result['samples']} lookups ({result['found']} with a path): "
+                  f"median {result['median_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+                  f"max {result['max_ms']:.1f} ms")
+        
+        # Replay queued records
+        elif args.flush_queue:
+            queue = LearningQueue.open()
+            try:
+                totals = queue.flush(engine.replay_events, args.batch_size)
+                if totals['replayed']:
+                    print(f"✅ Replayed {totals['replayed']} queued records ({totals['applied']} new) "
+                          f"in {totals['batches']} batches")
+                else:
+                    print("📭 No queued records")
+            except Exception as e:
+                print(f"⚠️  Could not write to the graph ({e}); {queue.pending()} records stay queued")
+            finally:
+                queue.close()
         
         # Show stats
         elif args.stats:
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Learning Event Queue
+
+A write-ahead log for the learning engine: record_error, record_success and
+create_learning calls are appended to a local SQLite file first (no network,
+a few milliseconds) and replayed into the graph later, so learnings made
+while Neo4j is down are kept rather than lost.
+
+- append() writes one event durably (synchronous = FULL) and returns its id
+- flush() replays the oldest events in batches through a replay callback
+  (LearningEngine.replay_events) and deletes each batch once it is written
+- an event that fails to replay stays queued, in order, for the next flush
+
+Every event has a unique id and the engine marks it applied in the same
+transaction that writes it, so replaying a batch twice (a crash between the
+write and the delete, or two flushes at once) counts it once.
+
+Usage:
+    queue = LearningQueue.open()
+    queue.append('record_error', {'error_type': 'TypeError', 'message': '...'})
+    queue.flush(engine.replay_events)
+
+    python tools/neo4j/learning_engine.py --flush-queue
+"""
+
+import os
+import sys
+import json
+import uuid
+import sqlite3
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+LEARNING_QUEUE_VERSION = 1
+
+# Queued events (kept with the knowledge base, like the local graph store)
+LEARNING_QUEUE_FILE = Path(__file__).parent.parent.parent / '.agent' / 'knowledge-base' / '.learning-queue.db'
+
+# LearningEngine methods an event can replay
+EVENT_KINDS = ('record_error', 'record_success', 'create_learning')
+
+# Events replayed per write transaction
+DEFAULT_FLUSH_BATCH_SIZE = 500
+
+LEARNING_ENGINE = Path(__file__).parent / 'learning_engine.py'
+
+
+def new_event(kind: str, args: Dict) -> Dict:
+    """A learning event for LearningEngine.<kind>(**args), with a new id"""
+    if kind not in EVENT_KINDS:
+        raise ValueError(f"Unknown learning event {kind!r} (expected one of {', '.join(EVENT_KINDS)})")
+    return {'id': f"EVT_{uuid.uuid4().hex}", 'kind': kind, 'args': args,
+            'queued_at': datetime.now(timezone.utc).isoformat()}
+
+
+class LearningQueue:
+    """Append-only queue of learning events in a SQLite file"""
+
+    def __init__(self, path: Path, conn: sqlite3.Connection):
+        self.path = Path(path)
+        self.conn = conn
+
+    @classmethod
+    def open(cls, path: Optional[Path] = None) -> 'LearningQueue':
+        """Open the queue at path (default LEARNING_QUEUE_PATH, else LEARNING_QUEUE_FILE)"""
+        path = Path(path or os.getenv('LEARNING_QUEUE_PATH') or LEARNING_QUEUE_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        # An appended event must survive a crash right after append() returns
+        conn.execute("PRAGMA synchronous = FULL")
+
+        if conn.execute("PRAGMA user_version").fetchone()[0] != LEARNING_QUEUE_VERSION:
+            # Only ever created here: a newer version is not dropped with its events
+            conn.executescript(f"""
+                BEGIN;
+                CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL,
+                    args TEXT NOT NULL,
+                    queued_at TEXT NOT NULL
+                );
+                PRAGMA user_version = {LEARNING_QUEUE_VERSION};
+                COMMIT;
+            """)
+        return cls(path, conn)
+
+    def close(self):
+        """Close the queue database"""
+        self.conn.close()
+
+    def append(self, kind: str, args: Dict) -> str:
+        """Queue a call of LearningEngine.<kind>(**args) and return the event id"""
+        event = new_event(kind, args)
+        self.conn.execute(
+            "INSERT INTO events (id, kind, args, queued_at) VALUES (?, ?, ?, ?)",
+            (event['id'], kind, json.dumps(args, ensure_ascii=False), event['queued_at']))
+        return event['id']
+
+    def pending(self) -> int:
+        """Number of events not replayed yet"""
+        return self.conn.execute("SELECT count(*) FROM events").fetchone()[0]
+
+    def peek(self, limit: int = DEFAULT_FLUSH_BATCH_SIZE) -> List[Dict]:
+        """Oldest queued events: {'seq', 'id', 'kind', 'args', 'queued_at'}"""
+        rows = self.conn.execute(
+            "SELECT seq, id, kind, args, queued_at FROM events ORDER BY seq LIMIT ?", (limit,))
+        return [{'seq': seq, 'id': event_id, 'kind': kind, 'args': json.loads(args),
+                 'queued_at': queued_at}
+                for seq, event_id, kind, args, queued_at in rows]
+
+    def acknowledge(self, events: List[Dict]):
+        """Remove replayed events from the queue"""
+        self.conn.executemany("DELETE FROM events WHERE seq = ?",
+                              [(event['seq'],) for event in events])
+
+    def flush(self, replay: Callable[[List[Dict]], int],
+              batch_size: int = DEFAULT_FLUSH_BATCH_SIZE) -> Dict[str, int]:
+        """Replay queued events oldest first, batch_size per replay() call
+
+        replay gets a batch of events and returns how many of them it applied
+        (events it had applied before are skipped). Events stay queued when
+        replay raises, and the exception propagates.
+        """
+        totals = {'replayed': 0, 'applied': 0, 'batches': 0}
+        while True:
+            events = self.peek(max(batch_size, 1))
+            if not events:
+                return totals
+            totals['applied'] += replay(events)
+            self.acknowledge(events)
+            totals['replayed'] += len(events)
+            totals['batches'] += 1
+
+
+def queue_event(kind: str, args: Dict, path: Optional[Path] = None) -> str:
+    """Append one event to the queue (opened and closed around it)"""
+    queue = LearningQueue.open(path)
+    try:
+        return queue.append(kind, args)
+    finally:
+        queue.close()
+
+
+def start_background_flush(cwd: Optional[Path] = None) -> bool:
+    """Start `learning_engine.py --flush-queue` without waiting for it
+
+    False if it could not be started; the events then wait for the next flush.
+    """
+    try:
+        subprocess.Popen(
+            [sys.executable, str(LEARNING_ENGINE), '--flush-queue'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=str(cwd or Path(__file__).parent.parent.parent)
+        )
+        return True
+    except OSError:
+        return False
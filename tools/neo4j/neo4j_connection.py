@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared Neo4j Connection
+
+One pooled driver per (URI, user, password) for the whole process, created lazily on
+first use and closed at interpreter exit. Tools running in the same process
+share its warm connections instead of each opening a driver (and paying the
+TLS and Bolt handshake) of their own.
+
+Pool settings come from the environment:
+    NEO4J_MAX_POOL_SIZE            connections per driver (default 50)
+    NEO4J_ACQUISITION_TIMEOUT      seconds to wait for a free connection (default 60)
+    NEO4J_CONNECTION_TIMEOUT       seconds to open a new connection (default 30)
+    NEO4J_MAX_CONNECTION_LIFETIME  seconds before a connection is recycled (default 3600)
+
+Usage:
+    from neo4j_connection import get_driver
+    driver = get_driver(uri, user, password)
+
+Async drivers are bound to an event loop, so create_async_driver() returns
+a new one (same pool settings) that the caller closes.
+
+fulltext_query() turns free text into a Lucene query for
+db.index.fulltext.queryNodes (user input is never passed to Lucene as is).
+
+The neo4j package is only needed to open a driver, so tools using the
+local graph store (GRAPH_BACKEND=sqlite, see graph_store.py) run without it.
+"""
+
+import os
+import re
+import atexit
+import hashlib
+import threading
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+try:
+    from neo4j import AsyncGraphDatabase, GraphDatabase
+except ImportError:
+    AsyncGraphDatabase = GraphDatabase = None
+
+# False when the neo4j package is missing (get_driver() then raises ImportError)
+NEO4J_DRIVER_AVAILABLE = GraphDatabase is not None
+
+
+POOL_SETTINGS = {
+    # driver config key: (environment variable, type, default)
+    'max_connection_pool_size': ('NEO4J_MAX_POOL_SIZE', int, 50),
+    'connection_acquisition_timeout': ('NEO4J_ACQUISITION_TIMEOUT', float, 60.0),
+    'connection_timeout': ('NEO4J_CONNECTION_TIMEOUT', float, 30.0),
+    'max_connection_lifetime': ('NEO4J_MAX_CONNECTION_LIFETIME', float, 3600.0),
+}
+
+# (uri, user, password fingerprint) -> driver
+_drivers: Dict[Tuple[str, str, str], object] = {}
+_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def pool_settings() -> Dict:
+    """Driver pool configuration from the environment (invalid values fall back to defaults)"""
+    settings = {}
+    for key, (env_var, cast, default) in POOL_SETTINGS.items():
+        try:
+            value = cast(os.environ[env_var])
+        except (KeyError, ValueError):
+            value = default
+        settings[key] = value if value > 0 else default
+    return settings
+
+
+def _credentials(uri: Optional[str], user: Optional[str],
+                 password: Optional[str]) -> Tuple[str, str, str]:
+    if GraphDatabase is None:
+        raise ImportError("neo4j package not installed (pip install neo4j, or set GRAPH_BACKEND=sqlite)")
+    uri = uri or os.getenv('NEO4J_URI')
+    user = user or os.getenv('NEO4J_USERNAME')
+    password = password or os.getenv('NEO4J_PASSWORD')
+    if not (uri and user and password):
+        raise ValueError("Neo4j credentials missing (NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)")
+    return uri, user, password
+
+
+def _fingerprint(password: str) -> str:
+    """Digest of a password, so the driver cache never holds the password itself"""
+    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+
+def get_driver(uri: Optional[str] = None, user: Optional[str] = None,
+               password: Optional[str] = None):
+    """Shared driver for uri, user and password, created on first use
+
+    Arguments default to NEO4J_URI, NEO4J_USERNAME and NEO4J_PASSWORD.
+    A changed (rotated) password gets a driver of its own instead of the
+    one built with the old credentials. Callers must not close the
+    returned driver; close_driver() and close_all() do that for everyone.
+    """
+    global _pid
+    uri, user, password = _credentials(uri, user, password)
+    key = (uri, user, _fingerprint(password))
+    with _lock:
+        if _pid != os.getpid():
+            # Forked child: the parent's sockets are not ours to use or close
+            _drivers.clear()
+            _pid = os.getpid()
+
+        driver = _drivers.get(key)
+        if driver is None:
+            driver = GraphDatabase.driver(uri, auth=(user, password), **pool_settings())
+            _drivers[key] = driver
+        return driver
+
+
+def create_async_driver(uri: Optional[str] = None, user: Optional[str] = None,
+                        password: Optional[str] = None):
+    """New async driver with the shared pool settings (close it with `await driver.close()`)"""
+    uri, user, password = _credentials(uri, user, password)
+    return AsyncGraphDatabase.driver(uri, auth=(user, password), **pool_settings())
+
+
+def close_driver(uri: Optional[str] = None, user: Optional[str] = None):
+    """Close the shared drivers for uri and user (the next get_driver() opens a new one)"""
+    uri, user = uri or os.getenv('NEO4J_URI'), user or os.getenv('NEO4J_USERNAME')
+    with _lock:
+        drivers = [_drivers.pop(key) for key in list(_drivers) if key[:2] == (uri, user)]
+    for driver in drivers:
+        driver.close()
+
+
+def close_all():
+    """Close every shared driver"""
+    with _lock:
+        drivers = list(_drivers.values()) if _pid == os.getpid() else []
+        _drivers.clear()
+    for driver in drivers:
+        try:
+            driver.close()
+        except Exception:
+            pass
+
+
+def fulltext_query(terms: Union[str, Iterable[str]], prefix: bool = True,
+                   require_all: bool = False) -> str:
+    """Lucene query matching the words of terms (free text or a list of keywords)
+
+    Words are reduced to letters, digits and underscores, so Lucene syntax
+    in user input (quotes, colons, slashes, brackets) cannot break the query.
+    prefix matches word* ("auth" finds "authentication"); require_all
+    needs every word to match instead of any. Empty if there are no words.
+    """
+    if isinstance(terms, str):
+        terms = [terms]
+    # Lower case, so AND, OR and NOT are searched for rather than read as operators
+    words = [word.lower() for term in terms for word in re.findall(r'\w+', term)]
+    suffix = '*' if prefix else ''
+    required = '+' if require_all else ''
+    return ' '.join(f"{required}{word}{suffix}" for word in dict.fromkeys(words))
+
+
+atexit.register(close_all)
@@ -10,26 +10,40 @@ Usage:
     python bin/query_skills_neo4j.py --tech "Neo4j"
     python bin/query_skills_neo4j.py --skill "User Research"
     python bin/query_skills_neo4j.py --learning-path "UI/UX Design"
+
+Without Neo4j credentials (or with GRAPH_BACKEND=sqlite) the local graph
+store written by sync_skills_to_neo4j.py is queried instead.
 """
 
 import os
+import re
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 import argparse
 from typing import List, Dict
 
+# Pooled driver shared by every Neo4j tool in the process
+sys.path.insert(0, str(Path(__file__).parent))
+from neo4j_connection import fulltext_query, get_driver
+from graph_store import GraphStore, graph_backend, open_graph_store
+
 load_dotenv()
 
+# Fulltext hits scoring below this are too weak to report
+MIN_SEARCH_SCORE = 0.5
+
 
 class Neo4jSkillQuery:
     """Query skills from Neo4j knowledge graph"""
     
     def __init__(self, uri: str, user: str, password: str, database: str = "neo4j"):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.driver = get_driver(uri, user, password)
         self.database = database
     
     def close(self):
-        self.driver.close()
+        # The pool is shared with other in-process callers and closed at exit
+        self.driver = None
     
     def get_all_skills(self) -> List[Dict]:
         """Get all skills in the knowledge base"""
@@ -104,8 +118,42 @@ class Neo4jSkillQuery:
             return [dict(record) for record in result]
     
     def search_skills(self, query: str) -> List[Dict]:
-        """Search skills by keyword"""
+        """Search skills by keyword
+
+        Skills whose name matches every word of the query (as a prefix), or
+        that are taught by a matching KB entry, best matches first. Uses the
+        skill_search and kb_entry_search fulltext indexes created by
+        sync_skills_to_neo4j.py; without them skill names and entry titles
+        are scanned for the query instead.
+        """
+        search = fulltext_query(query, require_all=True)
         with self.driver.session(database=self.database) as session:
+            if search:
+                try:
+                    result = session.run("""
+                        CALL {
+                            CALL db.index.fulltext.queryNodes('skill_search', $search)
+                            YIELD node AS s, score
+                            WHERE score >= $min_score
+                            MATCH (s)<-[:TEACHES]-(k:KBEntry)
+                            RETURN s, k, score
+                          UNION ALL
+                            CALL db.index.fulltext.queryNodes('kb_entry_search', $search)
+                            YIELD node AS k, score
+                            WHERE score >= $min_score
+                            MATCH (s:Skill)<-[:TEACHES]-(k)
+                            RETURN s, k, score
+                        }
+                        WITH s, collect(DISTINCT k.title) as kb_entries, max(score) as score
+                        RETURN s.name as skill,
+                               s.level as level,
+                               kb_entries
+                        ORDER BY score DESC, skill
+                    """, search=search, min_score=MIN_SEARCH_SCORE)
+                    return [dict(record) for record in result]
+                except Exception:
+                    pass  # Fulltext indexes missing: scan names and titles below
+            
             result = session.run("""
                 MATCH (s:Skill)<-[:TEACHES]-(k:KBEntry)
                 WHERE toLower(s.name) CONTAINS toLower($query)
@@ -130,6 +178,118 @@ class Neo4jSkillQuery:
             return [dict(record) for record in result]
 
 
+class LocalSkillQuery(Neo4jSkillQuery):
+    """Query skills from a local graph store (GRAPH_BACKEND=sqlite)"""
+    
+    def __init__(self, store: GraphStore):
+        self.store = store
+        self.driver = None
+        self.database = None
+    
+    def close(self):
+        self.store.close()
+    
+    def _teaching(self, skill_name: str) -> List[Dict]:
+        """KB entries teaching a skill"""
+        return [entry for _, entry in
+                self.store.neighbors(('Skill', skill_name), 'TEACHES', direction='in', label='KBEntry')]
+    
+    def _taught(self, entry: Dict) -> List[Dict]:
+        """Skills a KB entry teaches"""
+        return [skill for _, skill in self.store.neighbors(('KBEntry', entry['id']), 'TEACHES')]
+    
+    def get_all_skills(self) -> List[Dict]:
+        """Get all skills in the knowledge base"""
+        skills = []
+        for skill in self.store.nodes('Skill'):
+            entries = self._teaching(skill['name'])
+            if entries:
+                skills.append({'skill': skill['name'], 'level': skill.get('level'),
+                               'kb_count': len(entries), 'kb_entries': [k.get('title') for k in entries]})
+        skills.sort(key=lambda s: (-s['kb_count'], s['skill']))
+        return skills
+    
+    def get_skills_by_technology(self, tech: str) -> List[Dict]:
+        """Get skills related to a specific technology"""
+        skills = [{'skill': skill['name'], 'level': skill.get('level'), 'kb_entry': entry.get('title')}
+                  for _, entry in self.store.neighbors(('Technology', tech), 'USES_TECHNOLOGY',
+                                                       direction='in', label='KBEntry')
+                  for skill in self._taught(entry)]
+        skills.sort(key=lambda s: s['skill'])
+        return skills
+    
+    def get_related_skills(self, skill_name: str) -> List[Dict]:
+        """Get skills related to a specific skill"""
+        related = [{'related_skill': skill['name'], 'strength': rel.get('strength')}
+                   for rel, skill in self.store.neighbors(('Skill', skill_name), 'RELATED_TO',
+                                                          direction='both', label='Skill')]
+        related.sort(key=lambda s: s['strength'] or 0, reverse=True)
+        return related[:10]
+    
+    def get_learning_path(self, category: str) -> List[Dict]:
+        """Get learning path for a category"""
+        path = []
+        for _, entry in self.store.neighbors(('Category', category), 'BELONGS_TO',
+                                             direction='in', label='KBEntry'):
+            skills = [skill['name'] for skill in self._taught(entry)]
+            if skills:
+                path.append({'kb_entry': entry.get('title'), 'date': entry.get('date'), 'skills': skills})
+        path.sort(key=lambda p: p['date'] or '')
+        return path
+    
+    def get_technologies(self) -> List[Dict]:
+        """Get all technologies and their usage count"""
+        techs = []
+        for tech in self.store.nodes('Technology'):
+            count = len(self.store.neighbors(('Technology', tech['name']), 'USES_TECHNOLOGY',
+                                             direction='in', label='KBEntry'))
+            if count:
+                techs.append({'technology': tech['name'], 'kb_count': count})
+        techs.sort(key=lambda t: (-t['kb_count'], t['technology']))
+        return techs
+    
+    def get_skill_prerequisites(self, skill_name: str) -> List[Dict]:
+        """Get prerequisite skills for a given skill"""
+        prerequisites = {skill['name']: {'prerequisite': skill['name'], 'level': skill.get('level')}
+                         for entry in self._teaching(skill_name) for skill in self._taught(entry)
+                         if skill['name'] != skill_name and skill.get('level') == 'beginner'}
+        return [prerequisites[name] for name in sorted(prerequisites)]
+    
+    def search_skills(self, query: str) -> List[Dict]:
+        """Search skills by keyword
+
+        Skills whose name contains every word of the query, or that are
+        taught by an entry whose title or preview does, most words first.
+        """
+        words = re.findall(r'\w+', query.lower())
+        found = {}
+        for skill, matched in self.store.search('Skill', ('name',), words):
+            if len(matched) == len(set(words)):
+                found[skill['name']] = skill
+        for entry, matched in self.store.search('KBEntry', ('title', 'content_preview'), words):
+            if len(matched) == len(set(words)):
+                for skill in self._taught(entry):
+                    found.setdefault(skill['name'], skill)
+        
+        skills = []
+        for name, skill in sorted(found.items()):
+            entries = self._teaching(name)
+            if entries:
+                skills.append({'skill': name, 'level': skill.get('level'),
+                               'kb_entries': list(dict.fromkeys(k.get('title') for k in entries))})
+        return skills
+    
+    def get_author_expertise(self, author: str) -> List[Dict]:
+        """Get skills by author"""
+        expertise = []
+        for _, entry in self.store.neighbors(('Person', author), 'CREATED', label='KBEntry'):
+            skills = [skill['name'] for skill in self._taught(entry)]
+            if skills:
+                expertise.append({'kb_entry': entry.get('title'), 'skills': skills, 'date': entry.get('date')})
+        expertise.sort(key=lambda e: e['date'] or '', reverse=True)
+        return expertise
+
+
 def print_skills(skills: List[Dict], title: str):
     """Pretty print skills"""
     print(f"\n{'='*60}")
@@ -156,17 +316,26 @@ def main():
     parser.add_argument('--prerequisites', type=str, help='Prerequisites for a skill')
     args = parser.parse_args()
     
-    # Get credentials
-    uri = os.getenv('NEO4J_URI')
-    username = os.getenv('NEO4J_USERNAME')
-    password = os.getenv('NEO4J_PASSWORD')
-    database = os.getenv('NEO4J_DATABASE', 'neo4j')
-    
-    if not all([uri, username, password]):
-        print("❌ Error: Neo4j credentials not found in .env file")
+    try:
+        backend = graph_backend()
+    except ValueError as e:
+        print(f"❌ Error: {e}")
         return
     
-    query = Neo4jSkillQuery(uri, username, password, database)
+    if backend == 'sqlite':
+        query = LocalSkillQuery(open_graph_store())
+    else:
+        # Get credentials
+        uri = os.getenv('NEO4J_URI')
+        username = os.getenv('NEO4J_USERNAME')
+        password = os.getenv('NEO4J_PASSWORD')
+        database = os.getenv('NEO4J_DATABASE', 'neo4j')
+        
+        if not all([uri, username, password]):
+            print("❌ Error: Neo4j credentials not found in .env file")
+            return
+        
+        query = Neo4jSkillQuery(uri, username, password, database)
     
     try:
         if args.all_skills:
@@ -10,17 +10,29 @@ Usage:
     python bin/sync_skills_to_neo4j.py
     python bin/sync_skills_to_neo4j.py --kb-path .agent/knowledge-base
     python bin/sync_skills_to_neo4j.py --dry-run
+    python bin/sync_skills_to_neo4j.py --files docs/guide.md .agent/knowledge-base/bugs/KB-x.md
+    python bin/sync_skills_to_neo4j.py --full
+    python bin/sync_skills_to_neo4j.py --relationships-only
+    GRAPH_BACKEND=sqlite python bin/sync_skills_to_neo4j.py
+
+Without Neo4j credentials (or with GRAPH_BACKEND=sqlite) the graph is
+kept in a local SQLite file instead (see graph_store.py).
+
+Only files that changed since the last sync are sent; entries whose file
+is gone are deleted. The sync state is kept in <kb-path>/.neo4j-sync-skills.json.
 """
 
 import os
 import re
 import json
 import sys
+import time
+from collections import defaultdict
+from itertools import chain
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 import argparse
 
 # Set UTF-8 encoding for Windows console
@@ -31,25 +43,43 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Shared corpus loader lives with the KB CLI
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+from kb_corpus import get_corpus
+from kb_sync_state import SyncState, content_hash
+
+# Pooled driver shared by every Neo4j tool in the process
+sys.path.insert(0, str(Path(__file__).parent))
+from neo4j_connection import get_driver
+from graph_store import GraphStore, graph_backend, open_graph_store, timestamp
+
 # Load environment variables
 load_dotenv()
 
+# KB entries per UNWIND transaction
+DEFAULT_BATCH_SIZE = 500
+
+# KBEntry node properties written by sync
+ENTRY_FIELDS = ('id', 'title', 'date', 'category', 'author', 'file_path', 'content_length',
+                'content_preview', 'content_hash')
+
+# What was last synced, inside --kb-path
+SYNC_STATE_FILENAME = '.neo4j-sync-skills.json'
+
 
 class Neo4jSkillSync:
     """Sync knowledge base skills to Neo4j Cloud"""
     
     def __init__(self, uri: str, user: str, password: str, database: str = "neo4j"):
         """Initialize Neo4j connection"""
-        self.driver = GraphDatabase.driver(
-            uri,
-            auth=(user, password)
-        )
+        self.driver = get_driver(uri, user, password)
         self.database = database
         print(f"✅ Connected to Neo4j Cloud: {uri}")
     
     def close(self):
-        """Close Neo4j connection"""
-        self.driver.close()
+        """Release Neo4j connection"""
+        # The pool is shared with other in-process callers and closed at exit
+        self.driver = None
         print("✅ Neo4j connection closed")
     
     def create_constraints(self):
@@ -77,6 +107,9 @@ class Neo4jSkillSync:
             "CREATE INDEX skill_name IF NOT EXISTS FOR (s:Skill) ON (s.name)",
             "CREATE INDEX kb_entry_title IF NOT EXISTS FOR (k:KBEntry) ON (k.title)",
             "CREATE INDEX technology_name IF NOT EXISTS FOR (t:Technology) ON (t.name)",
+            # Keyword search (search_skills, recommendations, research agent)
+            "CREATE FULLTEXT INDEX skill_search IF NOT EXISTS FOR (s:Skill) ON EACH [s.name]",
+            "CREATE FULLTEXT INDEX kb_entry_search IF NOT EXISTS FOR (k:KBEntry) ON EACH [k.title, k.content_preview]",
         ]
         
         with self.driver.session(database=self.database) as session:
@@ -88,10 +121,11 @@ class Neo4jSkillSync:
                     if "already exists" not in str(e).lower():
                         print(f"⚠️  Index warning: {e}")
     
-    def parse_kb_entry(self, file_path: Path) -> Optional[Dict]:
-        """Parse knowledge base markdown file"""
+    def parse_kb_entry(self, file_path: Path, content: Optional[str] = None) -> Optional[Dict]:
+        """Parse knowledge base markdown file (content is read if not given)"""
         try:
-            content = file_path.read_text(encoding='utf-8')
+            if content is None:
+                content = file_path.read_text(encoding='utf-8')
             
             # Extract metadata
             entry_id = file_path.stem
@@ -126,6 +160,10 @@ class Neo4jSkillSync:
             technologies = self._extract_technologies(content)
             skills = self._extract_skills(content, title)
             
+            # Content preview (first 500 chars without frontmatter)
+            content_clean = re.sub(r'^---.*?---\s*', '', content, flags=re.DOTALL)
+            content_preview = content_clean[:500].replace('\n', ' ')
+            
             return {
                 'id': entry_id,
                 'title': title,
@@ -136,7 +174,9 @@ class Neo4jSkillSync:
                 'technologies': technologies,
                 'skills': skills,
                 'file_path': str(file_path),
-                'content_length': len(content)
+                'content_length': len(content),
+                'content_preview': content_preview,
+                'content_hash': content_hash(content)
             }
         except Exception as e:
             print(f"❌ Error parsing {file_path}: {e}")
@@ -202,64 +242,130 @@ class Neo4jSkillSync:
             print(f"   - Skills: {len(entry['skills'])} skills")
             return
         
-        with self.driver.session(database=self.database) as session:
-            # Create KB Entry node
-            session.run("""
-                MERGE (k:KBEntry {id: $id})
-                SET k.title = $title,
-                    k.date = date($date),
-                    k.category = $category,
-                    k.author = $author,
-                    k.file_path = $file_path,
-                    k.content_length = $content_length,
-                    k.updated_at = datetime()
-            """, **entry)
-            
-            # Create Category node and relationship
-            session.run("""
-                MATCH (k:KBEntry {id: $id})
-                MERGE (c:Category {name: $category})
-                MERGE (k)-[:BELONGS_TO]->(c)
-            """, id=entry['id'], category=entry['category'])
-            
-            # Create Person node and relationship
-            session.run("""
-                MATCH (k:KBEntry {id: $id})
-                MERGE (p:Person {name: $author})
-                MERGE (p)-[:CREATED]->(k)
-            """, id=entry['id'], author=entry['author'])
-            
-            # Create Technology nodes and relationships
-            for tech in entry['technologies']:
-                session.run("""
-                    MATCH (k:KBEntry {id: $id})
-                    MERGE (t:Technology {name: $tech})
-                    MERGE (k)-[:USES_TECHNOLOGY]->(t)
-                """, id=entry['id'], tech=tech)
-            
-            # Create Skill nodes and relationships
-            for skill in entry['skills']:
-                session.run("""
-                    MATCH (k:KBEntry {id: $kb_id})
-                    MERGE (s:Skill {name: $skill_name})
-                    SET s.level = $level,
-                        s.source = $source
-                    MERGE (k)-[:TEACHES]->(s)
-                """, 
-                    kb_id=entry['id'],
-                    skill_name=skill['name'],
-                    level=skill['level'],
-                    source=skill['source']
-                )
-            
-            # Create Tag relationships
-            for tag in entry['tags']:
-                session.run("""
-                    MATCH (k:KBEntry {id: $id})
-                    MERGE (k)-[:TAGGED_WITH {tag: $tag}]->(k)
-                """, id=entry['id'], tag=tag)
+        self.write_batch([entry])
+        print(f"✅ Synced: {entry['title']}")
+    
+    def sync_kb_entries(self, entries: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE,
+                        dry_run: bool = False, state: Optional[SyncState] = None) -> int:
+        """Sync KB entries in batches of batch_size (one write transaction each)
+
+        Written entries are recorded in state, batch by batch.
+        """
+        synced_count = 0
+        batch = []
+        
+        for entry in entries:
+            if dry_run:
+                self.sync_kb_entry(entry, dry_run=True)
+                synced_count += 1
+                continue
             
-            print(f"✅ Synced: {entry['title']}")
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                self._flush(batch, state)
+                synced_count += len(batch)
+                print(f"✅ Synced {synced_count} entries")
+                batch = []
+        
+        if batch:
+            self._flush(batch, state)
+            synced_count += len(batch)
+            print(f"✅ Synced {synced_count} entries")
+        
+        return synced_count
+    
+    def _flush(self, batch: List[Dict], state: Optional[SyncState]):
+        """Write a batch, then record it as synced"""
+        self.write_batch(batch)
+        if state is not None:
+            for entry in batch:
+                state.record(entry['file_path'], entry['id'], entry['content_hash'])
+    
+    def write_batch(self, entries: List[Dict]):
+        """Write KB entries with a few UNWIND statements in one transaction"""
+        with self.driver.session(database=self.database) as session:
+            # execute_write retries the whole batch on transient errors
+            session.execute_write(self._write_batch_tx, entries)
+    
+    @staticmethod
+    def _write_batch_tx(tx, entries: List[Dict]):
+        """Transaction function for write_batch (every statement is a MERGE, so retries are safe)"""
+        # KB Entry nodes with their Category and Person
+        tx.run("""
+            UNWIND $rows AS row
+            MERGE (k:KBEntry {id: row.id})
+            SET k.title = row.title,
+                k.date = date(row.date),
+                k.category = row.category,
+                k.author = row.author,
+                k.file_path = row.file_path,
+                k.content_length = row.content_length,
+                k.content_preview = row.content_preview,
+                k.content_hash = row.content_hash,
+                k.updated_at = datetime()
+            MERGE (c:Category {name: row.category})
+            MERGE (k)-[:BELONGS_TO]->(c)
+            MERGE (p:Person {name: row.author})
+            MERGE (p)-[:CREATED]->(k)
+        """, rows=[{field: entry[field] for field in ENTRY_FIELDS} for entry in entries])
+        
+        # A changed entry may no longer mention some technologies, skills or tags
+        tx.run("""
+            UNWIND $ids AS id
+            MATCH (k:KBEntry {id: id})-[r:USES_TECHNOLOGY|TEACHES|TAGGED_WITH]->()
+            DELETE r
+        """, ids=[entry['id'] for entry in entries])
+        
+        # Technology nodes and relationships
+        technologies = [
+            {'id': entry['id'], 'tech': tech}
+            for entry in entries for tech in entry['technologies']
+        ]
+        if technologies:
+            tx.run("""
+                UNWIND $rows AS row
+                MATCH (k:KBEntry {id: row.id})
+                MERGE (t:Technology {name: row.tech})
+                MERGE (k)-[:USES_TECHNOLOGY]->(t)
+            """, rows=technologies)
+        
+        # Skill nodes and relationships
+        skills = [
+            {'kb_id': entry['id'], 'name': skill['name'], 'level': skill['level'], 'source': skill['source']}
+            for entry in entries for skill in entry['skills']
+        ]
+        if skills:
+            tx.run("""
+                UNWIND $rows AS row
+                MATCH (k:KBEntry {id: row.kb_id})
+                MERGE (s:Skill {name: row.name})
+                SET s.level = row.level,
+                    s.source = row.source
+                MERGE (k)-[:TEACHES]->(s)
+            """, rows=skills)
+        
+        # Tag relationships
+        tags = [{'id': entry['id'], 'tag': tag} for entry in entries for tag in entry['tags']]
+        if tags:
+            tx.run("""
+                UNWIND $rows AS row
+                MATCH (k:KBEntry {id: row.id})
+                MERGE (k)-[:TAGGED_WITH {tag: row.tag}]->(k)
+            """, rows=tags)
+    
+    def delete_entries(self, entry_ids: List[str]):
+        """Delete KB entries in one transaction"""
+        with self.driver.session(database=self.database) as session:
+            session.execute_write(self._delete_entries_tx, entry_ids)
+    
+    @staticmethod
+    def _delete_entries_tx(tx, entry_ids: List[str]):
+        """Transaction function for delete_entries"""
+        tx.run("""
+            UNWIND $ids AS id
+            MATCH (k:KBEntry {id: id})
+            DETACH DELETE k
+        """, ids=entry_ids)
     
     def create_skill_relationships(self):
         """Create relationships between related skills"""
@@ -305,6 +411,202 @@ class Neo4jSkillSync:
             }
 
 
+class LocalSkillSync(Neo4jSkillSync):
+    """Sync knowledge base skills to a local graph store (GRAPH_BACKEND=sqlite)
+
+    Tags are kept as a list on the KB entry instead of TAGGED_WITH self-loops.
+    """
+    
+    def __init__(self, store: GraphStore):
+        """Use a local graph store (closed with the sync)"""
+        self.store = store
+        self.driver = None
+        self.database = None
+        print(f"✅ Using local graph store: {store.target}")
+    
+    def close(self):
+        """Close the local store"""
+        self.store.close()
+        print("✅ Local graph store closed")
+    
+    def create_constraints(self):
+        """Nothing to set up: nodes are unique on their id or name"""
+    
+    def create_indexes(self):
+        """Nothing to set up: the local store keeps its own indexes"""
+    
+    def write_batch(self, entries: List[Dict]):
+        """Write KB entries in one transaction"""
+        now = timestamp()
+        with self.store.transaction():
+            for entry in entries:
+                ref = ('KBEntry', entry['id'])
+                self.store.merge_node('KBEntry', entry['id'], dict(
+                    {field: entry[field] for field in ENTRY_FIELDS},
+                    tags=sorted(entry['tags']), updated_at=now
+                ))
+                self.store.merge_node('Category', entry['category'], {'name': entry['category']})
+                self.store.merge_edge(ref, 'BELONGS_TO', ('Category', entry['category']))
+                self.store.merge_node('Person', entry['author'], {'name': entry['author']})
+                self.store.merge_edge(('Person', entry['author']), 'CREATED', ref)
+                
+                # A changed entry may no longer mention some technologies or skills
+                self.store.delete_edges(ref, ['USES_TECHNOLOGY', 'TEACHES'])
+                for tech in entry['technologies']:
+                    self.store.merge_node('Technology', tech, {'name': tech})
+                    self.store.merge_edge(ref, 'USES_TECHNOLOGY', ('Technology', tech))
+                for skill in entry['skills']:
+                    self.store.merge_node('Skill', skill['name'], {
+                        'name': skill['name'], 'level': skill['level'], 'source': skill['source']
+                    })
+                    self.store.merge_edge(ref, 'TEACHES', ('Skill', skill['name']))
+    
+    def delete_entries(self, entry_ids: List[str]):
+        """Delete KB entries in one transaction"""
+        self.store.delete_nodes('KBEntry', entry_ids)
+    
+    def create_skill_relationships(self):
+        """Relate skills taught by the same entries and technologies to their skills
+
+        Strengths are recomputed from scratch: the number of entries the two share.
+        """
+        related = defaultdict(int)
+        requires = defaultdict(int)
+        for entry in self.store.nodes('KBEntry'):
+            ref = ('KBEntry', entry['id'])
+            skills = [skill['name'] for _, skill in self.store.neighbors(ref, 'TEACHES')]
+            for first in skills:
+                for second in skills:
+                    if first < second:
+                        related[(first, second)] += 1
+            for _, tech in self.store.neighbors(ref, 'USES_TECHNOLOGY'):
+                for skill in skills:
+                    requires[(tech['name'], skill)] += 1
+        
+        with self.store.transaction():
+            for skill in self.store.nodes('Skill'):
+                self.store.delete_edges(('Skill', skill['name']), ['RELATED_TO'])
+            for tech in self.store.nodes('Technology'):
+                self.store.delete_edges(('Technology', tech['name']), ['REQUIRES_SKILL'])
+            for (first, second), strength in related.items():
+                self.store.merge_edge(('Skill', first), 'RELATED_TO', ('Skill', second), {'strength': strength})
+            for (tech, skill), strength in requires.items():
+                self.store.merge_edge(('Technology', tech), 'REQUIRES_SKILL', ('Skill', skill),
+                                      {'strength': strength})
+        
+        print("✅ Created skill relationships")
+    
+    def get_stats(self) -> Dict:
+        """Get knowledge graph statistics"""
+        return {
+            'kb_entries': self.store.count('KBEntry'),
+            'skills': self.store.count('Skill'),
+            'technologies': self.store.count('Technology'),
+            'categories': self.store.count('Category')
+        }
+
+
+def sync_knowledge_base(sync: Neo4jSkillSync, target: str, kb_path: Path, docs_path: Path,
+                        files: Optional[List[str]] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                        full: bool = False, dry_run: bool = False) -> Optional[Dict]:
+    """Send new and changed entries and delete those whose file is gone
+
+    Returns {'synced': count, 'removed': [(path, id)]}, or None if the graph
+    was already up to date. target (URI/database) scopes the sync state.
+    """
+    # Find all KB markdown files from both locations
+    corpus = get_corpus()
+    kb_files = []
+    kb_count = 0
+    docs_count = 0
+    
+    if files:
+        # Only the given files (e.g. queued by the learner's watch mode)
+        for file_path in files:
+            if Path(file_path).is_file():
+                kb_files.append(corpus.entry(Path(file_path)))
+            else:
+                print(f"⏭️  File is gone: {file_path}")
+        
+        print(f"\n📚 Syncing {len(kb_files)} changed entries")
+    else:
+        # Get KB-*.md files from knowledge base
+        kb_entries = corpus.files(kb_path, 'KB-*.md')
+        kb_files.extend(kb_entries)
+        kb_count = len(kb_entries)
+        
+        # Get all markdown files from docs/ (excluding sprints)
+        for corpus_entry in corpus.files(docs_path):
+            # Skip sprint artifacts
+            if 'sprints' in str(corpus_entry.path):
+                continue
+            kb_files.append(corpus_entry)
+            docs_count += 1
+        
+        print(f"\n📚 Found {len(kb_files)} knowledge base entries")
+        print(f"   - From {kb_path}: {kb_count} entries")
+        print(f"   - From {docs_path}: {docs_count} entries")
+    
+    # Only new or changed files are parsed and sent (--full resends all)
+    state = SyncState.load(kb_path / SYNC_STATE_FILENAME, target)
+    changed_files = [kb_file for kb_file in kb_files if full or not state.is_current(kb_file.path)]
+    
+    def parsed_entries():
+        for kb_file in changed_files:
+            if not kb_file.load():
+                print(f"❌ Error parsing {kb_file.path}: {kb_file.error}")
+                continue
+            entry = sync.parse_kb_entry(kb_file.path, kb_file.content)
+            if entry and (full or not state.is_synced(kb_file.path, entry['content_hash'])):
+                yield entry
+    
+    entries = parsed_entries()
+    first_entry = next(entries, None)
+    removed = state.missing([Path(f) for f in files] if files else None)
+    
+    if first_entry is None and not removed:
+        if state.dirty and not dry_run:
+            state.save()
+        print("\n✅ Already up to date, nothing to sync")
+        return None
+    
+    print(f"   {len(kb_files) - len(changed_files)} unchanged since the last sync")
+    
+    # Create constraints and indexes
+    if not dry_run:
+        print("\n🔧 Setting up database schema...")
+        sync.create_constraints()
+        sync.create_indexes()
+    
+    # Parse and sync in batches (parsing streams into the writer)
+    start = time.perf_counter()
+    try:
+        synced_count = sync.sync_kb_entries(
+            chain([first_entry], entries) if first_entry else [],
+            batch_size=batch_size,
+            dry_run=dry_run,
+            state=None if dry_run else state
+        )
+        
+        # Delete entries whose file is gone
+        if removed and dry_run:
+            print(f"🗑️  [DRY RUN] Would delete {len(removed)} entries whose files are gone")
+        elif removed:
+            sync.delete_entries([entry_id for _, entry_id in removed])
+            state.forget(key for key, _ in removed)
+            print(f"🗑️  Deleted {len(removed)} entries whose files are gone")
+    finally:
+        if state.dirty and not dry_run:
+            state.save()
+    
+    elapsed = time.perf_counter() - start
+    if not dry_run and synced_count:
+        print(f"⏱️  {synced_count} entries in {elapsed:.1f}s "
+              f"({synced_count / max(elapsed, 1e-6):.0f} entries/s)")
+    
+    return {'synced': synced_count, 'removed': removed}
+
+
 def main():
     """Main execution function"""
     parser = argparse.ArgumentParser(description='Sync Knowledge Base to Neo4j')
@@ -312,21 +614,38 @@ def main():
     parser.add_argument('--docs-path', default='docs', help='Path to docs directory')
     parser.add_argument('--dry-run', action='store_true', help='Dry run without syncing')
     parser.add_argument('--stats-only', action='store_true', help='Show stats only')
+    parser.add_argument('--files', nargs='+', help='Sync only these markdown files')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Entries per write transaction (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--full', action='store_true', help='Resync unchanged entries too')
+    parser.add_argument('--relationships-only', action='store_true',
+                        help='Only (re)create skill relationships')
     args = parser.parse_args()
     
-    # Get Neo4j credentials from environment
-    uri = os.getenv('NEO4J_URI')
-    username = os.getenv('NEO4J_USERNAME')
-    password = os.getenv('NEO4J_PASSWORD')
-    database = os.getenv('NEO4J_DATABASE', 'neo4j')
-    
-    if not all([uri, username, password]):
-        print("❌ Error: Neo4j credentials not found in .env file")
-        print("   Required: NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD")
-        return
+    try:
+        backend = graph_backend()
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
     
-    # Initialize Neo4j sync
-    sync = Neo4jSkillSync(uri, username, password, database)
+    if backend == 'sqlite':
+        sync = LocalSkillSync(open_graph_store())
+        target = sync.store.target
+    else:
+        # Get Neo4j credentials from environment
+        uri = os.getenv('NEO4J_URI')
+        username = os.getenv('NEO4J_USERNAME')
+        password = os.getenv('NEO4J_PASSWORD')
+        database = os.getenv('NEO4J_DATABASE', 'neo4j')
+        
+        if not all([uri, username, password]):
+            print("❌ Error: Neo4j credentials not found in .env file")
+            print("   Required: NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD")
+            return 1
+        
+        # Initialize Neo4j sync
+        sync = Neo4jSkillSync(uri, username, password, database)
+        target = f"{uri}/{database}"
     
     try:
         # Show stats if requested
@@ -339,48 +658,21 @@ def main():
             print(f"   Categories: {stats['categories']}")
             return
         
-        # Create constraints and indexes
-        if not args.dry_run:
-            print("\n🔧 Setting up database schema...")
-            sync.create_constraints()
-            sync.create_indexes()
-        
-        # Find all KB markdown files from both locations
-        kb_path = Path(args.kb_path)
-        docs_path = Path(args.docs_path)
-        
-        kb_files = []
-        kb_count = 0
-        docs_count = 0
-        
-        # Get KB-*.md files from knowledge base
-        kb_entries = list(kb_path.rglob('KB-*.md'))
-        kb_files.extend(kb_entries)
-        kb_count = len(kb_entries)
-        
-        # Get all markdown files from docs/ (excluding sprints)
-        if docs_path.exists():
-            for md_file in docs_path.rglob('*.md'):
-                # Skip sprint artifacts
-                if 'sprints' in str(md_file):
-                    continue
-                kb_files.append(md_file)
-                docs_count += 1
-        
-        print(f"\n📚 Found {len(kb_files)} knowledge base entries")
-        print(f"   - From {kb_path}: {kb_count} entries")
-        print(f"   - From {docs_path}: {docs_count} entries")
+        if args.relationships_only:
+            print("\n🔗 Creating skill relationships...")
+            sync.create_skill_relationships()
+            return 0
         
-        # Parse and sync each entry
-        synced_count = 0
-        for kb_file in kb_files:
-            entry = sync.parse_kb_entry(kb_file)
-            if entry:
-                sync.sync_kb_entry(entry, dry_run=args.dry_run)
-                synced_count += 1
+        result = sync_knowledge_base(
+            sync, target, Path(args.kb_path), Path(args.docs_path), files=args.files,
+            batch_size=max(1, args.batch_size), full=args.full, dry_run=args.dry_run
+        )
+        if result is None:
+            return 0
+        synced_count, removed = result['synced'], result['removed']
         
         # Create relationships
-        if not args.dry_run and synced_count > 0:
+        if not args.dry_run and (synced_count > 0 or removed):
             print("\n🔗 Creating skill relationships...")
             sync.create_skill_relationships()
         
@@ -399,9 +691,10 @@ def main():
         print(f"\n❌ Error: {e}")
         import traceback
         traceback.print_exc()
+        return 1
     finally:
         sync.close()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -19,12 +19,10 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
 
-# Neo4j
-try:
-    from neo4j import GraphDatabase
-    NEO4J_AVAILABLE = True
-except ImportError:
-    NEO4J_AVAILABLE = False
+# Neo4j (pooled driver shared by every Neo4j tool in the process)
+sys.path.insert(0, str(Path(__file__).parent.parent / 'neo4j'))
+from neo4j_connection import NEO4J_DRIVER_AVAILABLE as NEO4J_AVAILABLE, fulltext_query, get_driver
+if not NEO4J_AVAILABLE:
     print("⚠️  Neo4j driver not installed. Run: pip install neo4j")
 
 # GitHub API
@@ -35,6 +33,9 @@ except ImportError:
     REQUESTS_AVAILABLE = False
     print("⚠️  Requests not installed. Run: pip install requests")
 
+# Fulltext hits scoring below this are too weak to report
+MIN_SEARCH_SCORE = 0.5
+
 
 class ResearchAgent:
     """Agent to research before starting tasks"""
@@ -58,10 +59,7 @@ class ResearchAgent:
         
         if uri and username and password:
             try:
-                self.neo4j_driver = GraphDatabase.driver(
-                    uri, 
-                    auth=(username, password)
-                )
+                self.neo4j_driver = get_driver(uri, username, password)
                 print("✓ Connected to Neo4j")
             except Exception as e:
                 print(f"⚠️  Neo4j connection failed: {e}")
@@ -175,7 +173,12 @@ class ResearchAgent:
         return results
     
     def _search_neo4j(self, task: str, task_type: str) -> Dict:
-        """Search Neo4j knowledge graph"""
+        """Search Neo4j knowledge graph
+        
+        KB entries are found through the kb_entry_search fulltext index
+        (created by sync_skills_to_neo4j.py), best matches first.
+        Without the index, titles and previews are scanned for the keywords.
+        """
         results = {
             'found': False,
             'entries': [],
@@ -187,26 +190,34 @@ class ResearchAgent:
             return results
         
         keywords = self._extract_keywords(task)
+        if not keywords:
+            return results
+        
+        params = {
+            'keywords': keywords,
+            'search': fulltext_query(keywords),
+            'min_score': MIN_SEARCH_SCORE
+        }
         
         try:
             with self.neo4j_driver.session() as session:
                 # Search knowledge entries
                 query = """
-                MATCH (k:KnowledgeEntry)
-                WHERE ANY(keyword IN $keywords WHERE 
-                    toLower(k.title) CONTAINS toLower(keyword) OR
-                    toLower(k.problem) CONTAINS toLower(keyword) OR
-                    toLower(k.solution) CONTAINS toLower(keyword)
-                )
-                OPTIONAL MATCH (k)-[:USES]->(t:Technology)
-                RETURN k, collect(t.name) as technologies
-                ORDER BY k.created_at DESC
+                OPTIONAL MATCH (k)-[:USES_TECHNOLOGY]->(t:Technology)
+                RETURN k, collect(t.name) as technologies, score
+                ORDER BY score DESC, k.date DESC
                 LIMIT 10
                 """
                 
-                result = session.run(query, keywords=keywords)
+                fulltext = True
+                try:
+                    records = list(session.run(self._entry_lookup(fulltext) + query, **params))
+                except Exception:
+                    # kb_entry_search index missing: scan entries instead
+                    fulltext = False
+                    records = list(session.run(self._entry_lookup(fulltext) + query, **params))
                 
-                for record in result:
+                for record in records:
                     k = record['k']
                     results['entries'].append({
                         'id': k['id'],
@@ -219,16 +230,13 @@ class ResearchAgent:
                 
                 # Find related technologies
                 tech_query = """
-                MATCH (k:KnowledgeEntry)-[:USES]->(t:Technology)
-                WHERE ANY(keyword IN $keywords WHERE 
-                    toLower(k.title) CONTAINS toLower(keyword)
-                )
+                MATCH (k)-[:USES_TECHNOLOGY]->(t:Technology)
                 RETURN t.name as technology, count(*) as usage_count
                 ORDER BY usage_count DESC
                 LIMIT 5
                 """
                 
-                tech_result = session.run(tech_query, keywords=keywords)
+                tech_result = session.run(self._entry_lookup(fulltext) + tech_query, **params)
                 results['related_technologies'] = [
                     {'name': r['technology'], 'count': r['usage_count']}
                     for r in tech_result
@@ -239,6 +247,21 @@ class ResearchAgent:
         
         return results
     
+    @staticmethod
+    def _entry_lookup(fulltext: bool) -> str:
+        """Cypher yielding (k, score) for KB entries matching $keywords"""
+        if fulltext:
+            return """
+                CALL db.index.fulltext.queryNodes('kb_entry_search', $search) YIELD node AS k, score
+                WHERE score >= $min_score"""
+        return """
+                MATCH (k:KBEntry)
+                WHERE ANY(keyword IN $keywords WHERE
+                    toLower(k.title) CONTAINS keyword OR
+                    toLower(coalesce(k.content_preview, '')) CONTAINS keyword
+                )
+                WITH k, 0.0 AS score"""
+    
     def _search_github(self, task: str, task_type: str) -> Dict:
         """Search GitHub issues"""
         results = {
@@ -536,8 +559,8 @@ class ResearchAgent:
     
     def close(self):
         """Close connections"""
-        if self.neo4j_driver:
-            self.neo4j_driver.close()
+        # The Neo4j pool is shared with other in-process callers and closed at exit
+        self.neo4j_driver = None
 
 
 def main():
@@ -6,14 +6,19 @@ Handles KB search, creation, and indexing
 
 import os
 import re
+import sys
 import yaml
 from pathlib import Path
 from datetime import datetime
 from .common import (
-    get_project_root, ensure_dir, read_file, write_file,
+    get_project_root, ensure_dir, write_file,
     print_success, print_error, print_info
 )
 
+# Shared corpus loader lives with the KB CLI
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+from kb_corpus import get_corpus, compile_prefilter, file_matches
+
 
 def get_kb_root():
     """Get knowledge base root directory"""
@@ -25,25 +30,23 @@ def get_kb_index():
     return get_kb_root() / 'INDEX.md'
 
 
-def parse_yaml_frontmatter(content):
-    """Parse YAML frontmatter from markdown content"""
-    if not content.startswith('---'):
-        return None, content
-    
-    try:
-        # Split content by frontmatter delimiters
-        parts = content.split('---', 2)
-        if len(parts) < 3:
-            return None, content
+def iter_kb_entries(kb_root, prefilter=None):
+    """Yield (path, frontmatter, entry) for KB files with frontmatter
+
+    With a prefilter (kb_corpus.compile_prefilter), files that do not
+    contain it are skipped before being read or parsed.
+    """
+    for entry in get_corpus().files(kb_root):
+        if entry.name in ['INDEX.md', 'README.md']:
+            continue
         
-        # Parse YAML
-        frontmatter = yaml.safe_load(parts[1])
-        body = parts[2].strip()
+        if not file_matches(entry.path, prefilter):
+            continue
+        
+        if not entry.load() or not entry.metadata:
+            continue
         
-        return frontmatter, body
-    except Exception as e:
-        print_error(f"Failed to parse YAML frontmatter: {str(e)}")
-        return None, content
+        yield entry.path, entry.metadata, entry
 
 
 def search_kb(query, category=None, priority=None):
@@ -55,19 +58,13 @@ def search_kb(query, category=None, priority=None):
         print_info("Knowledge base not initialized.")
         return results
     
+    # Tags are matched space-joined, so a query with whitespace may span
+    # several tags and cannot be pre-filtered against the raw file
+    prefilter = None if re.search(r'\s', query) else compile_prefilter(query)
+    
     # Search in all KB files
-    for kb_file in kb_root.rglob('*.md'):
-        if kb_file.name in ['INDEX.md', 'README.md']:
-            continue
-        
-        content = read_file(kb_file)
-        if not content:
-            continue
-        
-        frontmatter, body = parse_yaml_frontmatter(content)
-        
-        if not frontmatter:
-            continue
+    for kb_file, frontmatter, entry in iter_kb_entries(kb_root, prefilter):
+        body = entry.body
         
         # Filter by category and priority if specified
         if category and frontmatter.get('category') != category:
@@ -207,19 +204,7 @@ def update_kb_index():
     # Collect all entries
     entries_by_category = {}
     
-    for kb_file in kb_root.rglob('*.md'):
-        if kb_file.name in ['INDEX.md', 'README.md']:
-            continue
-        
-        content = read_file(kb_file)
-        if not content:
-            continue
-        
-        frontmatter, _ = parse_yaml_frontmatter(content)
-        
-        if not frontmatter:
-            continue
-        
+    for kb_file, frontmatter, _ in iter_kb_entries(kb_root):
         category = frontmatter.get('category', 'unknown')
         
         if category not in entries_by_category:
@@ -286,19 +271,7 @@ def get_kb_stats():
         'recent_entries': []
     }
     
-    for kb_file in kb_root.rglob('*.md'):
-        if kb_file.name in ['INDEX.md', 'README.md']:
-            continue
-        
-        content = read_file(kb_file)
-        if not content:
-            continue
-        
-        frontmatter, _ = parse_yaml_frontmatter(content)
-        
-        if not frontmatter:
-            continue
-        
+    for _, frontmatter, _ in iter_kb_entries(kb_root):
         stats['total_entries'] += 1
         
         # Count by category